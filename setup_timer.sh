@@ -17,8 +17,16 @@ CURRENT_HOME="$(getent passwd "$CURRENT_USER" | cut -d: -f6)"
 sed -e "s|IPO_PROJECT_DIR|$SCRIPT_DIR|g" -e "s|IPO_USER|$CURRENT_USER|g" -e "s|IPO_HOME|$CURRENT_HOME|g" \
     "$SCRIPT_DIR/systemd/ipo-check.service" | sudo tee "$SYSTEMD_DIR/ipo-check.service" > /dev/null
 sudo cp "$SCRIPT_DIR/systemd/ipo-check.timer" "$SYSTEMD_DIR/"
+if [ "${1:-}" = "--daemon" ]; then
+    sed -e "s|IPO_PROJECT_DIR|$SCRIPT_DIR|g" -e "s|IPO_USER|$CURRENT_USER|g" -e "s|IPO_HOME|$CURRENT_HOME|g" \
+        "$SCRIPT_DIR/systemd/ipo-daemon.service" | sudo tee "$SYSTEMD_DIR/ipo-daemon.service" > /dev/null
+fi
 sudo systemctl daemon-reload
 sudo systemctl enable --now ipo-check.timer
+if [ "${1:-}" = "--daemon" ]; then
+    sudo systemctl enable --now ipo-daemon.service
+    echo "Daemon enabled. Set 'daemon: {enabled: true}' in config.yaml so the timer triggers it."
+fi
 
 echo ""
 echo "Timer enabled. IPO check will run daily at 11:11 Nepal time (no need to change system timezone)."
@@ -27,4 +35,5 @@ echo "Commands:"
 echo "  Status:  sudo systemctl status ipo-check.timer"
 echo "  Logs:    sudo journalctl -u ipo-check.service"
 echo "  Disable: sudo systemctl disable --now ipo-check.timer"
+echo "  Daemon:  sudo ./setup_timer.sh --daemon   (keep the browser warm between runs)"
 echo ""
@@ -0,0 +1,63 @@
+"""Cold import time of the CLI entry points, checked against a budget (run in CI).
+
+    python src/bench/import_budget.py [--budget-ms 150] [--runs 5]
+
+Every run imports the entry point in a fresh interpreter. The median import time must stay within
+--budget-ms, and Playwright / requests must not be imported at all: they are loaded on first use,
+so --validate-config, --preflight and early exits never pay for them. Exit code 1 on a violation.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+ROOT = Path(__file__).parent.parent.parent
+
+ENTRY_POINTS = ("src.meroshare.check", "src.scheduler.run_once")
+LAZY_MODULES = ("playwright", "requests")
+DEFAULT_BUDGET_MS = 150
+DEFAULT_RUNS = 5
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str) -> Dict[str, Any]:
+    code = PROBE.format(root=str(ROOT), module=module, lazy=LAZY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check cold import time of the entry points")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    args = parser.parse_args()
+
+    failed = False
+    for module in ENTRY_POINTS:
+        # First run writes the .pyc files; only the runs after it are timed
+        measure(module)
+        runs = [measure(module) for _ in range(max(1, args.runs))]
+        median_ms = statistics.median(run["ms"] for run in runs)
+        loaded = sorted({name for run in runs for name in run["loaded"]})
+        over = median_ms > args.budget_ms
+        print(f"  {module:<28}{median_ms:>8.1f} ms (budget {args.budget_ms:.0f} ms)"
+              f"{'  <-- over budget' if over else ''}")
+        if loaded:
+            print(f"  {module:<28}imports {', '.join(loaded)} eagerly")
+        failed = failed or over or bool(loaded)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
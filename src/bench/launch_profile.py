@@ -0,0 +1,103 @@
+"""Launch time and peak browser memory of each Chromium launch profile (see src/meroshare/launch.py).
+
+    python src/bench/launch_profile.py [--profiles default lean] [--accounts 3] [--iterations 3] [--concurrency 1]
+
+Every iteration runs the real check flow against a fresh mock MeroShare site with one profile. Launch
+time is the browser_start phase of the run trace. Peak RSS is the highest sampled memory of
+everything the run spawned: the Playwright driver, Chromium and its renderers. Medians are printed per
+profile and written to bench/results/.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import yaml
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.bench.run_bench import BENCH_DIR, bench_config, bench_fixture
+from src.meroshare import tracing
+from src.meroshare.check import main as check_ipos
+from src.meroshare.launch import PROFILES
+from src.meroshare.mock_server import MockMeroShareServer
+from src.meroshare.procstat import PeakRssSampler
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+logger = logging.getLogger(__name__)
+
+
+def run_profile(profile: str, args: argparse.Namespace, config_dir: str) -> Dict[str, Any]:
+    with MockMeroShareServer(bench_fixture(args.accounts), latency_ms=args.latency_ms) as mock:
+        config = bench_config(mock.url, args.accounts, args.concurrency, headless=True)
+        config["browser_profile"] = profile
+        config_path = os.path.join(config_dir, "config.yaml")
+        with open(config_path, "w") as f:
+            yaml.safe_dump(config, f)
+        os.environ["CONFIG_PATH"] = config_path
+        started = time.monotonic()
+        with PeakRssSampler() as rss:
+            ok = bool(check_ipos())
+        wall = time.monotonic() - started
+        applied = len(mock.state.applied)
+    launch = sum(span["seconds"] for span in tracing.TRACER.spans if span["phase"] == "browser_start")
+    return {"ok": ok and applied == args.accounts, "launch_sec": round(launch, 3),
+            "peak_rss_mb": round(rss.peak_mb, 1), "wall": round(wall, 3)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare launch time and peak RSS of the launch profiles")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--accounts", type=int, default=3)
+    parser.add_argument("--latency-ms", type=int, default=50, help="Delay added to every mock response")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    runs: Dict[str, List[Dict[str, Any]]] = {profile: [] for profile in args.profiles}
+    with tempfile.TemporaryDirectory(prefix="meroshare-launch-") as config_dir:
+        # Profiles take turns, so drift on the machine affects all of them alike
+        for i in range(args.iterations):
+            for profile in args.profiles:
+                logger.info(f"Profile {profile}, iteration {i + 1}/{args.iterations}")
+                run = run_profile(profile, args, config_dir)
+                if not run["ok"]:
+                    logger.error(f"Profile {profile} did not apply with every account")
+                    return 1
+                runs[profile].append(run)
+
+    summary = {
+        profile: {key: round(statistics.median(run[key] for run in profile_runs), 3)
+                  for key in ("launch_sec", "peak_rss_mb", "wall")}
+        for profile, profile_runs in runs.items()
+    }
+    print(f"\nLaunch profiles: {args.accounts} account(s), concurrency {args.concurrency}, "
+          f"{args.iterations} iteration(s), medians")
+    print(f"  {'profile':<12}{'launch':>10}{'peak RSS':>12}{'wall':>10}")
+    for profile, values in summary.items():
+        print(f"  {profile:<12}{values['launch_sec']:>9.2f}s{values['peak_rss_mb']:>9.0f} MB{values['wall']:>9.2f}s")
+
+    results_dir = BENCH_DIR / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    result_path = results_dir / f"launch-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    result_path.write_text(json.dumps({
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "accounts": args.accounts,
+        "concurrency": args.concurrency, "runs": runs, "summary": summary,
+    }, indent=2))
+    print(f"\nSaved {result_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Offline benchmark: runs the real check flow (check.main) against the local mock MeroShare site.
+
+    python src/bench/run_bench.py [--accounts 3] [--latency-ms 150] [--iterations 3] [--concurrency 1]
+    python src/bench/run_bench.py --save-baseline      # store this run as bench/baseline.json
+
+Each iteration starts a fresh mock site (so every account can apply again), points a temporary
+config at it and times every phase through the run trace. Results are written to bench/results/ and
+compared with the baseline; phases slower than --threshold are reported and make the exit code 1.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import yaml
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.meroshare import tracing
+from src.meroshare.check import main as check_ipos
+from src.meroshare.mock_server import DEFAULT_FIXTURE, MockMeroShareServer
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+logger = logging.getLogger(__name__)
+
+BENCH_DIR = ROOT / "bench"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_THRESHOLD = 0.20
+# Phases shorter than this are too noisy to call a regression on
+MIN_COMPARABLE_SEC = 0.25
+
+
+def bench_fixture(accounts: int) -> Dict[str, Any]:
+    fixture = json.loads(json.dumps(DEFAULT_FIXTURE))
+    template = fixture["users"]["demo"]
+    fixture["users"] = {
+        f"bench{i}": dict(template, name=f"Bench User {i}", demat=f"13013700000{i:05d}", boid=f"{i:08d}")
+        for i in range(1, accounts + 1)
+    }
+    return fixture
+
+
+def bench_config(site_url: str, accounts: int, concurrency: int, headless: bool) -> Dict[str, Any]:
+    return {
+        "meroshare_url": site_url,
+        "headless": headless,
+        "concurrency": concurrency,
+        "session_cache": {"enabled": False},
+        "trace": {"enabled": False},
+        "option_cache": {"enabled": False},
+        # every run applies afresh against a fresh mock site; the real journal must not skip or record it
+        "journal": {"enabled": False},
+        "meroshare": {
+            "accounts": [
+                {"dp_name": "DEMO CAPITAL", "username": f"bench{i}", "password": "demo",
+                 "crn": f"CRN{i:05d}", "bank_name": "DEMO BANK", "transaction_pin": "1234",
+                 "applied_kitta": "10", "name": f"Bench {i}"}
+                for i in range(1, accounts + 1)
+            ],
+        },
+    }
+
+
+def run_iteration(args: argparse.Namespace, config_dir: str) -> Dict[str, Any]:
+    with MockMeroShareServer(bench_fixture(args.accounts), latency_ms=args.latency_ms) as mock:
+        config_path = os.path.join(config_dir, "config.yaml")
+        with open(config_path, "w") as f:
+            yaml.safe_dump(bench_config(mock.url, args.accounts, args.concurrency, not args.headed), f)
+        os.environ["CONFIG_PATH"] = config_path
+        started = time.monotonic()
+        ok = bool(check_ipos())
+        wall = time.monotonic() - started
+        applied = len(mock.state.applied)
+
+    phases: Dict[str, float] = defaultdict(float)
+    accounts: Dict[str, float] = defaultdict(float)
+    for span in tracing.TRACER.spans:
+        phases[span["phase"]] += span["seconds"]
+        if span["parent"] is None and span["account"]:
+            accounts[span["account"]] += span["seconds"]
+    return {"ok": ok, "applied": applied, "wall": round(wall, 3),
+            "phases": {k: round(v, 3) for k, v in phases.items()},
+            "accounts": {k: round(v, 3) for k, v in accounts.items()}}
+
+
+def aggregate(iterations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Median per phase / account over the iterations."""
+
+    def medians(key: str) -> Dict[str, float]:
+        values: Dict[str, List[float]] = defaultdict(list)
+        for it in iterations:
+            for name, seconds in it[key].items():
+                values[name].append(seconds)
+        return {name: round(statistics.median(v), 3) for name, v in sorted(values.items())}
+
+    return {
+        "wall": round(statistics.median(it["wall"] for it in iterations), 3),
+        "phases": medians("phases"),
+        "accounts": medians("accounts"),
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Phases (and total wall time) slower than baseline by more than threshold."""
+    regressions = []
+    pairs = [("wall", result["summary"]["wall"], baseline["summary"]["wall"])]
+    for phase, seconds in result["summary"]["phases"].items():
+        pairs.append((phase, seconds, baseline["summary"]["phases"].get(phase)))
+    for name, now, before in pairs:
+        if before is None or max(now, before) < MIN_COMPARABLE_SEC:
+            continue
+        change = (now - before) / before if before else 0.0
+        marker = ""
+        if change > threshold:
+            marker = "  <-- slower"
+            regressions.append(name)
+        print(f"  {name:<26}{before:>9.2f}s -> {now:>7.2f}s  {change:+7.1%}{marker}")
+    return regressions
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    summary = result["summary"]
+    print(f"\nBenchmark: {result['accounts']} account(s), {result['latency_ms']} ms latency, "
+          f"concurrency {result['concurrency']}, {len(result['iterations'])} iteration(s)")
+    print(f"Wall time (median): {summary['wall']:.2f}s")
+    print("Per phase (median total seconds per run):")
+    for phase, seconds in sorted(summary["phases"].items(), key=lambda item: -item[1]):
+        print(f"  {phase:<26}{seconds:>8.2f}")
+    print("Per account (median seconds):")
+    for account, seconds in summary["accounts"].items():
+        print(f"  {account:<26}{seconds:>8.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the apply flow against the mock MeroShare site")
+    parser.add_argument("--accounts", type=int, default=3)
+    parser.add_argument("--latency-ms", type=int, default=150, help="Delay added to every mock response")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--headed", action="store_true", help="Show the browser")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="Store this result as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown reported as a regression (default 0.20)")
+    args = parser.parse_args()
+
+    iterations = []
+    with tempfile.TemporaryDirectory(prefix="meroshare-bench-") as config_dir:
+        for i in range(args.iterations):
+            logger.info(f"Benchmark iteration {i + 1}/{args.iterations}")
+            iteration = run_iteration(args, config_dir)
+            if not iteration["ok"] or iteration["applied"] != args.accounts:
+                logger.error(f"Iteration {i + 1} did not apply with every account "
+                             f"({iteration['applied']}/{args.accounts})")
+                return 1
+            iterations.append(iteration)
+
+    result = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "accounts": args.accounts,
+        "latency_ms": args.latency_ms,
+        "concurrency": args.concurrency,
+        "iterations": iterations,
+        "summary": aggregate(iterations),
+    }
+    print_report(result)
+
+    results_dir = BENCH_DIR / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    result_path = results_dir / f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    result_path.write_text(json.dumps(result, indent=2))
+    print(f"\nSaved {result_path}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(result, indent=2))
+        print(f"Baseline updated: {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print("No baseline yet; run with --save-baseline to store one")
+        return 0
+    baseline = json.loads(baseline_path.read_text())
+    same_setup = all(baseline.get(k) == result[k] for k in ("accounts", "latency_ms", "concurrency"))
+    if not same_setup:
+        print("Baseline was recorded with different --accounts/--latency-ms/--concurrency; comparing anyway")
+    print(f"Compared with baseline from {baseline.get('created')}:")
+    regressions = compare(result, baseline, args.threshold)
+    if regressions:
+        print(f"Slower than baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
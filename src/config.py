@@ -1,8 +1,46 @@
+import copy
 import os
 import yaml
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
+
+REQUIRED_ACCOUNT_FIELDS = ("username", "password", "dp_name", "bank_name", "crn", "transaction_pin")
+POSITIVE_INT_SETTINGS = ("concurrency", "processes")
+CLIENTS = ("browser", "api")
+
+_MISSING = object()
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("Config is read-only; copy it (dict(...)) to change a value")
+
+
+class FrozenDict(dict):
+    """dict that refuses changes; still a dict for isinstance checks, json and pickling."""
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _read_only
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+class FrozenList(list):
+    __setitem__ = __delitem__ = append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+    __iadd__ = __imul__ = _read_only
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
 
 class Config:
+    """config.yaml, read and frozen once. Use for_account() for an account's view instead of re-reading it."""
+
     def __init__(self, config_path: str | None = None):
         if config_path:
             self.config_path = config_path
@@ -23,9 +61,10 @@ class Config:
                     break
             if not self.config_path:
                 self.config_path = 'config/config.yaml'  # Default fallback
-        
-        self.config = self._load_config()
-    
+
+        self.config = freeze(self._load_config())
+        self._lookups: Dict[str, Any] = {}
+
     def _load_config(self) -> Dict[str, Any]:
         if self.config_path and os.path.exists(self.config_path):
             with open(self.config_path, 'r') as f:
@@ -41,22 +80,92 @@ class Config:
                     with open(path, 'r') as f:
                         return yaml.safe_load(f) or {}
         return {}
-    
+
     def get(self, key: str, default: Any = None) -> Any:
-        keys = key.split('.')
-        value = self.config
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k)
+        value = self._lookups.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.config
+            for k in key.split('.'):
+                value = value.get(k) if isinstance(value, dict) else None
                 if value is None:
-                    return default
-            else:
-                return default
+                    break
+            # The config never changes, so each dotted key is resolved once
+            self._lookups[key] = value
         return value if value is not None else default
-    
+
+    def with_overrides(self, overrides: Dict[str, Any]) -> "Config":
+        """Copy of this config with the given top-level sections replaced."""
+        other = copy.copy(self)
+        other.config = freeze(dict(self.config, **overrides))
+        other._lookups = {}
+        return other
+
     def get_meroshare(self) -> Dict[str, Any]:
         return self.config.get('meroshare', {})
 
     def get_telegram(self) -> Dict[str, Any]:
         return self.config.get('telegram', {})
 
+    @property
+    def accounts(self) -> List[Dict[str, Any]]:
+        """meroshare.accounts as a list; a single account may also sit directly under meroshare."""
+        meroshare = self.get_meroshare()
+        accounts = meroshare.get("accounts")
+        if not accounts:
+            return [meroshare] if meroshare else []
+        return list(accounts) if isinstance(accounts, list) else [accounts]
+
+    def for_account(self, account_config: Dict[str, Any]) -> "AccountConfig":
+        return AccountConfig(self, account_config)
+
+    @staticmethod
+    def account_errors(account_config: Dict[str, Any]) -> List[str]:
+        if not isinstance(account_config, dict):
+            return ["not a mapping of account settings"]
+        errors = []
+        missing = [field for field in REQUIRED_ACCOUNT_FIELDS if not account_config.get(field)]
+        if missing:
+            errors.append(f"missing {', '.join(missing)}")
+        kitta = account_config.get("applied_kitta")
+        if kitta is not None and not (str(kitta).isdigit() and int(kitta) > 0):
+            errors.append(f"applied_kitta must be a positive whole number, got {kitta!r}")
+        return errors
+
+    def validate(self) -> Tuple[List[str], Dict[int, List[str]]]:
+        """(errors, account_errors): every problem in the file at once. account_errors is keyed by
+        the 1-based account position used in the logs."""
+        errors: List[str] = []
+        if not self.accounts:
+            errors.append("No accounts configured under meroshare")
+        by_account = {idx: self.account_errors(account) for idx, account in enumerate(self.accounts, 1)}
+        for key in POSITIVE_INT_SETTINGS:
+            value = self.config.get(key)
+            if value is not None and not (str(value).isdigit() and int(value) >= 1):
+                errors.append(f"{key} must be a whole number of at least 1, got {value!r}")
+        client = str(self.config.get("client", "browser")).lower()
+        if client not in CLIENTS:
+            errors.append(f"client must be one of {', '.join(CLIENTS)}, got {client!r}")
+        return errors, {idx: e for idx, e in by_account.items() if e}
+
+
+class AccountConfig:
+    """One account's view of a Config: get_meroshare() is that account, everything else is shared."""
+
+    def __init__(self, config: Config, account_config: Dict[str, Any]):
+        self.parent = config
+        self.account = account_config
+        self.config_path = config.config_path
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "meroshare" or key.startswith("meroshare."):
+            value = self.account
+            for k in key.split('.')[1:]:
+                value = value.get(k) if isinstance(value, dict) else None
+            return value if value is not None else default
+        return self.parent.get(key, default)
+
+    def get_meroshare(self) -> Dict[str, Any]:
+        return self.account
+
+    def get_telegram(self) -> Dict[str, Any]:
+        return self.parent.get_telegram()
@@ -1,5 +1,4 @@
 from src.meroshare.browser import BrowserManager
-from src.meroshare.login import MeroShareLogin
-
-__all__ = ['BrowserManager', 'MeroShareLogin']
+from src.meroshare.login import LoginResult, MeroShareLogin
 
+__all__ = ['BrowserManager', 'LoginResult', 'MeroShareLogin']
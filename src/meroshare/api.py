@@ -0,0 +1,202 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.meroshare.option_index import bank_matches
+from src.meroshare.ratelimit import LIMITER, RETRYABLE_STATUS, origin_of, retry_after_seconds
+from src.meroshare.site import MEROSHARE_API_URL
+
+logger = logging.getLogger(__name__)
+
+MEROSHARE_ORIGIN = "https://meroshare.cdsc.com.np"
+API_TIMEOUT_SEC = 20
+API_POOL_SIZE = 16
+
+APPLICABLE_ISSUE_QUERY = {
+    "filterFieldParams": [
+        {"key": "companyIssue.companyISIN.script", "alias": "Scrip"},
+        {"key": "companyIssue.companyISIN.company.name", "alias": "Company Name"},
+        {"key": "companyIssue.assignedToClient.name", "value": "", "alias": "Issue Manager"},
+    ],
+    "page": 1,
+    "size": 50,
+    "searchRoleViewConstants": "VIEW_APPLICABLE_SHARE",
+    "filterDateParams": [
+        {"key": "minIssueOpenDate", "condition": "", "alias": "", "value": ""},
+        {"key": "maxIssueCloseDate", "condition": "", "alias": "", "value": ""},
+    ],
+}
+
+
+class MeroShareAPIError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def pooled_session() -> requests.Session:
+    """Session whose connection pool is large enough to be shared by several clients."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=API_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class MeroShareAPI:
+    """Plain HTTP client for the MeroShare backend the SPA talks to (no browser).
+
+    Pass a shared session to reuse connections across accounts; the auth token from login() is
+    kept per instance and sent on every call.
+    """
+
+    def __init__(self, base_url: str = MEROSHARE_API_URL, timeout: float = API_TIMEOUT_SEC,
+                 session: Optional[requests.Session] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.token: Optional[str] = None
+        self.last_error: str = ""
+        self._owns_session = session is None
+        if session is None:
+            session = pooled_session()
+        session.headers.update({
+            "Accept": "application/json, text/plain, */*",
+            "Content-Type": "application/json",
+            "Origin": MEROSHARE_ORIGIN,
+            "Referer": MEROSHARE_ORIGIN + "/",
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+        })
+        self.session = session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def close(self) -> None:
+        if self._owns_session:
+            self.session.close()
+
+    def _request(self, method: str, path: str, json: Any = None) -> requests.Response:
+        """One API call through the shared rate limiter. GETs are retried on network errors and
+        429/5xx; POSTs only on 429, which the server sends before acting on the request."""
+        headers = {"Authorization": self.token} if self.token else {}
+        url = f"{self.base_url}{path}"
+        origin = origin_of(url)
+        for attempt in range(LIMITER.max_retries):
+            last_attempt = attempt == LIMITER.max_retries - 1
+            try:
+                with LIMITER.request(origin):
+                    response = self.session.request(method, url, json=json, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                LIMITER.observe(origin, error=f"{type(e).__name__}: timed out")
+                if method != "GET" or last_attempt:
+                    raise
+                LIMITER.sleep_backoff(f"{method} {path}", attempt, str(e))
+                continue
+            LIMITER.observe(origin, status=response.status_code)
+            retryable = response.status_code == 429 or (method == "GET" and response.status_code in RETRYABLE_STATUS)
+            if not retryable or last_attempt:
+                break
+            LIMITER.sleep_backoff(f"{method} {path}", attempt, f"HTTP {response.status_code}",
+                                  retry_after_seconds(response.headers.get("Retry-After")))
+        if response.status_code >= 400:
+            message = ""
+            try:
+                body = response.json()
+                message = body.get("message") or body.get("errorMessage") or ""
+            except ValueError:
+                message = response.text[:150]
+            raise MeroShareAPIError(message or f"HTTP {response.status_code} from {path}", response.status_code)
+        return response
+
+    def _json(self, method: str, path: str, json: Any = None) -> Any:
+        response = self._request(method, path, json)
+        return response.json() if response.content else None
+
+    def capitals(self) -> List[Dict[str, Any]]:
+        """List of depository participants: [{id, code, name}]."""
+        return self._json("GET", "/meroShare/capital/") or []
+
+    def client_id_for(self, dp_name: str) -> Optional[int]:
+        """Same matching as the login page: dp_name contained in the DP label."""
+        dp_name_upper = dp_name.upper()
+        for dp in self.capitals():
+            label = f"{dp.get('name', '')} ({dp.get('code', '')})".upper()
+            if dp_name_upper in label:
+                return dp.get("id")
+        return None
+
+    def login(self, username: str, password: str, dp_name: str) -> bool:
+        """Authenticate and keep the issued token. Sets last_error on failure."""
+        try:
+            client_id = self.client_id_for(dp_name)
+            if not client_id:
+                self.last_error = "Could not select DP option"
+                return False
+            LIMITER.wait_login()
+            response = self._request("POST", "/meroShare/auth/", {
+                "clientId": client_id, "username": username, "password": password,
+            })
+            token = response.headers.get("Authorization")
+            if not token:
+                self.last_error = "Login response had no Authorization token"
+                return False
+            self.token = token
+            return True
+        except MeroShareAPIError as e:
+            self.last_error = str(e)[:150]
+            return False
+
+    def resume(self, token: str) -> bool:
+        """Use a token from an earlier login (browser or API) if the backend still accepts it."""
+        self.token = token
+        try:
+            self.own_detail()
+            return True
+        except MeroShareAPIError as e:
+            if e.status not in (401, 403):
+                raise
+            self.token = None
+            return False
+
+    def logout(self) -> None:
+        if not self.token:
+            return
+        try:
+            self._request("GET", "/meroShare/auth/logout/")
+        except (MeroShareAPIError, requests.RequestException) as e:
+            logger.debug("Logout failed: %s", e)
+        self.token = None
+
+    def own_detail(self) -> Dict[str, Any]:
+        return self._json("GET", "/meroShare/ownDetail/") or {}
+
+    def applicable_issues(self) -> List[Dict[str, Any]]:
+        """Open issues as listed on the ASBA page."""
+        data = self._json("POST", "/meroShare/companyShare/applicableIssue/", APPLICABLE_ISSUE_QUERY) or {}
+        return data.get("object") or []
+
+    def issue_detail(self, company_share_id: int) -> Dict[str, Any]:
+        return self._json("GET", f"/meroShare/active/{company_share_id}") or {}
+
+    def banks(self) -> List[Dict[str, Any]]:
+        return self._json("GET", "/meroShare/bank/") or []
+
+    def bank_id_for(self, bank_name: str) -> Optional[int]:
+        """Same matching as the issue form's bank dropdown."""
+        for bank in self.banks():
+            if bank_matches(bank_name, bank.get("name", "")):
+                return bank.get("id")
+        return None
+
+    def bank_accounts(self, bank_id: int) -> List[Dict[str, Any]]:
+        return self._json("GET", f"/meroShare/bank/{bank_id}") or []
+
+    def apply(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Submit the application form. Raises MeroShareAPIError with the server message on rejection."""
+        return self._json("POST", "/meroShare/applicantForm/share/apply", payload) or {}
@@ -0,0 +1,118 @@
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Finds the issue rows with the same selector fallbacks the old per-row scan used, tags each row and
+# its Apply button with data attributes, and returns the parsed fields in one round trip.
+EXTRACT_ROWS_JS = """
+() => {
+    const pick = (sel) => Array.from(document.querySelectorAll(sel));
+    const textOf = (el) => ((el && el.innerText) || '').trim();
+    let rows = pick('table tbody tr');
+    if (!rows.length) rows = pick('tbody tr');
+    if (!rows.length) rows = pick("tr[role='row']");
+    if (!rows.length) {
+        rows = pick("tr, .card, [role='row'], .row").filter(
+            (r) => ['apply', 'ipo', 'issue', 'share'].some((k) => textOf(r).toLowerCase().includes(k)));
+    }
+    const filtered = rows.filter((r) => {
+        const t = textOf(r).toLowerCase();
+        if (['company', 'issue', 'type', 'price', 'action'].some((h) => t.includes(h))) return false;
+        return ['apply', 'view', 'details'].some((k) => t.includes(k)) || t.length > 20;
+    });
+    if (filtered.length) rows = filtered;
+    const first = (row, sel) => textOf(row.querySelector(sel));
+    return rows.map((row, i) => {
+        row.setAttribute('data-ipo-row', String(i));
+        const text = textOf(row);
+        const buttons = Array.from(row.querySelectorAll('button, a, [role="button"]'));
+        const apply = buttons.find((b) => textOf(b).toLowerCase().includes('apply'));
+        if (apply) apply.setAttribute('data-ipo-apply', String(i));
+        const groupMatch = text.match(/Ordinary Shares|Preference Shares|Mutual Fund|Debentures?/i);
+        const typeMatch = text.match(/\\b(IPO|FPO|RIGHT|AUCTION)\\b/i);
+        return {
+            row_index: i,
+            text: text,
+            company: first(row, '[tooltip="Company Name"], .company-name span, .company-name')
+                || first(row, 'td') || text.split('\\n')[0].trim(),
+            share_type: first(row, '[tooltip="Share Type"], .share-of-type') || (typeMatch ? typeMatch[0] : ''),
+            share_group: first(row, '[tooltip="Share Group"], .isin') || (groupMatch ? groupMatch[0] : ''),
+            has_apply: !!apply,
+        };
+    });
+}
+"""
+
+
+def company_key(name: Optional[str]) -> str:
+    return " ".join((name or "").lower().split())
+
+
+def issue_key(row: Dict[str, Any]) -> str:
+    """Identity of an issue as the ASBA listing shows it: company, share type and share group.
+
+    Accepts listing rows (company) as well as form/API details (company_name). Empty without a company.
+    """
+    company = company_key(row.get("company") or row.get("company_name"))
+    if not company:
+        return ""
+    return "|".join([company, " ".join((row.get("share_type") or "").upper().split()),
+                     " ".join((row.get("share_group") or "").upper().split())])
+
+
+class AsbaListing:
+    """Issue rows of the ASBA page extracted with one evaluate, indexed by issue_key and company name.
+
+    Rows are plain dicts (row_index, text, company, share_type, share_group, has_apply). Element
+    handles are resolved on demand through the data-ipo-* tags, re-extracting when the list was
+    re-rendered (e.g. after going back from an issue form).
+    """
+
+    def __init__(self, page, rows: List[Dict[str, Any]]):
+        self.page = page
+        self.rows = rows
+        self.by_company: Dict[str, Dict[str, Any]] = {}
+        self.by_issue: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            self.by_company.setdefault(company_key(row.get("company")), row)
+            self.by_issue.setdefault(issue_key(row), row)
+
+    @classmethod
+    def extract(cls, page) -> "AsbaListing":
+        return cls(page, page.evaluate(EXTRACT_ROWS_JS) or [])
+
+    def refresh(self) -> None:
+        self.__init__(self.page, self.page.evaluate(EXTRACT_ROWS_JS) or [])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.rows)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self.rows[index]
+
+    def find(self, company_name: Optional[str] = None, key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Row with issue_key key when given, else the row whose company is exactly company_name
+        (case/space-insensitive). None when nothing matches: a similar name is a different issue."""
+        if key:
+            return self.by_issue.get(key)
+        company = company_key(company_name)
+        return self.by_company.get(company) if company else None
+
+    def _query(self, selector: str):
+        handle = self.page.query_selector(selector)
+        if handle is None:
+            self.refresh()
+            handle = self.page.query_selector(selector)
+        return handle
+
+    def row_handle(self, row: Dict[str, Any]):
+        return self._query(f'[data-ipo-row="{row["row_index"]}"]')
+
+    def apply_button(self, row: Dict[str, Any]):
+        if not row.get("has_apply"):
+            return None
+        return self._query(f'[data-ipo-apply="{row["row_index"]}"]')
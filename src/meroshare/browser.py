@@ -1,39 +1,75 @@
-from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext, Playwright  # type: ignore
 import logging
+import socket
 import time
-from typing import Optional
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from src.meroshare import waits
+from src.meroshare.launch import LaunchProfile
+from src.meroshare.procstat import children_rss_mb
+from src.meroshare.profiling import PROFILER
+from src.meroshare.ratelimit import LIMITER, is_retryable_error, origin_of, retry_after_seconds
+from src.meroshare.netreplay import NetworkTape
+from src.meroshare.resources import ResourcePolicy
+from src.meroshare.tracing import traced
+
+if TYPE_CHECKING:
+    # Playwright itself is imported on first launch, so CLI paths that never open a browser skip it
+    from playwright.sync_api import Page, Browser, BrowserContext, Playwright  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+
+def _free_local_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _observe_response(response) -> None:
+    """Feed page and API responses (not static assets) to the rate limiter."""
+    try:
+        if response.request.resource_type in ("document", "xhr", "fetch"):
+            LIMITER.observe(origin_of(response.url), status=response.status)
+    except Exception as e:
+        logger.debug("Could not observe response: %s", e)
+
+
 class BrowserManager:
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, cdp_endpoint: Optional[str] = None, shareable: bool = False,
+                 resource_policy: Optional[ResourcePolicy] = None, network: Optional[NetworkTape] = None,
+                 profile: Optional[LaunchProfile] = None):
+        """With shareable=True Chromium also listens on a local CDP port so share() can attach more
+        managers (one BrowserContext each) to the same browser process. The port has no authentication:
+        any local process could drive the logged-in browser while it is open, so only pass shareable
+        when accounts will run concurrently. cdp_endpoint attaches to one.
+        resource_policy, if given, is routed on every context this manager creates; network records
+        or replays their traffic (see netreplay.py). profile picks the launch arguments and viewport
+        (see launch.py)."""
         self.headless = headless
-        self.playwright: Optional[Playwright] = None
-        self.browser: Optional[Browser] = None
-        self.context: Optional[BrowserContext] = None
-        self.page: Optional[Page] = None
+        self.profile = profile or LaunchProfile()
+        self.resource_policy = resource_policy
+        self.network = network
+        # Token of the login in the current context (MeroShareLogin), for steps that call the backend directly
+        self.auth_token: Optional[str] = None
+        self.cdp_endpoint = cdp_endpoint
+        self.shareable = shareable
+        self._shared_endpoint: Optional[str] = None
+        self.playwright: Optional["Playwright"] = None
+        self.browser: Optional["Browser"] = None
+        self.context: Optional["BrowserContext"] = None
+        self.page: Optional["Page"] = None
     
+    @traced("browser_start")
     def __enter__(self):
+        from playwright.sync_api import sync_playwright  # type: ignore
         try:
             self.playwright = sync_playwright().start()
-            args = [
-                '--disable-blink-features=AutomationControlled',
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-gpu',
-                '--no-first-run',
-            ]
-            self.browser = self.playwright.chromium.launch(
-                headless=self.headless,
-                args=args,
-                timeout=60000,
-            )
-            self.context = self.browser.new_context(
-                viewport={'width': 1280, 'height': 720},
-                device_scale_factor=1.0,
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
+            if self.cdp_endpoint:
+                self.browser = self.playwright.chromium.connect_over_cdp(self.cdp_endpoint, timeout=60000)
+            else:
+                self._launch()
+            self.context = self._new_context()
             self.page = self.context.new_page()
             return self
         except Exception as e:
@@ -42,16 +78,7 @@ class BrowserManager:
             raise
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.page:
-            try:
-                self.page.close()
-            except Exception as e:
-                logger.warning("Error closing page: %s", e)
-        if self.context:
-            try:
-                self.context.close()
-            except Exception as e:
-                logger.warning("Error closing context: %s", e)
+        self._discard_context(logger.warning)
         if self.browser:
             try:
                 self.browser.close()
@@ -63,29 +90,155 @@ class BrowserManager:
             except Exception as e:
                 logger.warning("Error stopping playwright: %s", e)
         return False
+
+    def _launch(self) -> None:
+        started = time.monotonic()
+        args = []
+        self._shared_endpoint = None
+        if self.shareable:
+            port = _free_local_port()
+            args.extend([f'--remote-debugging-port={port}', '--remote-debugging-address=127.0.0.1'])
+            self._shared_endpoint = f"http://127.0.0.1:{port}"
+        self.browser = self.profile.launch(self.playwright.chromium, self.headless, args)
+        logger.info(f"Browser launched with profile {self.profile.describe()} in "
+                    f"{time.monotonic() - started:.2f}s, browser RSS {children_rss_mb():.0f} MB")
+
+    @property
+    def can_restart(self) -> bool:
+        """Only a manager that launched Chromium itself can relaunch it."""
+        return bool(self.playwright and not self.cdp_endpoint)
+
+    @traced("browser_restart")
+    def restart(self) -> None:
+        """Close Chromium and launch a new one with the same settings, with a fresh context and page.
+
+        Managers attached through share() lose their browser, so only restart while none is in use.
+        """
+        if not self.can_restart:
+            raise RuntimeError("BrowserManager is attached to another browser and cannot restart it")
+        self._discard_context(logger.debug)
+        if self.browser:
+            try:
+                self.browser.close()
+            except Exception as e:
+                logger.debug("Error closing browser: %s", e)
+        self._launch()
+        self.context = self._new_context()
+        self.page = self.context.new_page()
+
+    @contextmanager
+    def for_run(self):
+        """Prepare a launched (warm) browser for one run: a fresh context and page. The browser, and
+        its CDP port if it is shareable, stay up after the with-block for the next run."""
+        self.reset_context()
+        yield self
+
+    def _new_context(self, storage_state: Optional[Dict[str, Any]] = None) -> "BrowserContext":
+        network_options = self.network.context_options() if self.network else {}
+        context = self.browser.new_context(
+            viewport=self.profile.viewport,
+            device_scale_factor=1.0,
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            storage_state=storage_state,
+            **network_options,
+        )
+        # Installed before the resource policy, whose route runs first and falls back to this one
+        if self.network:
+            self.network.install(context, network_options)
+        if self.resource_policy:
+            self.resource_policy.install(context)
+        context.on("response", _observe_response)
+        if PROFILER.active:
+            PROFILER.start_tracing(context)
+        return context
+
+    def reset_context(self, storage_state: Optional[Dict[str, Any]] = None) -> None:
+        """Replace the current context and page with fresh ones, optionally preloaded with storage state."""
+        self._discard_context(logger.debug)
+        self.context = self._new_context(storage_state)
+        self.page = self.context.new_page()
+
+    @contextmanager
+    def account_context(self):
+        """Fresh context and page for one account. Both are closed when the with-block ends, also on
+        errors, so no cookies, storage, service workers or cache carry over to the next account."""
+        self.reset_context()
+        try:
+            yield self
+        finally:
+            self._discard_context(logger.debug)
+
+    def _discard_context(self, log) -> None:
+        if self.page:
+            try:
+                self.page.close()
+            except Exception as e:
+                log("Error closing page: %s", e)
+        if self.context:
+            self._close_context(log)
+        self.page = None
+        self.context = None
+        self.auth_token = None
+
+    def _close_context(self, log) -> None:
+        if PROFILER.active:
+            PROFILER.stop_tracing(self.context)
+        try:
+            self.context.close()
+        except Exception as e:
+            log("Error closing context: %s", e)
+        if self.network:
+            self.network.closed(self.context)
+
+    @property
+    def can_share(self) -> bool:
+        return bool(self.cdp_endpoint or self._shared_endpoint)
+
+    def share(self) -> "BrowserManager":
+        """New manager attached to this Chromium process with its own BrowserContext.
+
+        Enter it on the thread that will drive it: Playwright sync objects are thread-bound.
+        """
+        endpoint = self.cdp_endpoint or self._shared_endpoint
+        if not endpoint:
+            raise RuntimeError("BrowserManager was not launched with shareable=True")
+        return BrowserManager(headless=self.headless, cdp_endpoint=endpoint, resource_policy=self.resource_policy,
+                              network=self.network, profile=self.profile)
     
-    _NETWORK_RETRY_ERRORS = (
-        "ERR_NETWORK_CHANGED", "ERR_CONNECTION_RESET", "ERR_CONNECTION_REFUSED",
-        "ERR_INTERNET_DISCONNECTED", "ERR_NAME_NOT_RESOLVED", "NS_BINDING_ABORTED"
-    )
+    def navigate(self, url: str, wait_timeout: int = 30000, retries: Optional[int] = None) -> bool:
+        """Go to url through the shared rate limiter, retrying throttled/failed loads with backoff.
 
-    def navigate(self, url: str, wait_timeout: int = 30000, retries: int = 5) -> bool:
+        retries is the number of extra attempts after the first (default: LIMITER.max_retries - 1; 0
+        tries once). Returns False when the last attempt was still throttled or a gateway error.
+        """
         if not self.page:
             logger.warning("navigate called but no page available")
             return False
-        for attempt in range(retries):
+        attempts = 1 + (max(0, LIMITER.max_retries - 1) if retries is None else max(0, retries))
+        origin = origin_of(url)
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
             try:
-                self.page.goto(url, wait_until='networkidle', timeout=wait_timeout)
-                time.sleep(2)
-                return True
+                with LIMITER.request(origin), waits.timed("navigate"):
+                    response = self.page.goto(url, wait_until='networkidle', timeout=wait_timeout)
             except Exception as e:
                 err_str = str(e)
-                if attempt < retries - 1 and any(x in err_str for x in self._NETWORK_RETRY_ERRORS):
-                    wait = (attempt + 1) * 10
-                    logger.warning(f"Navigation failed ({err_str[:80]}...), retry in {wait}s ({attempt + 1}/{retries})")
-                    time.sleep(wait)
-                else:
-                    raise
+                LIMITER.observe(origin, error=err_str)
+                if not last_attempt and is_retryable_error(err_str):
+                    LIMITER.sleep_backoff(f"navigate {origin}", attempt, err_str)
+                    continue
+                raise
+            status = response.status if response else None
+            LIMITER.observe(origin, status=status)
+            if status in (429, 502, 503, 504):
+                if last_attempt:
+                    logger.warning(f"navigate {url}: still HTTP {status} after {attempts} attempt(s)")
+                    return False
+                LIMITER.sleep_backoff(f"navigate {origin}", attempt, f"HTTP {status}",
+                                      retry_after_seconds(response.headers.get("retry-after")))
+                continue
+            waits.settle(self.page)
+            return True
         return False
 
     def wait_for_captcha(self, timeout: int = 30) -> bool:
@@ -105,8 +258,8 @@ class BrowserManager:
                 if element:
                     logger.warning(f"CAPTCHA detected with selector: {selector}")
                     wait_sec = min(60, max(10, timeout))
-                    logger.warning("Please complete CAPTCHA manually. Waiting %s seconds...", wait_sec)
-                    time.sleep(wait_sec)
+                    logger.warning("Please complete CAPTCHA manually. Waiting up to %s seconds...", wait_sec)
+                    waits.try_wait_for_selector(self.page, selector, timeout=wait_sec * 1000, state="detached")
                     return True
         except Exception as e:
             logger.debug(f"Error checking CAPTCHA: {e}")
@@ -116,24 +269,15 @@ class BrowserManager:
         if not self.page:
             return False
         try:
-            self.page.wait_for_selector(selector, timeout=timeout)
+            waits.wait_for_selector(self.page, selector, timeout=timeout)
             return True
         except Exception:
             return False
     
-    def wait_for_api_response(self, url_pattern: str, timeout: int = 10000):
-        page = self.page
-        if not page:
-            return None
-        try:
-            with page.expect_response(
-                lambda response: url_pattern in response.url,
-                timeout=timeout
-            ) as response_info:
-                response = response_info.value
-                logger.info(f"API response received: {response.url} - Status: {response.status}")
-                return response
-        except Exception as e:
-            logger.debug(f"Timeout waiting for API response: {e}")
-            return None
+    def wait_for_api_response(self, url_pattern: str, method: Optional[str] = None, timeout: int = 10000):
+        """Context manager: the with-block performs the action, then the first response whose URL contains
+        url_pattern is awaited. The yielded object's .response is that response (None on timeout)."""
+        if not self.page:
+            raise RuntimeError("No browser page")
+        return waits.expect_response(self.page, url_pattern, method=method, timeout=timeout)
 
@@ -1,21 +1,53 @@
+import argparse
 import os
 import sys
+from contextlib import ExitStack, nullcontext
 from pathlib import Path
 import logging
 import re
-import requests
-from typing import Optional, Dict, Any, Tuple, List
+from typing import TYPE_CHECKING, Optional, Dict, Any, Tuple, List
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.config import Config
+from src.meroshare import site, tracing, waits
+from src.meroshare.asba import AsbaListing, issue_key
+from src.meroshare.ipo_catalog import IpoCatalog
+from src.meroshare.journal import JOURNAL
+from src.meroshare.launch import LaunchProfile
+from src.meroshare.netreplay import NetworkTape
+from src.meroshare.option_index import OPTIONS
+from src.meroshare.procstat import MemoryGuard
+from src.meroshare.profiling import PROFILER, add_profile_arguments, profiled
+from src.meroshare.resources import RESOURCE_STATS, ResourcePolicy
+from src.meroshare.ratelimit import LIMITER
+from src.meroshare.rules import RULES, RuleSet
+from src.meroshare.notify import FLUSH_TIMEOUT_SEC, flush_all, get_dispatcher
 from src.meroshare.browser import BrowserManager
 from src.meroshare.login import MeroShareLogin
+from src.meroshare.session_cache import SessionCache
+from src.meroshare.parallel import ConcurrentAccountRunner
+from src.meroshare.preflight import validate_config
+from src.meroshare.sharding import ShardedAccountRunner, ShardJob
+
+if TYPE_CHECKING:
+    # The API client pulls in requests; it is imported only when client: api is used
+    from src.meroshare.api import MeroShareAPI
 
-MEROSHARE_LOGIN_URL = "https://meroshare.cdsc.com.np/#/login"
 ASBA_LINK_SELECTOR = 'a[href="#/asba"]'
-TELEGRAM_REQUEST_TIMEOUT = 10
 ASBA_NAVIGATE_TIMEOUT_MS = 15000
+ASBA_READY_SELECTOR = "table tbody tr, tbody tr, app-no-records-found"
+ISSUE_FORM_SELECTOR = "#appliedKitta, app-issue"
+TRANSACTION_PIN_SELECTOR = '#transactionPIN, input[name="transactionPIN"], input[id*="transaction"], input[name*="transaction"]'
+FORM_STEP_TIMEOUT_MS = 15000
+ACCOUNT_SELECT_SELECTOR = 'select[name*="account" i], select[id*="account" i]'
+BANK_OPTIONS_LOADED_JS = '() => document.querySelectorAll("#selectBank option[value]:not([value=\\"\\"])").length > 0'
+APPLY_API_PATH = "/applicantForm/share/apply"
+APPLY_RESPONSE_TIMEOUT_MS = 30000
+ACCOUNT_OPTIONS_LOADED_JS = (
+    '(sel) => { const s = document.querySelector(sel); '
+    'return !s || s.querySelectorAll("option:not([value=\\"\\"]):not([value=\\"0\\"])").length > 0; }'
+)
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -35,47 +67,30 @@ def _tg(s: str) -> str:
 
 
 def send_telegram_notification(config: Config, message: str) -> bool:
-    """Send Telegram notification."""
+    """Queue a Telegram notification; it is sent in the background (see notify.TelegramDispatcher)."""
     try:
         telegram_config = config.get_telegram()
-        bot_token = telegram_config.get("bot_token")
-        chat_id = telegram_config.get("chat_id")
-        
-        if not bot_token or not chat_id or bot_token == "YOUR_BOT_TOKEN" or chat_id == "YOUR_CHAT_ID":
-            return False
-        
-        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        payload = {
-            "chat_id": chat_id,
-            "text": message,
-            "parse_mode": "HTML"
-        }
-        
-        response = requests.post(url, json=payload, timeout=TELEGRAM_REQUEST_TIMEOUT)
-        if response.status_code == 200:
-            logger.info("Telegram notification sent")
-            return True
-        else:
-            logger.warning("Failed to send Telegram notification: %s", response.status_code)
+        dispatcher = get_dispatcher(telegram_config.get("bot_token"), telegram_config.get("chat_id"))
+        if not dispatcher:
             return False
+        return dispatcher.send(message)
     except Exception as e:
-        logger.warning("Error sending Telegram notification: %s", e)
+        logger.warning("Error queueing Telegram notification: %s", e)
         return False
 
 
+@tracing.traced("navigate_to_asba")
 def navigate_to_asba(browser: BrowserManager) -> bool:
     """Navigate to ASBA section. Returns True on success."""
     try:
         page = browser.page
         if not page:
             return False
-        page.wait_for_timeout(3000)
-        asba_link = page.wait_for_selector(ASBA_LINK_SELECTOR, timeout=ASBA_NAVIGATE_TIMEOUT_MS)
+        asba_link = waits.wait_for_selector(page, ASBA_LINK_SELECTOR, timeout=ASBA_NAVIGATE_TIMEOUT_MS)
         if not asba_link:
             return False
         asba_link.click()
-        page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(2000)
+        waits.try_wait_for_selector(page, ASBA_READY_SELECTOR, timeout=ASBA_NAVIGATE_TIMEOUT_MS)
         logger.info("Navigated to ASBA section")
         return True
     except Exception as e:
@@ -83,76 +98,46 @@ def navigate_to_asba(browser: BrowserManager) -> bool:
         return False
 
 
-def check_for_available_ipos(browser: BrowserManager) -> Tuple[bool, List]:
-    """Check if IPOs are available and return list of IPO rows."""
+def back_to_asba(browser: BrowserManager) -> None:
+    """Go back from an issue form to the ASBA listing and wait for it to render."""
+    if not browser.page:
+        return
+    browser.page.go_back()
+    waits.try_wait_for_selector(browser.page, ASBA_READY_SELECTOR, timeout=ASBA_NAVIGATE_TIMEOUT_MS)
+
+
+@tracing.traced("check_for_available_ipos", outcome=lambda r: "found" if r[0] else "empty")
+def check_for_available_ipos(browser: BrowserManager) -> Tuple[bool, AsbaListing]:
+    """Check if IPOs are available and return the ASBA listing (rows indexed by company)."""
     try:
         if not browser.page:
-            return False, []
+            return False, AsbaListing(browser.page, [])
         
-        browser.page.wait_for_load_state("networkidle")
-        browser.page.wait_for_timeout(3000)
-        try:
-            browser.page.wait_for_selector("table tbody tr, tbody tr, app-no-records-found", timeout=15000)
-        except Exception:
-            pass
-        browser.page.wait_for_timeout(2000)
+        waits.wait_for_load(browser.page)
+        waits.try_wait_for_selector(browser.page, ASBA_READY_SELECTOR, timeout=15000)
         
         no_records = browser.page.query_selector("app-no-records-found .fallback-title-message, .no-records, [class*='no-record']")
         if no_records:
             text = no_records.inner_text().strip()
             if "No Record" in text or "no record" in text.lower():
                 logger.info("No IPO available currently")
-                return False, []
+                return False, AsbaListing(browser.page, [])
         
-        # Try multiple selectors to find IPO rows
-        ipo_rows = []
-        
-        # Try table rows first
-        ipo_rows = browser.page.query_selector_all("table tbody tr")
-        logger.debug(f"Found {len(ipo_rows)} rows using 'table tbody tr' selector")
-        
-        # If no table rows, try other selectors
-        if not ipo_rows:
-            ipo_rows = browser.page.query_selector_all("tbody tr")
-            logger.debug(f"Found {len(ipo_rows)} rows using 'tbody tr' selector")
-        
-        if not ipo_rows:
-            ipo_rows = browser.page.query_selector_all("tr[role='row']")
-            logger.debug(f"Found {len(ipo_rows)} rows using 'tr[role=row]' selector")
-        
-        if not ipo_rows:
-            # Try finding any clickable rows that might contain IPO info
-            all_rows = browser.page.query_selector_all("tr, .card, [role='row'], .row")
-            # Filter rows that might be IPO entries (have buttons or links)
-            for row in all_rows:
-                row_text = row.inner_text().lower() if row else ""
-                if any(keyword in row_text for keyword in ['apply', 'ipo', 'issue', 'share']):
-                    ipo_rows.append(row)
-            logger.debug(f"Found {len(ipo_rows)} rows using filtered approach")
-        
-        # Filter out header rows
-        if ipo_rows:
-            filtered_rows = []
-            for row in ipo_rows:
-                row_text = row.inner_text().lower() if row else ""
-                # Skip header rows
-                if not any(header in row_text for header in ['company', 'issue', 'type', 'price', 'action']):
-                    if any(keyword in row_text for keyword in ['apply', 'view', 'details']) or len(row_text) > 20:
-                        filtered_rows.append(row)
-            ipo_rows = filtered_rows if filtered_rows else ipo_rows
+        # One evaluate finds, tags and parses every row (see asba.EXTRACT_ROWS_JS)
+        ipo_rows = AsbaListing.extract(browser.page)
         
         if not ipo_rows:
             logger.warning("No IPO rows found with any selector")
             page_html = browser.page.content()
             if "apply" in page_html.lower() or "ipo" in page_html.lower():
                 logger.warning("Page has 'apply'/'ipo' text but no rows - table may still be loading or structure changed")
-            return False, []
+            return False, AsbaListing(browser.page, [])
         
         logger.info(f"Found {len(ipo_rows)} IPO row(s) on ASBA page")
         return True, ipo_rows
     except Exception as e:
         logger.error(f"Error checking for IPOs: {e}", exc_info=True)
-        return False, []
+        return False, AsbaListing(browser.page, [])
 
 
 def extract_ipo_details_from_form(browser: BrowserManager) -> Optional[Dict[str, Any]]:
@@ -209,71 +194,37 @@ def extract_ipo_details_from_form(browser: BrowserManager) -> Optional[Dict[str,
         return None
 
 
-def check_ipo_conditions(ipo_details: Dict[str, Any]) -> bool:
-    """Check if IPO meets the required conditions."""
-    if not ipo_details:
-        return False
-    
-    share_type = ipo_details.get("share_type", "").strip().upper()
-    share_group = ipo_details.get("share_group", "").strip().upper()
-    price = ipo_details.get("price")
-    
-    if share_type != "IPO":
+def check_ipo_conditions(ipo_details: Dict[str, Any], rules: Optional[RuleSet] = None) -> bool:
+    """Check if IPO meets the configured matching rules (see rules.py)."""
+    failure = (rules or RULES.default).failure(ipo_details)
+    if failure:
+        logger.info(f"IPO does not match: {failure}")
         return False
-    if share_group != "ORDINARY SHARES":
-        return False
-    if price != 100:
-        return False
-    
     logger.info("IPO conditions met!")
     return True
 
 
-def find_and_click_apply_button(browser: BrowserManager, ipo_row) -> bool:
-    """Find and click the Apply button for an IPO."""
+def find_and_click_apply_button(browser: BrowserManager, ipo_rows: AsbaListing, ipo_row: Dict[str, Any]) -> bool:
+    """Click the Apply button of a listing row and wait for the issue form."""
     try:
         if not browser.page:
             return False
-        buttons = ipo_row.query_selector_all('button, a, [role="button"], td button, td a')
-        apply_button = None
-        
-        for btn in buttons:
-            try:
-                btn_text = btn.inner_text().lower().strip()
-                if 'apply' in btn_text:
-                    apply_button = btn
-                    break
-            except Exception:
-                continue
-        
-        if not apply_button:
-            row_text = ipo_row.inner_text().lower()
-            if 'apply' in row_text:
-                try:
-                    ipo_row.evaluate('el => el.click()')
-                    browser.page.wait_for_load_state("networkidle")
-                    browser.page.wait_for_timeout(2000)
-                    if browser.page.query_selector('app-issue, form, #appliedKitta'):
-                        browser.page.evaluate('window.scrollTo(0, 0)')
-                        browser.page.wait_for_timeout(500)
-                        return True
-                except Exception:
-                    pass
-        
-        if apply_button:
-            apply_button.click()
-            browser.page.wait_for_load_state("networkidle")
-            browser.page.wait_for_timeout(2000)
-            if browser.page.query_selector('app-issue, form, #appliedKitta'):
-                browser.page.evaluate('window.scrollTo(0, 0)')
-                browser.page.wait_for_timeout(500)
-                return True
+        target = ipo_rows.apply_button(ipo_row)
+        if not target and 'apply' in (ipo_row.get("text") or "").lower():
+            target = ipo_rows.row_handle(ipo_row)
+        if not target:
+            return False
+        target.click()
+        if waits.try_wait_for_selector(browser.page, ISSUE_FORM_SELECTOR, timeout=FORM_STEP_TIMEOUT_MS):
+            browser.page.evaluate('window.scrollTo(0, 0)')
+            return True
         return False
     except Exception as e:
         logger.error(f"Error clicking Apply button: {e}")
         return False
 
 
+@tracing.traced("fill_ipo_form")
 def fill_ipo_form(browser: BrowserManager, account_config: Dict[str, Any]) -> bool:
     """Fill the IPO application form with account details."""
     try:
@@ -281,7 +232,6 @@ def fill_ipo_form(browser: BrowserManager, account_config: Dict[str, Any]) -> bo
             return False
         logger.info("Filling IPO application form...")
         browser.page.evaluate('window.scrollTo(0, 0)')
-        browser.page.wait_for_timeout(500)
         
         crn = account_config.get("crn")
         bank_name = account_config.get("bank_name")
@@ -294,93 +244,83 @@ def fill_ipo_form(browser: BrowserManager, account_config: Dict[str, Any]) -> bo
         kitta_input = browser.page.query_selector('#appliedKitta, input[name="appliedKitta"]')
         if kitta_input:
             kitta_input.scroll_into_view_if_needed()
-            browser.page.wait_for_timeout(300)
             kitta_input.fill(applied_kitta)
-            browser.page.wait_for_timeout(500)
+            waits.settle(browser.page)
         
         bank_select = browser.page.query_selector('#selectBank, select[name="selectBank"]')
         if bank_select:
             bank_select.scroll_into_view_if_needed()
-            browser.page.wait_for_timeout(500)
-            try:
-                browser.page.wait_for_function(
-                    '() => document.querySelectorAll("#selectBank option[value]:not([value=\\"\\"])").length > 0',
-                    timeout=15000
-                )
-            except Exception:
+            if not waits.wait_for_function(browser.page, BANK_OPTIONS_LOADED_JS, timeout=15000):
                 try:
                     bank_select.click()
-                    browser.page.wait_for_timeout(2000)
-                    browser.page.wait_for_function(
-                        '() => document.querySelectorAll("#selectBank option[value]:not([value=\\"\\"])").length > 0',
-                        timeout=10000
-                    )
                 except Exception as e:
-                    logger.warning(f"Bank options did not load: {e}")
-            options = bank_select.query_selector_all("option[value]:not([value=''])")
-            bank_selected = False
-            for option in options:
-                option_text = option.inner_text().strip()
-                bank_name_clean = bank_name.upper().replace("LIMITED", "").replace("LTD", "").strip()
-                option_text_clean = option_text.upper().replace("LIMITED", "").replace("LTD", "").strip()
-                if (bank_name.upper() in option_text.upper() or
-                    bank_name_clean in option_text_clean or
-                    option_text_clean in bank_name_clean):
-                    bank_select.select_option(value=option.get_attribute("value"))
-                    bank_select.evaluate('el => el.dispatchEvent(new Event("change", { bubbles: true }))')
-                    browser.page.wait_for_timeout(2000)
-                    bank_selected = True
-                    break
-            if not bank_selected:
+                    logger.debug(f"Bank dropdown click failed: {e}")
+                if not waits.wait_for_function(browser.page, BANK_OPTIONS_LOADED_JS, timeout=10000):
+                    logger.warning("Bank options did not load")
+            bank_option = OPTIONS.resolve("bank", bank_select, bank_name)
+            if not bank_option:
                 logger.error("No bank option matched or dropdown had no options - check bank_name in config")
                 return False
-            account_select = browser.page.query_selector('select[name*="account" i], select[id*="account" i]')
+            bank_select.select_option(value=bank_option[0])
+            bank_select.evaluate('el => el.dispatchEvent(new Event("change", { bubbles: true }))')
+            # Selecting the bank triggers the account-number lookup; wait for it to fill the dropdown
+            waits.wait_for_function(browser.page, ACCOUNT_OPTIONS_LOADED_JS, arg=ACCOUNT_SELECT_SELECTOR, timeout=10000)
+            account_select = browser.page.query_selector(ACCOUNT_SELECT_SELECTOR)
             if account_select:
                 account_select.scroll_into_view_if_needed()
-                browser.page.wait_for_timeout(300)
-                browser.page.wait_for_timeout(1000)
                 account_options = account_select.query_selector_all('option:not([value=""]):not([value="0"])')
                 if account_options:
                     first_account_value = account_options[0].get_attribute("value")
                     account_select.select_option(value=first_account_value)
-                    browser.page.wait_for_timeout(500)
+                    waits.settle(browser.page)
         
         crn_input = browser.page.query_selector('#crnNumber, input[name="crnNumber"]')
         if crn_input:
             crn_input.scroll_into_view_if_needed()
-            browser.page.wait_for_timeout(300)
             crn_input.fill(crn)
-            browser.page.wait_for_timeout(500)
         
         disclaimer_checkbox = browser.page.query_selector('#disclaimer, input[name="disclaimer"]')
         if disclaimer_checkbox and not disclaimer_checkbox.is_checked():
             disclaimer_checkbox.scroll_into_view_if_needed()
-            browser.page.wait_for_timeout(300)
             disclaimer_checkbox.check()
-            browser.page.wait_for_timeout(500)
-        browser.page.wait_for_timeout(1500)
+        waits.settle(browser.page)
         return True
     except Exception as e:
         logger.error(f"Error filling IPO form: {e}", exc_info=True)
         return False
 
 
-def submit_ipo_form(browser: BrowserManager, account_config: Dict[str, Any]) -> bool:
-    """Submit the IPO application form."""
+def apply_outcome(response) -> Tuple[bool, str]:
+    """(success, server message) of an apply API response."""
+    try:
+        body = response.json()
+    except Exception:
+        body = None
+    message = ""
+    if isinstance(body, dict):
+        message = body.get("message") or body.get("errorMessage") or ""
+    if not message:
+        message = f"HTTP {response.status}"
+    return response.status < 400, str(message)[:150]
+
+
+@tracing.traced("submit_ipo_form")
+def submit_ipo_form(browser: BrowserManager, account_config: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+    """Submit the IPO application form. Returns (success, failure_reason).
+
+    The outcome is read from the apply API response the Apply click triggers, not from the page.
+    """
     try:
         if not browser.page:
-            return False
+            return False, "No browser page"
         browser.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-        browser.page.wait_for_timeout(500)
         
         logger.info("Looking for Proceed button...")
-        try:
-            browser.page.wait_for_selector(
-                'button[type="submit"]:not([disabled]), button:has-text("Proceed"):not([disabled])',
-                timeout=10000
-            )
-        except Exception:
-            pass
+        waits.try_wait_for_selector(
+            browser.page,
+            'button[type="submit"]:not([disabled]), button:has-text("Proceed"):not([disabled])',
+            timeout=10000
+        )
         proceed_button = browser.page.query_selector(
             'button[type="submit"]:not([disabled]), button:has-text("Proceed"):not([disabled])'
         )
@@ -394,12 +334,10 @@ def submit_ipo_form(browser: BrowserManager, account_config: Dict[str, Any]) ->
             logger.info("Found Proceed button, clicking...")
             # Scroll page first, then try to click
             browser.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-            browser.page.wait_for_timeout(500)
             
             # Try regular click first
             try:
                 proceed_button.scroll_into_view_if_needed(timeout=5000)
-                browser.page.wait_for_timeout(300)
                 proceed_button.click()
             except Exception as e:
                 logger.warning(f"Regular click failed: {e}, using JavaScript click...")
@@ -412,16 +350,12 @@ def submit_ipo_form(browser: BrowserManager, account_config: Dict[str, Any]) ->
                         }
                     }
                 ''')
-            
-            browser.page.wait_for_load_state("networkidle")
-            browser.page.wait_for_timeout(3000)
         
         logger.info("Looking for Transaction PIN input...")
         # Wait for transaction PIN input to appear
         try:
-            transaction_pin_input = browser.page.wait_for_selector(
-                '#transactionPIN, input[name="transactionPIN"], input[id*="transaction"], input[name*="transaction"]',
-                timeout=10000
+            transaction_pin_input = waits.wait_for_selector(
+                browser.page, TRANSACTION_PIN_SELECTOR, timeout=FORM_STEP_TIMEOUT_MS
             )
             logger.info("Transaction PIN input found")
         except Exception as e:
@@ -433,26 +367,19 @@ def submit_ipo_form(browser: BrowserManager, account_config: Dict[str, Any]) ->
             transaction_pin = account_config.get("transaction_pin")
             if not transaction_pin:
                 logger.error("Transaction PIN not found in account config")
-                return False
+                return False, "Transaction PIN not found in account config"
             
             # Scroll to input and fill it
             browser.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-            browser.page.wait_for_timeout(500)
             
             try:
                 transaction_pin_input.scroll_into_view_if_needed(timeout=5000)
             except Exception:
                 logger.warning("Could not scroll to transaction PIN input, trying anyway...")
             
-            browser.page.wait_for_timeout(500)
-            
-            # Clear any existing value and fill
+            # fill() replaces any existing value
             transaction_pin_input.click()
-            browser.page.wait_for_timeout(200)
-            transaction_pin_input.fill("")  # Clear first
-            browser.page.wait_for_timeout(200)
             transaction_pin_input.fill(transaction_pin)
-            browser.page.wait_for_timeout(500)
             
             # Verify it was filled
             filled_value = transaction_pin_input.input_value()
@@ -461,23 +388,20 @@ def submit_ipo_form(browser: BrowserManager, account_config: Dict[str, Any]) ->
             else:
                 logger.warning(f"Transaction PIN may not have been filled correctly. Expected: {transaction_pin}, Got: {filled_value}")
             
-            logger.info("Waiting for Apply button to enable...")
-            browser.page.wait_for_timeout(2000)  # Wait longer for button to enable
-            
             # Try multiple approaches to find and click the Apply button
             logger.info("Looking for Apply button...")
             apply_button = None
             
             # Wait for button to become enabled (Angular might need time)
-            try:
-                logger.info("Waiting for Apply button to become enabled...")
-                browser.page.wait_for_function(
-                    '() => { const btn = document.querySelector("button.btn-primary[type=\\"submit\\"]"); return btn && !btn.disabled && btn.offsetParent !== null; }',
-                    timeout=15000
-                )
+            logger.info("Waiting for Apply button to become enabled...")
+            if waits.wait_for_function(
+                browser.page,
+                '() => { const btn = document.querySelector("button.btn-primary[type=\\"submit\\"]"); return btn && !btn.disabled && btn.offsetParent !== null; }',
+                timeout=15000
+            ):
                 logger.info("Button is now enabled and visible")
-            except Exception as e:
-                logger.warning(f"Button may not be enabled yet: {e}")
+            else:
+                logger.warning("Button may not be enabled yet")
             
             # Try multiple selectors based on the HTML structure
             selectors = [
@@ -517,80 +441,54 @@ def submit_ipo_form(browser: BrowserManager, account_config: Dict[str, Any]) ->
             
             if apply_button:
                 logger.info("Found Apply button, clicking...")
-                browser.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                browser.page.wait_for_timeout(500)
-                
-                # Try scrolling into view
-                try:
-                    apply_button.scroll_into_view_if_needed(timeout=5000)
-                except Exception:
-                    pass
+                with browser.wait_for_api_response(APPLY_API_PATH, method="POST",
+                                                   timeout=APPLY_RESPONSE_TIMEOUT_MS) as submitted:
+                    browser.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
                 
-                browser.page.wait_for_timeout(500)
+                    # Try scrolling into view
+                    try:
+                        apply_button.scroll_into_view_if_needed(timeout=5000)
+                    except Exception:
+                        pass
                 
-                # Try clicking with JavaScript as fallback
-                try:
-                    apply_button.click()
-                    logger.info("Clicked Apply button successfully")
-                except Exception as e:
-                    logger.warning(f"Regular click failed: {e}, trying JavaScript click...")
-                    # Use JavaScript click if regular click fails - use the specific selector
-                    browser.page.evaluate('''
-                        () => {
-                            const btn = document.querySelector('button.btn-primary[type="submit"]:not([disabled])') || 
-                                        document.querySelector('button.btn-gap.btn-primary[type="submit"]:not([disabled])') ||
-                                        document.querySelector('button[type="submit"]:not([disabled])');
-                            if (btn) {
-                                btn.click();
+                    # Try clicking with JavaScript as fallback
+                    try:
+                        apply_button.click()
+                        logger.info("Clicked Apply button successfully")
+                    except Exception as e:
+                        logger.warning(f"Regular click failed: {e}, trying JavaScript click...")
+                        # Use JavaScript click if regular click fails - use the specific selector
+                        browser.page.evaluate('''
+                            () => {
+                                const btn = document.querySelector('button.btn-primary[type="submit"]:not([disabled])') || 
+                                            document.querySelector('button.btn-gap.btn-primary[type="submit"]:not([disabled])') ||
+                                            document.querySelector('button[type="submit"]:not([disabled])');
+                                if (btn) {
+                                    btn.click();
+                                }
                             }
-                        }
-                    ''')
-                    logger.info("JavaScript click executed")
-                
-                logger.info("Waiting for page to load after submission...")
-                browser.page.wait_for_load_state("networkidle", timeout=15000)
-                browser.page.wait_for_timeout(3000)
-                
-                error_indicators = browser.page.query_selector_all('.error, .alert-danger, [class*="error"]')
-                for indicator in error_indicators:
-                    text = indicator.inner_text().lower()
-                    if any(word in text for word in ["error", "failed", "invalid"]):
-                        logger.error(f"Error: {indicator.inner_text()[:200]}")
-                        return False
-                
-                page_text = browser.page.inner_text("body").lower()
-                if any(word in page_text for word in ["error occurred", "failed", "invalid"]):
-                    return False
-                
-                transaction_pin_still_present = browser.page.query_selector('#transactionPIN')
-                if transaction_pin_still_present:
-                    return False
-                
-                success_indicators = browser.page.query_selector_all('.success, .alert-success, [class*="success"]')
-                for indicator in success_indicators:
-                    text = indicator.inner_text().lower()
-                    if any(word in text for word in ["success", "submitted", "applied"]):
-                        logger.info("IPO application submitted successfully!")
-                        return True
-                
-                if "success" in page_text or "submitted" in page_text:
-                    logger.info("IPO application submitted successfully!")
-                    return True
-                
-                logger.info("No explicit success message, but transaction PIN is gone - assuming success")
-                return True
+                        ''')
+                        logger.info("JavaScript click executed")
+                if submitted.response is None:
+                    return False, "No response from the apply API"
+                success, message = apply_outcome(submitted.response)
+                if success:
+                    logger.info(f"IPO application submitted successfully: {message}")
+                    return True, None
+                logger.error(f"Application rejected: {message}")
+                return False, message
             else:
                 logger.error("Apply button not found or not clickable")
-                return False
+                return False, "Apply button not found"
         else:
             if not proceed_clicked:
                 logger.error("Proceed button was not clicked and Transaction PIN not found - form likely incomplete")
-                return False
-            logger.info("No Transaction PIN input found - form may have been submitted already or different flow")
-            return True
+                return False, "Proceed button was not clicked (form incomplete)"
+            logger.error("Transaction PIN step did not appear after Proceed")
+            return False, "Transaction PIN step did not appear"
     except Exception as e:
         logger.error(f"Error submitting IPO form: {e}", exc_info=True)
-        return False
+        return False, str(e)[:150]
 
 
 def get_ipo_company_name(browser: BrowserManager) -> str:
@@ -607,7 +505,7 @@ def get_ipo_company_name(browser: BrowserManager) -> str:
         return "Unknown Company"
 
 
-def process_ipo_for_account(browser: BrowserManager, account_config: Dict[str, Any], ipo_rows: List, config: Config) -> bool:
+def process_ipo_for_account(browser: BrowserManager, account_config: Dict[str, Any], ipo_rows: AsbaListing, config: Config) -> bool:
     """Process IPOs and apply for matching ones for a single account."""
     if not browser.page:
         return False
@@ -615,26 +513,24 @@ def process_ipo_for_account(browser: BrowserManager, account_config: Dict[str, A
         try:
             logger.info(f"Processing IPO {idx + 1}...")
             
-            if not find_and_click_apply_button(browser, row):
+            if not find_and_click_apply_button(browser, ipo_rows, row):
                 continue
             
             ipo_details = extract_ipo_details_from_form(browser)
             if not ipo_details:
                 if browser.page:
-                    browser.page.go_back()
-                    browser.page.wait_for_load_state("networkidle")
+                    back_to_asba(browser)
                 continue
             
             if not check_ipo_conditions(ipo_details):
                 if browser.page:
-                    browser.page.go_back()
-                    browser.page.wait_for_load_state("networkidle")
+                    back_to_asba(browser)
                 continue
             
             company_name = get_ipo_company_name(browser)
             
             if fill_ipo_form(browser, account_config):
-                if submit_ipo_form(browser, account_config):
+                if submit_ipo_form(browser, account_config)[0]:
                     logger.info(f"Successfully applied for IPO {idx + 1}")
                     
                     kitta = account_config.get('applied_kitta', '10')
@@ -646,16 +542,13 @@ def process_ipo_for_account(browser: BrowserManager, account_config: Dict[str, A
                     ))
                     return True
             
-            if browser.page:
-                browser.page.wait_for_timeout(2000)
             navigate_to_asba(browser)
             
         except Exception as e:
             logger.error(f"Error processing IPO {idx + 1}: {e}", exc_info=True)
             try:
                 if browser.page:
-                    browser.page.go_back()
-                    browser.page.wait_for_load_state("networkidle")
+                    back_to_asba(browser)
             except Exception:
                 navigate_to_asba(browser)
             continue
@@ -663,70 +556,92 @@ def process_ipo_for_account(browser: BrowserManager, account_config: Dict[str, A
     return False
 
 
-def find_matching_ipo(browser: BrowserManager, ipo_rows: List) -> Optional[Dict[str, Any]]:
-    """Find a matching IPO and return its details."""
+@tracing.traced("find_matching_ipo", outcome=lambda r: "matched" if r else "no_match")
+def find_matching_ipo(browser: BrowserManager, ipo_rows: AsbaListing, catalog: Optional[IpoCatalog] = None,
+                      rules: Optional[RuleSet] = None) -> Optional[Dict[str, Any]]:
+    """Find a matching IPO and return its details.
+
+    All rows are screened against the listing-level rules first; only the remaining ones get their
+    form opened. Issues already opened this run (catalog) are judged from their stored details.
+    """
     if not browser.page:
         return None
-    for idx, row in enumerate(ipo_rows):
+    rules = rules or RULES.default
+    candidates, rejected = rules.screen(ipo_rows)
+    for row, rule_name in rejected:
+        logger.info(f"Skipping {row.get('company')}: {rule_name} does not match (listing)")
+    for idx, row in candidates:
         try:
             logger.info(f"Checking IPO {idx + 1}...")
+            entry = catalog.lookup(row) if catalog else None
+            if entry and not rules.matches(entry["details"]):
+                logger.info(f"Skipping {row.get('company')}: already checked this run, does not match")
+                continue
             
-            if not find_and_click_apply_button(browser, row):
+            if not find_and_click_apply_button(browser, ipo_rows, row):
                 continue
             
+            cached = catalog.verify_form(browser.page, row) if catalog else None
+            if cached and rules.matches(cached):
+                ipo_details = dict(cached, row_index=idx)
+                return ipo_details
+            
             ipo_details = extract_ipo_details_from_form(browser)
             if not ipo_details:
-                browser.page.go_back()
-                browser.page.wait_for_load_state("networkidle")
+                back_to_asba(browser)
                 continue
             
-            if check_ipo_conditions(ipo_details):
-                company_name = get_ipo_company_name(browser)
-                ipo_details['company_name'] = company_name
+            ipo_details['company_name'] = get_ipo_company_name(browser)
+            ipo_details['issue_key'] = issue_key(row)
+            matched = check_ipo_conditions(ipo_details, rules)
+            if catalog:
+                catalog.record(ipo_details, matched)
+            if matched:
                 ipo_details['row_index'] = idx
                 return ipo_details
             
-            browser.page.go_back()
-            browser.page.wait_for_load_state("networkidle")
+            back_to_asba(browser)
         except Exception as e:
             logger.error(f"Error checking IPO {idx + 1}: {e}")
             try:
                 if browser.page:
-                    browser.page.go_back()
-                    browser.page.wait_for_load_state("networkidle")
+                    back_to_asba(browser)
             except Exception:
                 navigate_to_asba(browser)
             continue
-    logger.info(f"Checked {len(ipo_rows)} IPO(s), none matched (Price=100, Type=IPO, Ordinary Shares)")
+    logger.info(f"Checked {len(ipo_rows)} IPO(s) ({len(candidates)} form(s) opened), none matched ({rules.describe()})")
     return None
 
 
-def apply_for_ipo_with_account(browser: BrowserManager, account_config: Dict[str, Any], config: Config, ipo_index: int, company_name: Optional[str] = None) -> Tuple[bool, Optional[str]]:
-    """Apply for IPO with a specific account. Returns (success, failure_reason)."""
+@tracing.traced("apply")
+def apply_for_ipo_with_account(browser: BrowserManager, account_config: Dict[str, Any], config: Config, ipo_index: int,
+                               company_name: Optional[str] = None,
+                               catalog: Optional[IpoCatalog] = None,
+                               matching_key: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+    """Apply for IPO with a specific account. Returns (success, failure_reason).
+
+    The row is found by matching_key (the issue_key of the matched issue), else by the exact company
+    name; ipo_index is only used when neither is known.
+
+    When catalog already holds the issue details, only the form fingerprint is checked; the details are
+    judged against this account's rules and the kitta comes from its rules (see rules.py).
+    """
     try:
         if not browser.page:
             return False, "No browser page"
         navigate_to_asba(browser)
-        browser.page.wait_for_load_state("networkidle")
-        browser.page.wait_for_timeout(3000)
         has_ipos, ipo_rows = check_for_available_ipos(browser)
         if not has_ipos or not ipo_rows:
             logger.error("No IPOs found on page - may have already been applied")
             return False, "No IPOs on page (may already have applied)"
         logger.info(f"Found {len(ipo_rows)} IPO row(s) on page")
-        row = None
-        if company_name:
-            for r in ipo_rows:
-                try:
-                    row_text = r.inner_text()
-                    if company_name.lower() in row_text.lower():
-                        row = r
-                        logger.info(f"Found IPO by company name: {company_name}")
-                        break
-                except Exception as e:
-                    logger.debug("Row inner_text failed: %s", e)
-                    continue
-        if not row:
+        row = ipo_rows.find(company_name, matching_key)
+        if row:
+            logger.info(f"Found IPO on the listing: {company_name}")
+        elif matching_key or company_name:
+            logger.error(f"{company_name or matching_key} is not on this account's ASBA listing")
+            return False, "Issue not on the ASBA listing (may already have applied)"
+        else:
             if ipo_index < len(ipo_rows):
                 row = ipo_rows[ipo_index]
                 logger.info(f"Using IPO at index {ipo_index}")
@@ -736,28 +651,48 @@ def apply_for_ipo_with_account(browser: BrowserManager, account_config: Dict[str
         if not row:
             logger.error("Could not find IPO row")
             return False, "Could not find IPO row"
-        if not find_and_click_apply_button(browser, row):
+        if not find_and_click_apply_button(browser, ipo_rows, row):
             return False, "Apply button not found or click failed"
-        ipo_details = extract_ipo_details_from_form(browser)
-        if not ipo_details or not check_ipo_conditions(ipo_details):
-            return False, "IPO details/conditions check failed"
-        company_name = get_ipo_company_name(browser)
+        rules = RULES.for_account(account_config)
+        ipo_details = catalog.verify_form(browser.page, row) if catalog else None
+        if ipo_details:
+            logger.info(f"Issue matches cached details for {ipo_details.get('company_name')}, skipping re-extraction")
+            company_name = ipo_details.get("company_name") or company_name
+            matched = check_ipo_conditions(ipo_details, rules)
+        else:
+            ipo_details = extract_ipo_details_from_form(browser)
+            if not ipo_details:
+                return False, "IPO details/conditions check failed"
+            company_name = get_ipo_company_name(browser)
+            ipo_details["company_name"] = company_name
+            ipo_details["issue_key"] = issue_key(row)
+            matched = check_ipo_conditions(ipo_details, rules)
+            if catalog:
+                catalog.record(ipo_details, matched)
+        if not matched:
+            return False, f"IPO does not match rules: {rules.failure(ipo_details)}"
+        account_config = dict(account_config, applied_kitta=rules.kitta(ipo_details, account_config))
+        issue = dict(row, issue_open=ipo_details.get("issue_open"))
         fill_result = fill_ipo_form(browser, account_config)
         if not fill_result:
             logger.error(f"Failed to fill IPO form for account: {account_display_name(account_config)}")
+            JOURNAL.record(account_config, issue, "failed", "Form fill failed")
             return False, "Form fill failed"
         logger.info("Form filled successfully, now submitting...")
-        submit_result = submit_ipo_form(browser, account_config)
-        if not submit_result:
-            logger.error(f"Failed to submit IPO form for account: {account_display_name(account_config)}")
-            return False, "Submit failed"
+        submitted, reason = submit_ipo_form(browser, account_config)
+        if not submitted:
+            logger.error(f"Failed to submit IPO form for account: {account_display_name(account_config)}: {reason}")
+            reason = f"Submit failed: {reason}"
+            JOURNAL.record(account_config, issue, "failed", reason)
+            return False, reason
+        JOURNAL.record(account_config, issue, "applied")
         logger.info(f"Successfully applied for IPO with account: {account_display_name(account_config)}")
-        kitta = account_config.get('applied_kitta', '10')
+        kitta = account_config['applied_kitta']
         send_telegram_notification(config, (
             "✅ <b>Applied</b>\n\n"
             f"📊 <b>{_tg(company_name)}</b>\n"
             f"👤 {_tg(account_display_name(account_config))} · 📦 {kitta} kitta\n"
-            "💰 Rs. 100/share · Ordinary Shares"
+            f"💰 Rs. {ipo_details.get('price') or 100}/share · {_tg(ipo_details.get('share_group') or 'Ordinary Shares')}"
         ))
         return True, None
     except Exception as e:
@@ -765,23 +700,332 @@ def apply_for_ipo_with_account(browser: BrowserManager, account_config: Dict[str
         return False, str(e)[:150]
 
 
-def main():
-    """Main function: Check with first account, if IPO found, apply with all accounts."""
+def _has_required_account_config(account_config: Dict[str, Any]) -> bool:
+    return not Config.account_errors(account_config)
+
+
+def report_config_errors(config: Config, errors: List[str], account_errors: Dict[int, List[str]]) -> None:
+    """Log every config problem and send them in one Telegram message."""
+    accounts = config.accounts
+    lines = list(errors)
+    for idx, problems in sorted(account_errors.items()):
+        account_config = accounts[idx - 1]
+        name = account_display_name(account_config) if isinstance(account_config, dict) else "N/A"
+        lines.extend(f"Account {idx} ({name}): {problem}" for problem in problems)
+    for line in lines:
+        logger.error(f"Config: {line}")
+    if lines:
+        send_telegram_notification(config, "❌ <b>Config error</b>\n\n" + "\n".join(_tg(line) for line in lines))
+
+
+def process_other_account(browser: BrowserManager, account_idx: int, account_config: Dict[str, Any], total_accounts: int,
+                          config: Config, matching_ipo: Optional[Dict[str, Any]], ipo_index: int, company_name: str,
+                          reset_page: bool = True, catalog: Optional[IpoCatalog] = None) -> bool:
+    """Log in with one additional account and apply. Returns True if the application was submitted.
+
+    With reset_page the account runs in a fresh context of browser (see BrowserManager.account_context);
+    otherwise browser is already the account's own (a shared manager from ConcurrentAccountRunner).
+    """
+    try:
+        logger.info(f"\n{'='*50}")
+        logger.info(f"Applying with Account {account_idx}/{total_accounts}: {account_display_name(account_config)}")
+        logger.info(f"{'='*50}")
+
+        if not _has_required_account_config(account_config):
+            logger.error(f"Account {account_idx}: Missing required config")
+            return False
+
+        account_view = config.for_account(account_config)
+        with browser.account_context() if reset_page else nullcontext(browser):
+            if not browser.page or not browser.context:
+                return False
+
+            logger.info("Logging in...")
+            result = MeroShareLogin(browser, account_view).login()
+            if not result and result.retryable:
+                logger.warning(f"Login failed ({result.message}), retrying in a fresh context...")
+                try:
+                    browser.reset_context()
+                    result = MeroShareLogin(browser, account_view).login()
+                except Exception as retry_err:
+                    logger.warning(f"Retry failed: {retry_err}")
+            if not result:
+                reason = result.message or "Login failed"
+                logger.error(f"Login failed: {reason}")
+                send_telegram_notification(config, (
+                    f"❌ <b>Login failed</b> — Account {account_idx}\n\n"
+                    f"👤 {_tg(account_display_name(account_config))}\n"
+                    f"Reason: {_tg(reason)}"
+                ))
+                return False
+
+            acc_ipo_index = ipo_index
+            acc_company_name = company_name
+            acc_key = matching_ipo.get("issue_key") if matching_ipo else None
+            if not matching_ipo:
+                if not navigate_to_asba(browser):
+                    return False
+                has_acc_ipos, acc_ipo_rows = check_for_available_ipos(browser)
+                if not has_acc_ipos or not acc_ipo_rows:
+                    logger.info(f"Account {account_idx}: No IPOs on their ASBA page")
+                    return False
+                acc_matching = find_matching_ipo(browser, acc_ipo_rows, catalog, RULES.for_account(account_config))
+                if not acc_matching:
+                    logger.info(f"Account {account_idx}: No matching IPO for them")
+                    return False
+                acc_ipo_index = acc_matching.get('row_index', 0)
+                acc_company_name = acc_matching.get('company_name', 'Unknown')
+                acc_key = acc_matching.get("issue_key")
+                logger.info(f"Account {account_idx}: Found matching IPO: {acc_company_name}")
+
+            ok, reason = apply_for_ipo_with_account(browser, account_config, config, acc_ipo_index, acc_company_name,
+                                                    catalog, acc_key)
+            if ok:
+                return True
+            send_telegram_notification(config, (
+                f"❌ <b>Apply failed</b> — Account {account_idx}\n\n"
+                f"👤 {_tg(account_display_name(account_config))}\n"
+                f"Reason: {_tg(reason or 'unknown')}"
+            ))
+            return False
+
+    except Exception as e:
+        logger.error(f"Error processing account {account_idx}: {e}", exc_info=True)
+        err_msg = str(e)[:180]
+        send_telegram_notification(config, (
+            f"❌ <b>Error</b> — Account {account_idx}\n\n"
+            f"👤 {_tg(account_display_name(account_config))}\n"
+            f"{_tg(err_msg)}"
+        ))
+        return False
+
+
+def send_run_summary(config: Config, applied_count: int, total_accounts: int, already_applied: int = 0) -> None:
+    """already_applied: accounts skipped because the journal shows an earlier application."""
+    earlier = f" ({already_applied} already applied earlier)" if already_applied else ""
+    logger.info(f"Completed: Applied with {applied_count}/{total_accounts} account(s){earlier}")
+    if applied_count > 0 or already_applied:
+        send_telegram_notification(config, (
+            "✅ <b>Done</b>\n\n"
+            f"Applied with <b>{applied_count}/{total_accounts}</b> account(s){earlier}."
+        ))
+    else:
+        send_telegram_notification(config, (
+            "⚠️ <b>Done — none applied</b>\n\n"
+            f"<b>0/{total_accounts}</b> applications submitted.\n"
+            "Check messages above for failure reasons."
+        ))
+
+
+def ipo_details_from_api(issue: Dict[str, Any], detail: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an applicable-issue row plus its detail record to the dict extract_ipo_details_from_form returns."""
+    return {
+        "share_type": issue.get("shareTypeName") or "",
+        "share_group": issue.get("shareGroupName") or "",
+        "price": detail.get("sharePerUnit"),
+        "issue_open": issue.get("issueOpenDate"),
+        "issue_close": issue.get("issueCloseDate"),
+        "issue_manager": detail.get("clientName"),
+        "min_qty": detail.get("minUnit"),
+        "max_qty": detail.get("maxUnit"),
+        "company_name": issue.get("companyName") or "Unknown",
+        "company_share_id": issue.get("companyShareId"),
+    }
+
+
+def find_matching_ipo_via_api(api: "MeroShareAPI", rules: Optional[RuleSet] = None) -> Optional[Dict[str, Any]]:
+    """First open issue this account has not applied for and that meets the rules."""
+    rules = rules or RULES.default
+    issues = [issue for issue in api.applicable_issues()
+              # listing shows an action (edit/reapply) once the account has applied
+              if not issue.get("action")]
+    candidates, _ = rules.screen({"share_type": issue.get("shareTypeName"), "share_group": issue.get("shareGroupName")}
+                                 for issue in issues)
+    for idx, _ in candidates:
+        issue = issues[idx]
+        ipo_details = ipo_details_from_api(issue, api.issue_detail(issue["companyShareId"]))
+        if check_ipo_conditions(ipo_details, rules):
+            return ipo_details
+    logger.info(f"Checked {len(issues)} issue(s) via API, none open to apply and matching")
+    return None
+
+
+def apply_for_ipo_via_api(api: "MeroShareAPI", account_config: Dict[str, Any], config: Config,
+                          ipo_details: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+    """Apply through the backend API. Returns (success, failure_reason).
+
+    Transport and server errors before the apply POST propagate, so the caller can retry the account
+    in the browser. Once the POST may have reached the server it is never resubmitted: without a
+    definite answer the journal records the attempt as 'unknown' and this returns a failure.
+    """
+    import requests
+    from src.meroshare.api import MeroShareAPIError
+    try:
+        bank_id = api.bank_id_for(account_config.get("bank_name") or "")
+        if not bank_id:
+            return False, "No bank matched bank_name"
+        bank_accounts = api.bank_accounts(bank_id)
+        if not bank_accounts:
+            return False, "No bank account linked to the selected bank"
+        bank_account = bank_accounts[0]
+        own = api.own_detail()
+        kitta = RULES.for_account(account_config).kitta(ipo_details, account_config)
+        payload = {
+            "demat": own.get("demat"),
+            "boid": own.get("boid") or account_config.get("boid"),
+            "accountNumber": bank_account.get("accountNumber"),
+            "customerId": bank_account.get("id"),
+            "accountBranchId": bank_account.get("accountBranchId"),
+            "accountTypeId": bank_account.get("accountTypeId"),
+            "appliedKitta": kitta,
+            "crnNumber": account_config.get("crn"),
+            "transactionPIN": str(account_config.get("transaction_pin") or ""),
+            "companyShareId": ipo_details.get("company_share_id"),
+            "bankId": bank_id,
+        }
+        try:
+            result = api.apply(payload)
+        except requests.ConnectTimeout:
+            # no connection was made, so nothing was submitted
+            raise
+        except (requests.RequestException, ValueError) as e:
+            return _api_apply_unknown(account_config, ipo_details, type(e).__name__)
+        except MeroShareAPIError as e:
+            if e.status is None or e.status >= 500:
+                return _api_apply_unknown(account_config, ipo_details, f"HTTP {e.status}")
+            raise
+        logger.info(f"API apply response: {result.get('message')}")
+        JOURNAL.record(account_config, ipo_details, "applied")
+        send_telegram_notification(config, (
+            "✅ <b>Applied</b>\n\n"
+            f"📊 <b>{_tg(ipo_details.get('company_name') or 'Unknown')}</b>\n"
+            f"👤 {_tg(account_display_name(account_config))} · 📦 {kitta} kitta\n"
+            f"💰 Rs. {ipo_details.get('price') or 100}/share · {_tg(ipo_details.get('share_group') or 'Ordinary Shares')}"
+        ))
+        return True, None
+    except MeroShareAPIError as e:
+        if e.status is None or e.status >= 500:
+            raise
+        JOURNAL.record(account_config, ipo_details, "failed", str(e)[:150])
+        return False, str(e)[:150]
+
+
+def _api_apply_unknown(account_config: Dict[str, Any], ipo_details: Dict[str, Any], error: str) -> Tuple[bool, str]:
+    reason = f"Apply request sent but no definite answer ({error}); check MeroShare before applying again"
+    logger.error(f"{account_display_name(account_config)}: {reason}")
+    JOURNAL.record(account_config, ipo_details, "unknown", reason)
+    return False, reason
+
+
+def _api_login(api: "MeroShareAPI", account_config: Dict[str, Any], sessions: SessionCache) -> bool:
+    """Reuse the token cached by an earlier browser or API login while the backend accepts it, else log in
+    and cache the new token."""
+    key = SessionCache.account_key(account_config)
+    entry = sessions.load(key) or {}
+    if entry.get("token") and api.resume(entry["token"]):
+        logger.info("[API] Cached session token still valid, skipping login")
+        return True
+    if not api.login(account_config.get("username"), account_config.get("password"),
+                     account_config.get("dp_name") or ""):
+        return False
+    sessions.save(key, entry.get("storage_state"), api.token)
+    return True
+
+
+def run_accounts_via_api(config: Config, accounts: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+    """Apply with every account over plain HTTP.
+
+    Returns (applied_count, fallback_accounts): accounts whose run failed on transport or server
+    errors before an application was sent are handed back so the browser flow can retry them.
+    """
+    import requests
+    from src.meroshare.api import MEROSHARE_API_URL, MeroShareAPI, MeroShareAPIError, pooled_session
+
+    api_url = config.get("api_url", MEROSHARE_API_URL)
+    sessions = SessionCache.from_config(config)
+    applied_count = 0
+    fallback: List[Dict[str, Any]] = []
+    with pooled_session() as session:
+        for account_idx, account_config in enumerate(accounts, 1):
+            name = account_display_name(account_config)
+            if not _has_required_account_config(account_config):
+                logger.error(f"Account {account_idx}: Missing required config")
+                continue
+            api = MeroShareAPI(api_url, session=session)
+            try:
+                logger.info(f"[API] Account {account_idx}/{len(accounts)}: {name}")
+                if not _api_login(api, account_config, sessions):
+                    logger.error(f"Login failed: {api.last_error}")
+                    send_telegram_notification(config, (
+                        f"❌ <b>Login failed</b> — Account {account_idx}\n\n"
+                        f"👤 {_tg(name)}\n"
+                        f"Reason: {_tg(api.last_error or 'Login failed')}"
+                    ))
+                    continue
+                ipo_details = find_matching_ipo_via_api(api, RULES.for_account(account_config))
+                if not ipo_details:
+                    logger.info(f"Account {account_idx}: No matching IPO (may already have applied)")
+                    continue
+                ok, reason = apply_for_ipo_via_api(api, account_config, config, ipo_details)
+                if ok:
+                    applied_count += 1
+                else:
+                    send_telegram_notification(config, (
+                        f"❌ <b>Apply failed</b> — Account {account_idx}\n\n"
+                        f"👤 {_tg(name)}\n"
+                        f"Reason: {_tg(reason or 'unknown')}"
+                    ))
+            except (requests.RequestException, MeroShareAPIError, ValueError) as e:
+                logger.warning(f"[API] Account {account_idx} failed ({e}), will retry in browser")
+                fallback.append(account_config)
+            finally:
+                # a cached token is kept alive for the next run; logging out would revoke it
+                if not sessions.enabled:
+                    api.logout()
+    return applied_count, fallback
+
+
+def main(warm_browser: Optional[BrowserManager] = None, network: Optional[NetworkTape] = None):
+    """Main function: Check with first account, if IPO found, apply with all accounts.
+
+    warm_browser: an already launched BrowserManager to run in, e.g. from the daemon; it gets a fresh
+    context (see BrowserManager.for_run) and is left open afterwards.
+    network: record or replay the run's traffic (default: the network_replay config section). The
+    run then launches its own browser, since a warm one cannot be routed through the tape. Replay
+    also switches off the API client, notifications, the journal and the caches (NetworkTape.sandbox).
+    """
+    waits.WAIT_STATS.reset()
+    RESOURCE_STATS.reset()
+    LIMITER.reset()
+    guard: Optional[MemoryGuard] = None
     try:
         config = Config()
-        
-        meroshare_config = config.get_meroshare()
-        accounts = meroshare_config.get("accounts")
-        
-        if not accounts:
-            accounts = [meroshare_config]
-        elif not isinstance(accounts, list):
-            accounts = [accounts]
-        
-        if len(accounts) == 0:
-            logger.error("No accounts configured")
+        network = network or NetworkTape.from_config(config.get("network_replay"))
+        if network:
+            config = network.sandbox(config)
+            if warm_browser:
+                logger.info(f"Network {network.mode} mode: launching a separate browser instead of the warm one")
+                warm_browser = None
+        waits.configure(config.get("min_settle_ms", 0))
+        site.configure(config.get("meroshare_url"))
+        LIMITER.configure(config.get("rate_limit"))
+        JOURNAL.configure(config.get("journal"))
+        OPTIONS.configure(config.get("option_cache"))
+        tracing.TRACER.start_run(config.get("trace"))
+        guard = MemoryGuard.from_config(config.get("memory_guard"))
+
+        # Every problem in the file is reported here, before a browser is launched
+        errors, account_errors, rules = validate_config(config)
+        report_config_errors(config, errors, account_errors)
+        accounts = config.accounts
+        if errors or 1 in account_errors:
+            logger.error("Config errors prevent this run" if errors else "Missing required config in check account")
             return False
-        
+        RULES.install(rules)
+
+        # Accounts with config errors were reported above and are left out
+        invalid_accounts = {id(accounts[idx - 1]) for idx in account_errors}
+
         # Use first account to check for IPOs
         check_account = accounts[0]
         other_accounts = accounts[1:] if len(accounts) > 1 else []
@@ -796,28 +1040,51 @@ def main():
             f"👥 Accounts: <b>{len(accounts)}</b> (apply with all if IPO matches)"
         ))
         
-        if not all([check_account.get("username"), check_account.get("password"), 
-                   check_account.get("crn"), check_account.get("bank_name")]):
-            logger.error("Missing required config in check account")
-            send_telegram_notification(config, "❌ <b>Config error</b>\n\nMissing required MeroShare/account settings. Check config.")
-            return False
-        
+        total_accounts = len(accounts)
+        applied_via_api = 0
+        if str(config.get("client", "browser")).lower() == "api":
+            applied_via_api, fallback_accounts = run_accounts_via_api(config, accounts)
+            if not fallback_accounts:
+                send_run_summary(config, applied_via_api, total_accounts)
+                return True
+            logger.warning(f"API unavailable for {len(fallback_accounts)} account(s), falling back to browser")
+            accounts = fallback_accounts
+            check_account = accounts[0]
+            other_accounts = accounts[1:]
+            if not _has_required_account_config(check_account):
+                logger.error("Missing required config in check account")
+                return False
+
         headless = config.get("headless", True)
         if not os.environ.get("DISPLAY"):
             headless = True
-        with BrowserManager(headless=headless) as browser:
+        concurrency = max(1, int(config.get("concurrency", 1) or 1))
+        processes = max(1, int(config.get("processes", 1) or 1))
+        use_shards = processes > 1 and len(other_accounts) > 1
+        # The CDP port share() needs is only opened for a run that applies concurrently in this browser
+        shareable = concurrency > 1 and bool(other_accounts) and not use_shards
+        if warm_browser:
+            if shareable and not warm_browser.can_share:
+                logger.info("Warm browser was launched without a CDP port, applying one account at a time")
+            browser_cm = warm_browser.for_run()
+        else:
+            browser_cm = BrowserManager(headless=headless, shareable=shareable,
+                                        resource_policy=ResourcePolicy.from_config(config.get("resource_policy")),
+                                        network=network,
+                                        profile=LaunchProfile.from_config(config.get("browser_profile")))
+        with browser_cm as browser, \
+                ExitStack() as account_workers, \
+                tracing.account(account_display_name(check_account)):
             if not browser.page:
                 logger.error("Browser page not initialized")
                 return False
             
             # Step 1: Login with first account and check for IPOs
-            temp_config = Config()
-            temp_config.config['meroshare'] = check_account
-            login = MeroShareLogin(browser, temp_config)
+            login = MeroShareLogin(browser, config.for_account(check_account))
             
             logger.info("Logging in with check account...")
             if not login.login():
-                reason = getattr(login, "last_error", "") or "Login failed"
+                reason = login.last_error or "Login failed"
                 logger.error(f"Login failed: {reason}")
                 send_telegram_notification(config, (
                     "❌ <b>Login failed</b>\n\n"
@@ -829,13 +1096,14 @@ def main():
             if not navigate_to_asba(browser):
                 return False
             
+            catalog = IpoCatalog()
             has_ipos, ipo_rows = check_for_available_ipos(browser)
             logger.info(f"IPO check result: has_ipos={has_ipos}, rows_found={len(ipo_rows) if ipo_rows else 0}")
 
             matching_ipo = None
             if has_ipos and ipo_rows:
                 logger.info(f"Searching for matching IPO among {len(ipo_rows)} IPO(s)...")
-                matching_ipo = find_matching_ipo(browser, ipo_rows)
+                matching_ipo = find_matching_ipo(browser, ipo_rows, catalog, RULES.for_account(check_account))
             elif not has_ipos and other_accounts:
                 logger.info("Account 1: No IPOs on page (may already have applied). Will try other accounts.")
                 send_telegram_notification(config, (
@@ -845,13 +1113,53 @@ def main():
             elif not has_ipos:
                 send_telegram_notification(config, "🔍 <b>No IPOs</b>\n\nNo open IPO on ASBA at the moment.")
                 return True
-            applied_count = 0
+            applied_count = applied_via_api
             ipo_index = 0
             company_name = "Unknown"
-
             if matching_ipo:
                 company_name = matching_ipo.get('company_name', 'Unknown')
                 ipo_index = matching_ipo.get('row_index', 0)
+
+            # Skip accounts the journal shows as already applied for every open issue we target
+            pending_accounts = [(idx, account_config) for idx, account_config in enumerate(other_accounts, 2)
+                                if id(account_config) not in invalid_accounts]
+            already_applied = 0
+            matching_row = ipo_rows[ipo_index] if matching_ipo and ipo_index < len(ipo_rows) else None
+            target_issues = JOURNAL.target_issues(ipo_rows or [], matching_row)
+            check_account_done = JOURNAL.has_applied_all(check_account, target_issues)
+            if target_issues:
+                pending_accounts, done_accounts = JOURNAL.split_pending(pending_accounts, target_issues)
+                already_applied = len(done_accounts) + (1 if check_account_done else 0)
+                if already_applied:
+                    logger.info(f"Journal: {already_applied} account(s) already applied for "
+                                f"{', '.join(target_issues)}, skipping them")
+
+            # Other accounts start on their own processes/contexts while the check account applies below
+            runner = None
+            if use_shards and len(pending_accounts) > 1:
+                logger.info(f"Applying with {len(pending_accounts)} account(s) across {processes} processes")
+                job = ShardJob(config, len(accounts), matching_ipo, ipo_index, company_name,
+                               headless=headless, concurrency=concurrency, network=network,
+                               profile=PROFILER.settings())
+                runner = account_workers.enter_context(
+                    ShardedAccountRunner(pending_accounts, processes, job))
+            elif pending_accounts and concurrency > 1 and browser.can_share:
+                logger.info(f"Applying with {len(pending_accounts)} account(s), up to {concurrency} at a time")
+
+                def worker(account_browser: BrowserManager, account_idx: int, account_config: Dict[str, Any]) -> bool:
+                    with tracing.account(account_display_name(account_config)):
+                        return process_other_account(
+                            account_browser, account_idx, account_config, len(accounts), config,
+                            matching_ipo, ipo_index, company_name, reset_page=False, catalog=catalog,
+                        )
+
+                runner = account_workers.enter_context(ConcurrentAccountRunner(browser, worker, concurrency))
+                for account_idx, account_config in pending_accounts:
+                    runner.submit(account_idx, account_config)
+
+            if matching_ipo and check_account_done:
+                logger.info(f"Check account already applied for {company_name} (journal), skipping it")
+            elif matching_ipo:
                 logger.info(f"Found matching IPO: {company_name}")
                 price = matching_ipo.get("price") or 100
                 share_type = matching_ipo.get("share_type") or "IPO"
@@ -876,11 +1184,10 @@ def main():
                 lines.extend(["", "Applying with all accounts…"])
                 send_telegram_notification(config, "\n".join(lines))
                 logger.info(f"Applying with check account: {account_display_name(check_account)}")
-                ok, reason = apply_for_ipo_with_account(browser, check_account, config, ipo_index, company_name)
+                ok, reason = apply_for_ipo_with_account(browser, check_account, config, ipo_index, company_name, catalog,
+                                                        matching_ipo.get("issue_key"))
                 if ok:
                     applied_count += 1
-                    if browser.page:
-                        browser.page.wait_for_timeout(3000)
                 else:
                     send_telegram_notification(config, (
                         "❌ <b>Apply failed</b> — Account 1\n\n"
@@ -895,118 +1202,65 @@ def main():
                         "May already have applied. Checking other accounts…"
                     ))
 
-            # Step 3: Apply with all other accounts (2 and 3)
-            for account_idx, account_config in enumerate(other_accounts, 2):
-                try:
-                    logger.info(f"\n{'='*50}")
-                    logger.info(f"Applying with Account {account_idx}/{len(accounts)}: {account_display_name(account_config)}")
-                    logger.info(f"{'='*50}")
-                    
-                    if not all([account_config.get("username"), account_config.get("password"), 
-                               account_config.get("crn"), account_config.get("bank_name")]):
-                        logger.error(f"Account {account_idx}: Missing required config")
-                        continue
-                    
-                    if not browser.page or not browser.context:
-                        continue
-                    try:
-                        browser.context.clear_cookies()
-                        if browser.page:
-                            browser.page.close()
-                        browser.page = browser.context.new_page()
-                        browser.navigate(MEROSHARE_LOGIN_URL)
-                        browser.page.wait_for_timeout(5000)
-                    except Exception as nav_err:
-                        logger.warning(f"New page / navigate failed: {nav_err}")
-                    temp_config = Config()
-                    temp_config.config['meroshare'] = account_config
-
-                    def do_login():
-                        login_obj = MeroShareLogin(browser, temp_config)
-                        return login_obj.login(), getattr(login_obj, "last_error", "") or "Login failed"
-
-                    logger.info("Logging in...")
-                    ok, reason = do_login()
-                    if not ok:
-                        logger.warning("Login failed, retrying with fresh page...")
-                        try:
-                            browser.context.clear_cookies()
-                            if browser.page:
-                                browser.page.close()
-                            browser.page = browser.context.new_page()
-                            browser.navigate(MEROSHARE_LOGIN_URL)
-                            browser.page.wait_for_timeout(5000)
-                            ok, reason = do_login()
-                        except Exception as retry_err:
-                            logger.warning(f"Retry failed: {retry_err}")
-                    if not ok:
-                        logger.error(f"Login failed: {reason}")
-                        send_telegram_notification(config, (
-                            f"❌ <b>Login failed</b> — Account {account_idx}\n\n"
-                            f"👤 {_tg(account_display_name(account_config))}\n"
-                            f"Reason: {_tg(reason)}"
-                        ))
-                        continue
-
-                    acc_ipo_index = ipo_index
-                    acc_company_name = company_name
-                    if not matching_ipo:
-                        if not navigate_to_asba(browser):
-                            continue
-                        has_acc_ipos, acc_ipo_rows = check_for_available_ipos(browser)
-                        if not has_acc_ipos or not acc_ipo_rows:
-                            logger.info(f"Account {account_idx}: No IPOs on their ASBA page")
-                            continue
-                        acc_matching = find_matching_ipo(browser, acc_ipo_rows)
-                        if not acc_matching:
-                            logger.info(f"Account {account_idx}: No matching IPO for them")
-                            continue
-                        acc_ipo_index = acc_matching.get('row_index', 0)
-                        acc_company_name = acc_matching.get('company_name', 'Unknown')
-                        logger.info(f"Account {account_idx}: Found matching IPO: {acc_company_name}")
-
-                    ok, reason = apply_for_ipo_with_account(browser, account_config, config, acc_ipo_index, acc_company_name)
-                    if ok:
-                        applied_count += 1
-                        if browser.page:
-                            browser.page.wait_for_timeout(3000)
-                    else:
-                        send_telegram_notification(config, (
-                            f"❌ <b>Apply failed</b> — Account {account_idx}\n\n"
-                            f"👤 {_tg(account_display_name(account_config))}\n"
-                            f"Reason: {_tg(reason or 'unknown')}"
-                        ))
-                    
-                except Exception as e:
-                    logger.error(f"Error processing account {account_idx}: {e}", exc_info=True)
-                    err_msg = str(e)[:180]
-                    send_telegram_notification(config, (
-                        f"❌ <b>Error</b> — Account {account_idx}\n\n"
-                        f"👤 {_tg(account_display_name(account_config))}\n"
-                        f"{_tg(err_msg)}"
-                    ))
-                    continue
-            
-            logger.info(f"Completed: Applied with {applied_count}/{len(accounts)} account(s)")
-            if applied_count > 0:
-                send_telegram_notification(config, (
-                    "✅ <b>Done</b>\n\n"
-                    f"Applied with <b>{applied_count}/{len(accounts)}</b> account(s)."
-                ))
+            # Step 3: Apply with all other accounts
+            if runner is not None:
+                applied_count += runner.wait()
             else:
-                send_telegram_notification(config, (
-                    "⚠️ <b>Done — none applied</b>\n\n"
-                    f"<b>0/{len(accounts)}</b> applications submitted.\n"
-                    "Check messages above for failure reasons."
-                ))
+                guard.start()
+                for account_idx, account_config in pending_accounts:
+                    with tracing.account(account_display_name(account_config)):
+                        if process_other_account(
+                            browser, account_idx, account_config, len(accounts), config,
+                            matching_ipo, ipo_index, company_name, catalog=catalog,
+                        ):
+                            applied_count += 1
+                    if guard.check(f"account {account_idx}") and browser.can_restart:
+                        browser.restart()
+                        guard.start()
+            
+            send_run_summary(config, applied_count, total_accounts, already_applied)
             return True
         
     except Exception as e:
         logger.error(f"Failed: {e}", exc_info=True)
         send_telegram_notification(config, f"❌ <b>Error</b>\n\n{_tg(str(e)[:250])}")
         return False
+    finally:
+        logger.info(waits.WAIT_STATS.report())
+        logger.info(RESOURCE_STATS.report())
+        logger.info(LIMITER.report())
+        if network and network.report():
+            logger.info(network.report())
+        if guard and guard.report():
+            logger.info(guard.report())
+        tracing.TRACER.finish_run()
+        flush_all(FLUSH_TIMEOUT_SEC)
 
 
 if __name__ == "__main__":
-    success = main()
+    parser = argparse.ArgumentParser(description="Check MeroShare ASBA and apply with all configured accounts")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep one session open and apply when a new matching issue appears")
+    parser.add_argument("--validate-config", action="store_true",
+                        help="Check config.yaml and exit, without starting a browser")
+    parser.add_argument("--preflight", action="store_true",
+                        help="Check config.yaml and that MeroShare is reachable, without starting a browser")
+    parser.add_argument("--record", metavar="DIR", help="Record the run's network traffic (scrubbed HAR files) to DIR")
+    parser.add_argument("--replay", metavar="DIR", help="Answer all requests from a recording in DIR (offline)")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="Replay timing: 1 = recorded durations, 10 = ten times faster, 0 = no delays")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    if args.validate_config or args.preflight:
+        from src.meroshare import preflight
+        sys.exit(preflight.run(Config(), network=args.preflight))
+    if args.watch:
+        from src.meroshare.watch import watch
+        watch()
+        sys.exit(0)
+    tape = None
+    if args.record or args.replay:
+        tape = NetworkTape("record" if args.record else "replay", args.record or args.replay, args.replay_speed)
+    with profiled(args):
+        success = main(network=tape)
     sys.exit(0 if success else 1)
@@ -0,0 +1,61 @@
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from src.meroshare.asba import company_key, issue_key
+
+logger = logging.getLogger(__name__)
+
+# Company name and price straight from the issue form, without page.content()/inner_text("body")
+FORM_FINGERPRINT_JS = """
+() => {
+    const nameEl = document.querySelector('.company-name span, [tooltip="Company Name"]');
+    const text = document.body.innerText || '';
+    const m = text.match(/Price per Share[^\\d\\n]*\\n?[^\\d\\n]*(\\d+)/i);
+    return {company: nameEl ? nameEl.innerText.trim() : '', price: m ? parseInt(m[1], 10) : null};
+}
+"""
+
+
+class IpoCatalog:
+    """Run-scoped record of issues already opened and judged, keyed by asba.issue_key of their listing row.
+
+    Filled by the first account that opens an issue form; later accounts reuse the details and only
+    compare the form's company and price fingerprint. Details carry the key as "issue_key" (set by
+    find_matching_ipo), since the form may spell the company differently from the listing. Safe
+    across account threads.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, ipo_details: Dict[str, Any], matched: bool) -> None:
+        key = ipo_details.get("issue_key")
+        if not key:
+            return
+        with self._lock:
+            self._entries[key] = {"details": dict(ipo_details), "matched": matched}
+
+    def lookup(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Entry for the issue of this listing row, if it was judged this run."""
+        with self._lock:
+            return self._entries.get(issue_key(row))
+
+    def verify_form(self, page, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cached details for row if the open form still shows the same company and price, else None.
+        The caller judges them against its own rules, which may differ per account."""
+        entry = self.lookup(row)
+        if not entry:
+            return None
+        try:
+            fingerprint = page.evaluate(FORM_FINGERPRINT_JS) or {}
+        except Exception as e:
+            logger.debug(f"Form fingerprint failed: {e}")
+            return None
+        details = entry["details"]
+        same_company = company_key(fingerprint.get("company")) == company_key(details.get("company_name"))
+        if same_company and fingerprint.get("price") == details.get("price"):
+            return details
+        logger.info(f"Issue form differs from cached details ({fingerprint}), re-validating")
+        return None
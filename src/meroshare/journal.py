@@ -0,0 +1,150 @@
+"""Local SQLite journal of applications, so reruns skip accounts that already applied.
+
+One row per (account, issue): status 'applied' or 'failed', the last reason and a timestamp. Accounts
+are stored as SessionCache.account_key hashes. Issues are keyed by asba.issue_key (company, share type
+and share group as the listing shows them) and matched exactly; an 'applied' row only counts while it
+is younger than ISSUE_WINDOW_SEC, so a later issue of the same company, type and group starts afresh.
+The database runs in WAL mode with a busy timeout and every thread opens its own connection, so
+account threads and shard processes can write at the same time. Settings come from the `journal`
+section of config.yaml.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.meroshare.asba import issue_key
+from src.meroshare.session_cache import SessionCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = os.path.join(os.path.expanduser("~"), ".cache", "meroshare-ipo", "journal.sqlite3")
+BUSY_TIMEOUT_MS = 10000
+# Issues stay open for days; an application older than this was for an earlier issue
+ISSUE_WINDOW_SEC = 30 * 24 * 3600
+
+# Rows of the former `applications` table were keyed by company name alone and are left unread
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issue_applications (
+    account TEXT NOT NULL,
+    issue TEXT NOT NULL,
+    company TEXT,
+    issue_open TEXT,
+    status TEXT NOT NULL,
+    reason TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (account, issue)
+)
+"""
+
+
+class ApplicationJournal:
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH, enabled: bool = True):
+        self._local = threading.local()
+        self.configure({"path": path, "enabled": enabled})
+
+    def configure(self, settings: Optional[Dict[str, Any]] = None) -> None:
+        settings = settings or {}
+        self.enabled = bool(settings.get("enabled", True))
+        self.path = Path(os.path.expanduser(settings.get("path") or DEFAULT_JOURNAL_PATH))
+        self._local = threading.local()
+
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        if not self.enabled:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+                conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.execute("PRAGMA synchronous = NORMAL")
+                conn.execute(SCHEMA)
+            except sqlite3.Error as e:
+                logger.warning(f"Application journal unavailable ({self.path}): {e}")
+                self.enabled = False
+                return None
+            self._local.conn = conn
+        return conn
+
+    def record(self, account_config: Dict[str, Any], issue: Dict[str, Any], status: str,
+               reason: Optional[str] = None) -> None:
+        """Upsert the outcome of one application attempt for issue (a listing row or issue details,
+        optionally with issue_open). Never raises."""
+        key = issue_key(issue)
+        conn = self._conn()
+        if not conn or not key:
+            return
+        now = time.time()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO issue_applications (account, issue, company, issue_open, status, reason, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (account, issue) DO UPDATE SET "
+                    # a later failure (e.g. 'already applied') must not hide an earlier success for the
+                    # same issue; a success for an earlier issue (other open date, or too old) does not count
+                    "status = CASE WHEN issue_applications.status = 'applied' "
+                    "AND issue_applications.updated_at >= ? "
+                    "AND (issue_applications.issue_open IS NULL OR excluded.issue_open IS NULL "
+                    "OR issue_applications.issue_open = excluded.issue_open) "
+                    "THEN 'applied' ELSE excluded.status END, "
+                    "issue_open = COALESCE(excluded.issue_open, issue_applications.issue_open), "
+                    "company = excluded.company, reason = excluded.reason, updated_at = excluded.updated_at",
+                    (SessionCache.account_key(account_config), key, issue.get("company") or issue.get("company_name"),
+                     issue.get("issue_open"), status, reason, now, now - ISSUE_WINDOW_SEC),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write application journal: {e}")
+
+    def applied_issues(self, account_config: Optional[Dict[str, Any]] = None) -> Set[str]:
+        """Issue keys with a recent 'applied' row, for one account or for anyone."""
+        conn = self._conn()
+        if not conn:
+            return set()
+        since = time.time() - ISSUE_WINDOW_SEC
+        try:
+            if account_config is None:
+                rows = conn.execute("SELECT DISTINCT issue FROM issue_applications "
+                                    "WHERE status = 'applied' AND updated_at >= ?", (since,))
+            else:
+                rows = conn.execute("SELECT issue FROM issue_applications "
+                                    "WHERE status = 'applied' AND updated_at >= ? AND account = ?",
+                                    (since, SessionCache.account_key(account_config)))
+            return {row[0] for row in rows}
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read application journal: {e}")
+            return set()
+
+    def target_issues(self, open_rows: Iterable[Dict[str, Any]],
+                      matching_row: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Open issues this tool applies for: the matching listing row plus open issues some account
+        applied for before."""
+        applied = self.applied_issues()
+        matching = issue_key(matching_row) if matching_row else ""
+        targets = [matching] if matching else []
+        for row in open_rows:
+            key = issue_key(row)
+            if key and key not in targets and key in applied:
+                targets.append(key)
+        return targets
+
+    def has_applied_all(self, account_config: Dict[str, Any], issues: List[str]) -> bool:
+        if not issues:
+            return False
+        return set(issues) <= self.applied_issues(account_config)
+
+    def split_pending(self, indexed_accounts: List[Tuple[int, Dict[str, Any]]],
+                      issues: List[str]) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Tuple[int, Dict[str, Any]]]]:
+        """(pending, done): done accounts already applied for every one of issues."""
+        pending, done = [], []
+        for item in indexed_accounts:
+            (done if self.has_applied_all(item[1], issues) else pending).append(item)
+        return pending, done
+
+
+JOURNAL = ApplicationJournal()
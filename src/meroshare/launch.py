@@ -0,0 +1,98 @@
+"""Chromium launch profiles, chosen with the `browser_profile` section of config.yaml.
+
+"default" is the launch the tool always used. "lean" is for small machines where several runs or
+contexts overlap: it asks for the headless shell build (falling back to the bundled Chromium when
+Playwright does not have it), turns off extensions, background networking, component updates and
+sync, and uses a smaller viewport and a capped number of renderer processes.
+Compare the two with `python src/bench/launch_profile.py`.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_ARGS = (
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--no-first-run",
+)
+LEAN_ARGS = (
+    "--disable-extensions",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-domain-reliability",
+    "--disable-client-side-phishing-detection",
+    "--disable-breakpad",
+    "--metrics-recording-only",
+    "--no-default-browser-check",
+    "--mute-audio",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AcceptCHFrame",
+)
+HEADLESS_SHELL_CHANNEL = "chromium-headless-shell"
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {"viewport": {"width": 1280, "height": 720}, "renderer_process_limit": None,
+                "headless_shell": False, "lean_args": False},
+    # 1024 wide keeps the site's desktop layout (the ASBA link is hidden in the narrow one)
+    "lean": {"viewport": {"width": 1024, "height": 640}, "renderer_process_limit": 2,
+             "headless_shell": True, "lean_args": True},
+}
+
+
+class LaunchProfile:
+    """Launch arguments and context viewport for BrowserManager. Plain settings, so it pickles for shards."""
+
+    def __init__(self, name: str = "default", viewport: Optional[Dict[str, int]] = None,
+                 renderer_process_limit: Optional[int] = None, headless_shell: Optional[bool] = None):
+        if name not in PROFILES:
+            raise ValueError(f"browser profile must be one of {', '.join(PROFILES)}, got {name!r}")
+        preset = PROFILES[name]
+        self.name = name
+        viewport = viewport or preset["viewport"]
+        self.viewport = {"width": int(viewport["width"]), "height": int(viewport["height"])}
+        limit = renderer_process_limit if renderer_process_limit is not None else preset["renderer_process_limit"]
+        self.renderer_process_limit = int(limit) if limit else None
+        self.headless_shell = preset["headless_shell"] if headless_shell is None else bool(headless_shell)
+        self.lean_args = preset["lean_args"]
+
+    @classmethod
+    def from_config(cls, settings: Any) -> "LaunchProfile":
+        """Profile from the browser_profile config section: a name, or a mapping with name and overrides."""
+        if not settings:
+            return cls()
+        if isinstance(settings, str):
+            return cls(settings.strip().lower())
+        return cls(
+            str(settings.get("name", "default")).strip().lower(),
+            viewport=settings.get("viewport"),
+            renderer_process_limit=settings.get("renderer_process_limit"),
+            headless_shell=settings.get("headless_shell"),
+        )
+
+    def args(self) -> List[str]:
+        args = list(BASE_ARGS)
+        if self.lean_args:
+            args.extend(LEAN_ARGS)
+        if self.renderer_process_limit:
+            args.append(f"--renderer-process-limit={self.renderer_process_limit}")
+        return args
+
+    def launch(self, chromium, headless: bool, extra_args: Optional[List[str]] = None, timeout: int = 60000):
+        """chromium.launch() with this profile. The headless shell is only asked for in headless runs."""
+        options = {"headless": headless, "args": self.args() + list(extra_args or []), "timeout": timeout}
+        if self.headless_shell and headless:
+            try:
+                return chromium.launch(channel=HEADLESS_SHELL_CHANNEL, **options)
+            except Exception as e:
+                logger.info(f"Headless shell not available ({str(e).splitlines()[0][:120]}), using bundled Chromium")
+        return chromium.launch(**options)
+
+    def describe(self) -> str:
+        limit = f", {self.renderer_process_limit} renderer(s)" if self.renderer_process_limit else ""
+        return f"{self.name} ({self.viewport['width']}x{self.viewport['height']}{limit})"
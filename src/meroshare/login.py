@@ -1,16 +1,82 @@
-from typing import Optional
+from typing import Any, Dict, Optional
 
+from src.meroshare import site, waits
 from src.meroshare.browser import BrowserManager
+from src.meroshare.option_index import OPTIONS
+from src.meroshare.ratelimit import LIMITER
+from src.meroshare.session_cache import SessionCache
+from src.meroshare.tracing import TRACER
 from src.config import Config
 import logging
-import time
 
 logger = logging.getLogger(__name__)
 
-LOGIN_URL = "https://meroshare.cdsc.com.np/#/login"
+SESSION_CHECK_TIMEOUT_MS = 15000
+SESSION_VALID_SELECTOR = "table tbody tr, app-no-records-found"
 LOGIN_FORM_WAIT_TIMEOUT_MS = 15000
 CAPTCHA_WAIT_TIMEOUT_SEC = 30
-POST_LOGIN_WAIT_SEC = 5
+POST_LOGIN_TIMEOUT_MS = 15000
+ROUTE_AWAY_TIMEOUT_MS = 5000
+AUTH_API_PATH = "/meroShare/auth/"
+
+
+class LoginResult:
+    """How a login attempt ended, parsed from the /meroShare/auth/ response. Truthy only on success."""
+
+    SUCCESS = "success"
+    CACHED = "cached"
+    BAD_CREDENTIALS = "bad_credentials"
+    LOCKED = "locked"
+    CAPTCHA = "captcha"
+    SERVER_ERROR = "server_error"
+    FAILED = "failed"  # no auth response: form missing, DP not found, timeout
+
+    # Worth one more attempt on a fresh page; the others would fail the same way (or lock the account)
+    RETRYABLE = (SERVER_ERROR, FAILED)
+
+    def __init__(self, status: str, message: str = "", token: Optional[str] = None,
+                 http_status: Optional[int] = None):
+        self.status = status
+        self.message = message
+        self.token = token
+        self.http_status = http_status
+
+    def __bool__(self) -> bool:
+        return self.status in (self.SUCCESS, self.CACHED)
+
+    def __repr__(self) -> str:
+        return f"LoginResult({self.status!r}, {self.message!r}, http_status={self.http_status})"
+
+    @property
+    def retryable(self) -> bool:
+        return self.status in self.RETRYABLE
+
+    @classmethod
+    def from_response(cls, http_status: int, body: Any, token: Optional[str]) -> "LoginResult":
+        body = body if isinstance(body, dict) else {}
+        message = str(body.get("message") or body.get("errorMessage") or f"HTTP {http_status}")[:150]
+        text = message.lower()
+        if http_status < 400:
+            if body.get("accountExpired") or body.get("dematExpired") or body.get("passwordExpired"):
+                expired = [k[:-len("Expired")] for k in ("accountExpired", "dematExpired", "passwordExpired") if body.get(k)]
+                return cls(cls.LOCKED, f"{', '.join(expired)} expired", http_status=http_status)
+            if not token:
+                return cls(cls.SERVER_ERROR, "Login response had no Authorization token", http_status=http_status)
+            return cls(cls.SUCCESS, message, token, http_status)
+        if "captcha" in text:
+            return cls(cls.CAPTCHA, message, http_status=http_status)
+        if http_status == 423 or any(word in text for word in ("lock", "blocked", "suspend", "disabled", "expired")):
+            return cls(cls.LOCKED, message, http_status=http_status)
+        if http_status >= 500 or http_status == 429:
+            return cls(cls.SERVER_ERROR, message, http_status=http_status)
+        return cls(cls.BAD_CREDENTIALS, message, http_status=http_status)
+
+
+def _response_json(response) -> Optional[Dict[str, Any]]:
+    try:
+        return response.json()
+    except Exception:
+        return None
 
 
 class MeroShareLogin:
@@ -19,36 +85,37 @@ class MeroShareLogin:
         self.config = config
         self.meroshare_config = config.get_meroshare()
         self.last_error: str = ""
+        self.result: Optional[LoginResult] = None
+        self.session_cache = SessionCache.from_config(config)
+        self.session_key = SessionCache.account_key(self.meroshare_config)
+        self._cached_token: Optional[str] = None
 
     def _select_dp_option(self, dp_field, dp_name: Optional[str]):
-        """Select DP option and extract clientId."""
+        """Select DP option (resolved through the option cache) and extract clientId."""
         if not dp_name:
             logger.warning("No dp_name provided for DP selection")
             return None, None
 
-        dp_name_upper = dp_name.upper()
-        for option in dp_field.query_selector_all("option"):
-            option_text = option.inner_text().strip().upper()
-            if dp_name_upper in option_text:
-                option_value = option.get_attribute("value")
-                logger.info(f"Found DP option: {option_text}, value: {option_value}")
-
-                client_id = (
-                    option_value if option_value and option_value.isdigit() else None
-                )
+        hit = OPTIONS.resolve("dp", dp_field, dp_name)
+        if not hit:
+            logger.warning(f"Could not find DP option matching: {dp_name}")
+            return None, None
+        option_value, option_text = hit
+        logger.info(f"Found DP option: {option_text}, value: {option_value}")
 
-                logger.info(f"Extracted client_id: {client_id} (from value)")
+        client_id = (
+            option_value if option_value and option_value.isdigit() else None
+        )
 
-                try:
-                    dp_field.select_option(value=option_value, force=True)
-                    time.sleep(1)
-                    return option_value, client_id
-                except Exception as e:
-                    logger.error(f"Error selecting DP option: {e}")
-                    return None, None
+        logger.info(f"Extracted client_id: {client_id} (from value)")
 
-        logger.warning(f"Could not find DP option matching: {dp_name}")
-        return None, None
+        try:
+            dp_field.select_option(value=option_value, force=True)
+            waits.settle(self.browser.page)
+            return option_value, client_id
+        except Exception as e:
+            logger.error(f"Error selecting DP option: {e}")
+            return None, None
 
     def _setup_ajax_interceptors(self, client_id: str) -> None:
         """Set up AJAX interceptors to inject clientId into network requests."""
@@ -93,31 +160,85 @@ class MeroShareLogin:
         """
         )
 
-    def login(self) -> bool:
-        """Perform login to MeroShare. Returns True on success, sets self.last_error on failure."""
+    def _restore_cached_session(self) -> bool:
+        """Load this account's cached storage state into a fresh context and check it on #/asba."""
+        entry = self.session_cache.load(self.session_key) or {}
+        state = entry.get("storage_state")
+        if not state:
+            return False
+        try:
+            self.browser.reset_context(storage_state=state)
+            self.browser.navigate(site.asba_url())
+            page = self.browser.page
+            # An expired token bounces the SPA back to #/login; a valid one renders the issue list
+            waits.wait_for_function(
+                page,
+                "(sel) => location.hash.includes('login') || document.querySelector(sel) !== null",
+                arg=SESSION_VALID_SELECTOR,
+                timeout=SESSION_CHECK_TIMEOUT_MS,
+            )
+            if page and "login" not in page.url.lower() and page.query_selector(SESSION_VALID_SELECTOR):
+                logger.info("Restored cached session, skipping login")
+                self._cached_token = entry.get("token")
+                return True
+        except Exception as e:
+            logger.warning(f"Cached session check failed: {e}")
+        logger.info("Cached session no longer valid, doing full login")
+        self.session_cache.delete(self.session_key)
+        self.browser.reset_context()
+        return False
+
+    def _save_session(self) -> None:
+        if not self.session_cache.enabled or not self.browser.context:
+            return
+        try:
+            self.session_cache.save(self.session_key, self.browser.context.storage_state(), self.token)
+        except Exception as e:
+            logger.warning(f"Could not cache session: {e}")
+
+    @property
+    def token(self) -> Optional[str]:
+        """Auth token of the last login: issued by the form login, or stored with the cached session."""
+        return self.result.token if self.result else None
+
+    def login(self) -> LoginResult:
+        """Log in, reusing a cached session when it is still valid. Sets self.last_error on failure."""
+        with TRACER.span("login") as span:
+            if self._restore_cached_session():
+                self.result = LoginResult(LoginResult.CACHED, token=self._cached_token)
+            else:
+                self.result = self._login_with_form()
+                if self.result:
+                    self._save_session()
+                else:
+                    self.last_error = self.result.message
+            self.browser.auth_token = self.result.token
+            span.outcome = "ok" if self.result.status == LoginResult.SUCCESS else self.result.status
+            return self.result
+
+    def _login_with_form(self) -> LoginResult:
+        """Perform login to MeroShare. Done as soon as the auth API answers; the result is parsed from it."""
+        def failed(message: str) -> LoginResult:
+            return LoginResult(LoginResult.FAILED, message)
+
         try:
             logger.info("Navigating to MeroShare login page...")
-            self.browser.navigate(LOGIN_URL)
-            time.sleep(2)
+            self.browser.navigate(site.login_url())
             page = self.browser.page
             if not page:
-                self.last_error = "No browser page"
-                return False
+                return failed("No browser page")
             if not self.browser.wait_for_element('input[type="password"]', timeout=LOGIN_FORM_WAIT_TIMEOUT_MS):
-                self.last_error = "Login form did not load in time"
-                return False
+                return failed("Login form did not load in time")
 
             if self.browser.wait_for_captcha():
-                self.last_error = "CAPTCHA detected"
-                return False
+                return LoginResult(LoginResult.CAPTCHA, "CAPTCHA detected")
 
             username = self.meroshare_config.get("username")
             password = self.meroshare_config.get("password")
             dp_name = self.meroshare_config.get("dp_name")
 
             if not all([username, password, dp_name]):
-                self.last_error = "Missing credentials in config"
-                return False
+                return failed("Missing credentials in config")
 
             logger.info("Filling login credentials...")
 
@@ -128,81 +249,52 @@ class MeroShareLogin:
             dp_field = page.query_selector("select")
 
             if not all([username_field, password_field, dp_field]):
-                self.last_error = "Login form fields not found"
-                return False
+                return failed("Login form fields not found")
 
-            username_field.fill("")
-            time.sleep(0.3)
             username_field.fill(username)
-            password_field.fill("")
-            time.sleep(0.3)
             password_field.fill(password)
-            time.sleep(0.5)
+            waits.settle(page)
 
             _, extracted_client_id = self._select_dp_option(dp_field, dp_name)
 
             if not extracted_client_id:
-                self.last_error = "Could not select DP option"
-                return False
+                return failed("Could not select DP option")
 
             client_id = str(extracted_client_id)
 
             if not client_id or client_id == "0":
-                self.last_error = "Invalid clientId"
-                return False
+                return failed("Invalid clientId")
 
             logger.info(f"Using extracted client_id: {client_id}")
 
             self._setup_ajax_interceptors(client_id)
 
-            time.sleep(1)
-
             login_button = page.query_selector(
                 'button[type="submit"], button:has-text("Login"), button:has-text("LOGIN")'
             )
             if not login_button:
-                self.last_error = "Login button not found"
-                return False
+                return failed("Login button not found")
 
+            LIMITER.wait_login()
             logger.info("Clicking login button...")
-            login_button.click()
-            time.sleep(POST_LOGIN_WAIT_SEC)
-
-            current_url = page.url.lower()
-            page_text = page.inner_text("body").lower()
-
-            if any(
-                err in page_text
-                for err in [
-                    "incorrect",
-                    "invalid",
-                    "wrong",
-                    "error",
-                    "failed",
-                    "unauthorized",
-                ]
-            ):
-                error_elem = page.query_selector(
-                    '.error, .alert-danger, [class*="error"]'
-                )
-                if error_elem:
-                    self.last_error = error_elem.inner_text()[:150].strip()
-                    logger.error(f"Login failed: {self.last_error}")
-                else:
-                    self.last_error = "Login failed (error on page)"
-                return False
-
-            if "login" not in current_url or any(
-                ind in current_url or ind in page_text
-                for ind in ["dashboard", "home", "portfolio", "asba"]
-            ):
-                logger.info("Login successful!")
-                return True
-
-            self.last_error = "Login status unclear (still on login page?)"
-            return False
+            with waits.expect_response(page, AUTH_API_PATH, method="POST", timeout=POST_LOGIN_TIMEOUT_MS) as auth:
+                login_button.click()
+            if auth.response is None:
+                return failed("No response from the login API")
+            response = auth.response
+            result = LoginResult.from_response(response.status, _response_json(response),
+                                               response.headers.get("authorization"))
+            if not result:
+                logger.error(f"Login failed ({result.status}): {result.message}")
+                return result
+
+            # The SPA stores the token after this response; let it route away before the next navigation
+            if not waits.wait_for_function(page, "() => !location.hash.includes('login')",
+                                           timeout=ROUTE_AWAY_TIMEOUT_MS):
+                logger.warning("Login accepted but the page stayed on #/login")
+            logger.info("Login successful!")
+            return result
 
         except Exception as e:
-            self.last_error = str(e)[:150]
             logger.error("Login error: %s", e, exc_info=True)
-            return False
+            return failed(str(e)[:150])
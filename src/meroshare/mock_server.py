@@ -0,0 +1,278 @@
+"""Local stand-in for the MeroShare backend API and web app, for offline runs and benchmarks.
+
+    python -m src.meroshare.mock_server --port 8765 [--latency-ms 200] [--fixture data.json]
+
+then set `api_url: http://127.0.0.1:8765/api` (API client) or `meroshare_url: http://127.0.0.1:8765`
+(browser) in config.yaml. Default login: demo / demo, DP "DEMO".
+"""
+import argparse
+import copy
+import json
+import logging
+import re
+import secrets
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+logger = logging.getLogger(__name__)
+
+SITE_HTML_PATH = Path(__file__).with_name("mock_site.html")
+
+DEFAULT_FIXTURE: Dict[str, Any] = {
+    "capitals": [
+        {"id": 128, "code": "13700", "name": "DEMO CAPITAL LIMITED"},
+        {"id": 129, "code": "13800", "name": "SAMPLE SECURITIES LIMITED"},
+    ],
+    "users": {
+        "demo": {
+            "password": "demo",
+            "clientId": 128,
+            "name": "Demo User",
+            "demat": "1301370000000001",
+            "boid": "00000001",
+            "transaction_pin": "1234",
+        },
+    },
+    "banks": [
+        {"id": 44, "code": "DEMO", "name": "DEMO BANK LIMITED"},
+        {"id": 45, "code": "SMPL", "name": "SAMPLE BANK LTD"},
+    ],
+    "bank_accounts": {
+        "44": [{"id": 9001, "accountNumber": "0010000000001", "accountBranchId": 11,
+                "accountTypeId": 1, "branchName": "KATHMANDU"}],
+        "45": [{"id": 9002, "accountNumber": "0020000000001", "accountBranchId": 12,
+                "accountTypeId": 1, "branchName": "POKHARA"}],
+    },
+    "issues": [
+        {"companyShareId": 501, "companyName": "Demo Hydropower Limited", "scrip": "DHPL",
+         "shareTypeName": "IPO", "shareGroupName": "Ordinary Shares", "subGroup": "For General Public",
+         "statusName": "CREATE_APPROVE", "issueOpenDate": "Oct 15, 2026 10:00:00 AM",
+         "issueCloseDate": "Oct 20, 2026 5:00:00 PM", "sharePerUnit": 100, "minUnit": 10,
+         "maxUnit": 5000, "clientName": "Demo Capital Limited"},
+        {"companyShareId": 502, "companyName": "Sample Mutual Fund", "scrip": "SMF",
+         "shareTypeName": "IPO", "shareGroupName": "Mutual Fund", "subGroup": "For General Public",
+         "statusName": "CREATE_APPROVE", "issueOpenDate": "Oct 15, 2026 10:00:00 AM",
+         "issueCloseDate": "Oct 22, 2026 5:00:00 PM", "sharePerUnit": 10, "minUnit": 100,
+         "maxUnit": 50000, "clientName": "Sample Securities Limited"},
+    ],
+}
+
+
+class MockState:
+    def __init__(self, fixture: Dict[str, Any]):
+        self.fixture = fixture
+        self.tokens: Dict[str, str] = {}
+        self.applied: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def issue(self, company_share_id: int) -> Optional[Dict[str, Any]]:
+        for issue in self.fixture["issues"]:
+            if issue["companyShareId"] == company_share_id:
+                return issue
+        return None
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server_version = "MockMeroShare/1.0"
+    state: MockState
+    latency_sec: float = 0.0
+
+    def log_message(self, format, *args):
+        logger.debug("mock %s", format % args)
+
+    def _send(self, status: int, body: Any = None, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Expose-Headers", "Authorization")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_page(self) -> None:
+        payload = SITE_HTML_PATH.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _user(self) -> Optional[str]:
+        return self.state.tokens.get(self.headers.get("Authorization") or "")
+
+    def _begin(self) -> None:
+        with self.state.lock:
+            self.state.requests += 1
+        if self.latency_sec:
+            time.sleep(self.latency_sec)
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Headers", "Authorization, Content-Type")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Expose-Headers", "Authorization")
+        self.end_headers()
+
+    def do_GET(self):
+        self._begin()
+        path = self.path.split("?")[0]
+        fixture = self.state.fixture
+        if path in ("/", "/index.html"):
+            return self._send_page()
+        if path == "/api/meroShare/capital/":
+            return self._send(200, fixture["capitals"])
+        username = self._user()
+        if not username:
+            return self._send(401, {"message": "Access Denied"})
+        user = fixture["users"][username]
+        if path == "/api/meroShare/auth/logout/":
+            with self.state.lock:
+                self.state.tokens.pop(self.headers.get("Authorization") or "", None)
+            return self._send(201, {"message": "Logged out"})
+        if path == "/api/meroShare/ownDetail/":
+            return self._send(200, {"name": user["name"], "demat": user["demat"], "boid": user["boid"],
+                                    "clientCode": str(user["clientId"])})
+        if path == "/api/meroShare/bank/":
+            return self._send(200, fixture["banks"])
+        match = re.fullmatch(r"/api/meroShare/bank/(\d+)", path)
+        if match:
+            return self._send(200, fixture["bank_accounts"].get(match.group(1), []))
+        match = re.fullmatch(r"/api/meroShare/active/(\d+)", path)
+        if match:
+            issue = self.state.issue(int(match.group(1)))
+            if not issue:
+                return self._send(404, {"message": "Issue not found"})
+            return self._send(200, issue)
+        return self._send(404, {"message": "Not found"})
+
+    def do_POST(self):
+        self._begin()
+        path = self.path.split("?")[0]
+        body = self._body()
+        fixture = self.state.fixture
+        if path == "/api/meroShare/auth/":
+            user = fixture["users"].get(body.get("username"))
+            if not user or user["password"] != body.get("password") or user["clientId"] != body.get("clientId"):
+                return self._send(401, {"message": "Invalid username or password"})
+            token = secrets.token_hex(16)
+            with self.state.lock:
+                self.state.tokens[token] = body["username"]
+            return self._send(200, {"message": "Log in successful.", "statusCode": 200},
+                              headers={"Authorization": token})
+        username = self._user()
+        if not username:
+            return self._send(401, {"message": "Access Denied"})
+        if path == "/api/meroShare/companyShare/applicableIssue/":
+            issues = []
+            for issue in fixture["issues"]:
+                row = {k: issue[k] for k in ("companyShareId", "companyName", "scrip", "shareTypeName",
+                                             "shareGroupName", "subGroup", "statusName",
+                                             "issueOpenDate", "issueCloseDate")}
+                if (username, issue["companyShareId"]) in self.state.applied:
+                    row["action"] = "edit"
+                issues.append(row)
+            return self._send(200, {"object": issues, "totalCount": len(issues)})
+        if path == "/api/meroShare/applicantForm/share/apply":
+            return self._apply(username, body)
+        return self._send(404, {"message": "Not found"})
+
+    def _apply(self, username: str, body: Dict[str, Any]) -> None:
+        user = self.state.fixture["users"][username]
+        issue = self.state.issue(body.get("companyShareId") or 0)
+        if not issue:
+            return self._send(404, {"message": "Issue not found"})
+        if body.get("transactionPIN") != user["transaction_pin"]:
+            return self._send(400, {"message": "Invalid transaction PIN"})
+        if not body.get("crnNumber"):
+            return self._send(400, {"message": "CRN number is required"})
+        try:
+            kitta = int(body.get("appliedKitta") or 0)
+        except (TypeError, ValueError):
+            kitta = 0
+        if not issue["minUnit"] <= kitta <= issue["maxUnit"]:
+            return self._send(400, {"message": f"Applied kitta must be between {issue['minUnit']} and {issue['maxUnit']}"})
+        key = (username, issue["companyShareId"])
+        with self.state.lock:
+            if key in self.state.applied:
+                return self._send(409, {"message": "You have already applied for this issue"})
+            self.state.applied[key] = body
+        return self._send(201, {"message": "Share has been applied successfully.", "statusCode": 201})
+
+
+class MockMeroShareServer:
+    """Runs the mock backend on a background thread. Use as a context manager."""
+
+    def __init__(self, fixture: Optional[Dict[str, Any]] = None, host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: int = 0):
+        self.state = MockState(copy.deepcopy(fixture or DEFAULT_FIXTURE))
+        handler = type("BoundMockHandler", (MockHandler,), {"state": self.state, "latency_sec": latency_ms / 1000})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.url}/api"
+
+    def start(self) -> "MockMeroShareServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-meroshare", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the MeroShare backend API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Delay added to every response")
+    parser.add_argument("--fixture", help="JSON file replacing the built-in data")
+    args = parser.parse_args()
+    fixture = json.loads(Path(args.fixture).read_text()) if args.fixture else None
+    server = MockMeroShareServer(fixture, host=args.host, port=args.port, latency_ms=args.latency_ms)
+    print(f"Mock MeroShare site on {server.url}, API on {server.api_url} (login demo / demo, DP 'DEMO')")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
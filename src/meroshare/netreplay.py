@@ -0,0 +1,265 @@
+"""Record a run's network traffic and replay it later without the live site.
+
+    python src/meroshare/check.py --record recordings/ipo-day
+    python src/meroshare/check.py --replay recordings/ipo-day [--replay-speed 0]
+
+Recording uses Playwright's HAR export (one .har file per browser context), then scrubs credentials
+out of it: auth and cookie headers, and password / PIN / CRN / account fields and the account
+holder's name, contact details and address in request and JSON response bodies. Replay answers
+every request through context.route from the recorded entries (in recorded order per URL), so
+check.py flows run offline. Each response is delayed by its recorded
+duration divided by speed; speed 0 answers immediately. Settings can also come from the
+`network_replay` section of config.yaml.
+"""
+import base64
+import glob
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "record", "replay")
+REDACTED = "REDACTED"
+SENSITIVE_HEADERS = frozenset({"authorization", "cookie", "set-cookie", "x-auth-token"})
+# JSON keys (compared lower-case) whose values never go into a recording
+SENSITIVE_KEYS = frozenset({"password", "transactionpin", "crnnumber", "username", "demat", "boid",
+                            "accountnumber", "bankaccountnumber", "bankaccountno", "accountno",
+                            "token", "accesstoken", "refreshtoken", "clientcode", "email", "contact",
+                            "contactno", "contactnumber", "mobile", "mobileno", "mobilenumber", "phone",
+                            "address", "permanentaddress", "temporaryaddress", "dob", "dateofbirth",
+                            "citizenshipnumber", "fathername", "mothername", "grandfathername"})
+# Keys redacted only next to a sensitive key: `name` is the account holder's in their own details,
+# but bank, DP and company lists need theirs for replayed runs to select them
+PERSONAL_KEYS = frozenset({"name", "fullname"})
+# Body headers that no longer describe a decoded, re-served body
+DROP_ON_REPLAY = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+# Config sections replaced in replay mode: browser client only (the API client bypasses the tape),
+# no Telegram, and nothing written to the journal, session cache or option cache
+REPLAY_OVERRIDES: Dict[str, Any] = {
+    "client": "browser",
+    "telegram": {},
+    "journal": {"enabled": False},
+    "session_cache": {"enabled": False},
+    "option_cache": {"enabled": False},
+}
+
+
+def _scrub_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        personal = any(k.lower() in SENSITIVE_KEYS for k in value)
+        return {k: (REDACTED if k.lower() in SENSITIVE_KEYS or (personal and k.lower() in PERSONAL_KEYS)
+                    else _scrub_value(v)) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_scrub_value(v) for v in value]
+    return value
+
+
+def _scrub_json_text(text: Optional[str]) -> Optional[str]:
+    if not text:
+        return text
+    try:
+        return json.dumps(_scrub_value(json.loads(text)))
+    except ValueError:
+        return text
+
+
+def _scrub_headers(headers: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    return [dict(h, value=REDACTED) if h.get("name", "").lower() in SENSITIVE_HEADERS else h for h in headers]
+
+
+def _scrub_params(params: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    return [dict(p, value=REDACTED) if p.get("name", "").lower() in SENSITIVE_KEYS else p for p in params]
+
+
+def scrub_har(har: Dict[str, Any]) -> Dict[str, Any]:
+    """Remove credentials and account identifiers from a HAR document (in place; also returned)."""
+    for entry in har.get("log", {}).get("entries", []):
+        request, response = entry.get("request", {}), entry.get("response", {})
+        request["headers"] = _scrub_headers(request.get("headers", []))
+        request["cookies"] = []
+        request["queryString"] = _scrub_params(request.get("queryString", []))
+        post = request.get("postData")
+        if post:
+            post["text"] = _scrub_json_text(post.get("text"))
+            if post.get("params"):
+                post["params"] = _scrub_params(post["params"])
+        response["headers"] = _scrub_headers(response.get("headers", []))
+        response["cookies"] = []
+        content = response.get("content", {})
+        if "json" in (content.get("mimeType") or "") and content.get("encoding") != "base64":
+            content["text"] = _scrub_json_text(content.get("text"))
+    return har
+
+
+def scrub_har_file(path: str) -> None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            har = json.load(f)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(scrub_har(har), f)
+        os.replace(tmp, path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not scrub recording {path}: {e}")
+
+
+def _without_query(url: str) -> str:
+    return urlunsplit(urlsplit(url)._replace(query="", fragment=""))
+
+
+class _Tape:
+    """Recorded responses per (method, url), handed out in recorded order; the last one repeats."""
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self._lock = threading.Lock()
+        self._exact: Dict[Tuple[str, str], deque] = defaultdict(deque)
+        self._loose: Dict[Tuple[str, str], deque] = defaultdict(deque)
+        for entry in sorted(entries, key=lambda e: e.get("startedDateTime", "")):
+            request = entry.get("request", {})
+            method, url = request.get("method", "GET"), request.get("url", "")
+            if entry.get("response", {}).get("status", 0) <= 0:
+                continue  # aborted or blocked while recording
+            self._exact[(method, url)].append(entry)
+            self._loose[(method, _without_query(url))].append(entry)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self._exact.values())
+
+    def next(self, method: str, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            queue = self._exact.get((method, url)) or self._loose.get((method, _without_query(url)))
+            if not queue:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+
+class NetworkTape:
+    """What BrowserManager does with network traffic: nothing, record it, or replay a recording.
+
+    Plain settings only, so it can be handed to shard processes; the loaded recording is cached per process.
+    """
+
+    def __init__(self, mode: str = "off", directory: Optional[str] = None, speed: float = 1.0):
+        if mode not in MODES:
+            raise ValueError(f"network mode must be one of {', '.join(MODES)}, got {mode!r}")
+        self.mode = mode
+        self.directory = os.path.expanduser(directory) if directory else None
+        self.speed = max(0.0, float(speed))
+        if mode != "off" and not self.directory:
+            raise ValueError(f"network mode {mode!r} needs a directory")
+        self._state = None
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict[str, Any]]) -> Optional["NetworkTape"]:
+        """Tape from the network_replay config section; None when off."""
+        settings = settings or {}
+        mode = settings.get("mode")
+        # YAML 1.1 reads an unquoted `off` as False
+        mode = "off" if mode in (None, False, "") else str(mode).lower()
+        if mode == "off":
+            return None
+        return cls(mode, settings.get("dir"), settings.get("speed", 1.0))
+
+    def sandbox(self, config):
+        """The config a run should use: in replay mode nothing may reach the network or local state."""
+        if self.mode != "replay":
+            return config
+        logger.info("Replay mode: browser client only, no notifications, journal and caches off")
+        return config.with_overrides(REPLAY_OVERRIDES)
+
+    def __getstate__(self):
+        return {"mode": self.mode, "directory": self.directory, "speed": self.speed, "_state": None}
+
+    def _shared(self) -> Dict[str, Any]:
+        if self._state is None:
+            self._state = {"lock": threading.Lock(), "counter": itertools.count(1), "paths": {}, "tape": None}
+        return self._state
+
+    @property
+    def tape(self) -> _Tape:
+        state = self._shared()
+        with state["lock"]:
+            if state["tape"] is None:
+                entries = []
+                for path in sorted(glob.glob(os.path.join(self.directory, "*.har"))):
+                    try:
+                        with open(path, encoding="utf-8") as f:
+                            entries.extend(json.load(f).get("log", {}).get("entries", []))
+                    except (OSError, ValueError) as e:
+                        logger.warning(f"Skipping unreadable recording {path}: {e}")
+                state["tape"] = _Tape(entries)
+                logger.info(f"Replaying {len(state['tape'])} recorded response(s) from {self.directory} "
+                            f"(speed {self.speed:g}{', no delays' if not self.speed else ''})")
+        return state["tape"]
+
+    def context_options(self) -> Dict[str, Any]:
+        """Extra browser.new_context() arguments."""
+        if self.mode != "record":
+            return {}
+        state = self._shared()
+        Path(self.directory).mkdir(parents=True, exist_ok=True)
+        name = f"run-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(state['counter'])}.har"
+        return {"record_har_path": os.path.join(self.directory, name), "record_har_content": "embed"}
+
+    def install(self, context, options: Dict[str, Any]) -> None:
+        """Hook a context created with context_options(): remember its HAR file, or route it to the tape."""
+        if self.mode == "record":
+            self._shared()["paths"][id(context)] = options["record_har_path"]
+        elif self.mode == "replay":
+            tape = self.tape
+            context.route("**/*", lambda route: self._replay(tape, route))
+
+    def closed(self, context) -> None:
+        """Call after context.close(): the HAR file is complete now and gets scrubbed."""
+        if self.mode != "record":
+            return
+        path = self._shared()["paths"].pop(id(context), None)
+        if path and os.path.exists(path):
+            scrub_har_file(path)
+            logger.info(f"Recorded network traffic to {path}")
+
+    def _replay(self, tape: _Tape, route) -> None:
+        request = route.request
+        entry = tape.next(request.method, request.url)
+        if entry is None:
+            logger.debug(f"Replay: no recording for {request.method} {request.url}")
+            route.abort("internetdisconnected")
+            return
+        response = entry["response"]
+        content = response.get("content", {})
+        text = content.get("text") or ""
+        body = base64.b64decode(text) if content.get("encoding") == "base64" else text.encode("utf-8")
+        headers = {h["name"]: h["value"] for h in response.get("headers", [])
+                   if h.get("name", "").lower() not in DROP_ON_REPLAY}
+        delay_ms = max(0.0, float(entry.get("time") or 0)) / self.speed if self.speed else 0.0
+        if delay_ms >= 1:
+            self._wait(request, delay_ms)
+        route.fulfill(status=response.get("status", 200), headers=headers, body=body)
+
+    @staticmethod
+    def _wait(request, delay_ms: float) -> None:
+        # Not time.sleep: route handlers share Playwright's dispatcher thread, which would stall every
+        # other request and context. Waiting through the page lets them be answered meanwhile.
+        try:
+            request.frame.page.wait_for_timeout(delay_ms)
+        except Exception as e:
+            # service worker requests have no frame; a closed page no longer needs its answer delayed
+            logger.debug(f"Replay: answering {request.url} without its delay: {e}")
+
+    def report(self) -> str:
+        if self.mode != "replay" or self._state is None or self._state["tape"] is None:
+            return ""
+        tape = self._state["tape"]
+        return f"Replay: {tape.hits} request(s) answered from the recording, {tape.misses} without one (aborted)"
@@ -0,0 +1,134 @@
+import atexit
+import logging
+import queue
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+TELEGRAM_REQUEST_TIMEOUT = 10
+TELEGRAM_MAX_ATTEMPTS = 5
+TELEGRAM_MAX_BACKOFF_SEC = 30
+FLUSH_TIMEOUT_SEC = 15
+
+_STOP = object()
+
+
+class TelegramDispatcher:
+    """Sends Telegram messages from a background thread so callers never wait on the Bot API.
+
+    Messages go out in order over one pooled session, with exponential backoff on network/5xx
+    errors and the server's retry_after on 429.
+    """
+
+    def __init__(self, bot_token: str, chat_id: str, timeout: float = TELEGRAM_REQUEST_TIMEOUT,
+                 max_attempts: int = TELEGRAM_MAX_ATTEMPTS):
+        self.url = f"{TELEGRAM_API_URL}/bot{bot_token}/sendMessage"
+        self.chat_id = chat_id
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        # requests is imported by the first dispatcher, not by every module that can notify
+        import requests
+        self.session = requests.Session()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="telegram", daemon=True)
+        self._thread.start()
+
+    def send(self, message: str) -> bool:
+        """Queue a message. Returns immediately."""
+        with self._idle:
+            self._pending += 1
+        self._queue.put(message)
+        return True
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT_SEC) -> bool:
+        """Wait until queued messages are sent, at most timeout seconds. Returns False if some are left."""
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning("Telegram flush timed out with %s message(s) unsent", self._pending)
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout: float = FLUSH_TIMEOUT_SEC) -> None:
+        self.flush(timeout)
+        self._queue.put(_STOP)
+        self.session.close()
+
+    def _run(self) -> None:
+        while True:
+            message = self._queue.get()
+            if message is _STOP:
+                return
+            try:
+                self._deliver(message)
+            except Exception as e:
+                logger.warning("Error sending Telegram notification: %s", e)
+            finally:
+                with self._idle:
+                    self._pending -= 1
+                    self._idle.notify_all()
+
+    def _deliver(self, message: str) -> bool:
+        import requests
+        payload = {"chat_id": self.chat_id, "text": message, "parse_mode": "HTML"}
+        for attempt in range(1, self.max_attempts + 1):
+            delay = min(TELEGRAM_MAX_BACKOFF_SEC, 2 ** (attempt - 1)) * (0.5 + random.random() / 2)
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                if response.status_code == 200:
+                    logger.info("Telegram notification sent")
+                    return True
+                if response.status_code == 429:
+                    try:
+                        delay = float(response.json().get("parameters", {}).get("retry_after", delay))
+                    except ValueError:
+                        pass
+                elif response.status_code < 500:
+                    logger.warning("Failed to send Telegram notification: %s", response.status_code)
+                    return False
+                reason = f"HTTP {response.status_code}"
+            except requests.RequestException as e:
+                reason = str(e)[:80]
+            if attempt < self.max_attempts:
+                logger.debug("Telegram send failed (%s), retry %s in %.1fs", reason, attempt, delay)
+                time.sleep(delay)
+        logger.warning("Giving up on Telegram notification after %s attempts", self.max_attempts)
+        return False
+
+
+_dispatchers: Dict[Tuple[str, str], TelegramDispatcher] = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_dispatcher(bot_token: Optional[str], chat_id: Optional[str]) -> Optional[TelegramDispatcher]:
+    """Shared dispatcher for this bot/chat, or None when Telegram is not configured."""
+    if not bot_token or not chat_id or bot_token == "YOUR_BOT_TOKEN" or chat_id == "YOUR_CHAT_ID":
+        return None
+    key = (str(bot_token), str(chat_id))
+    with _dispatchers_lock:
+        dispatcher = _dispatchers.get(key)
+        if dispatcher is None:
+            dispatcher = TelegramDispatcher(*key)
+            _dispatchers[key] = dispatcher
+        return dispatcher
+
+
+def flush_all(timeout: float = FLUSH_TIMEOUT_SEC) -> None:
+    """Drain every dispatcher, sharing one deadline."""
+    deadline = time.monotonic() + timeout
+    with _dispatchers_lock:
+        dispatchers = list(_dispatchers.values())
+    for dispatcher in dispatchers:
+        dispatcher.flush(max(0.0, deadline - time.monotonic()))
+
+
+atexit.register(flush_all)
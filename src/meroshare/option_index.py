@@ -0,0 +1,141 @@
+"""Lookup indexes for the login DP dropdown and the issue form's bank dropdown.
+
+A dropdown's options are read with one evaluate, normalised once and stored with every name already
+resolved in ~/.cache/meroshare-ipo/options.json, so later runs pick an account's DP or bank value
+without scanning the options. Before a cached value is used, one evaluate checks the live dropdown
+still offers it. If it does not (DP list changed, bank renamed), the live options are read again and
+the index is rebuilt. Settings come from the `option_cache` section of config.yaml.
+"""
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.meroshare import site
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OPTIONS_PATH = os.path.join(os.path.expanduser("~"), ".cache", "meroshare-ipo", "options.json")
+
+# [value, text] of every real option of a <select>, in document order
+READ_OPTIONS_JS = ("(el) => Array.from(el.options)"
+                   ".filter((o) => o.value && o.value !== '0')"
+                   ".map((o) => [o.value, (o.text || '').trim()])")
+HAS_OPTION_JS = "(el, value) => Array.from(el.options).some((o) => o.value === value)"
+
+
+def normalize_bank_name(name: str) -> str:
+    return name.upper().replace("LIMITED", "").replace("LTD", "").strip()
+
+
+def dp_matches(dp_name: str, option_text: str) -> bool:
+    return dp_name.upper() in option_text.upper()
+
+
+def bank_matches(bank_name: str, option_text: str) -> bool:
+    bank_name_clean = normalize_bank_name(bank_name)
+    option_text_clean = normalize_bank_name(option_text)
+    return (bank_name.upper() in option_text.upper() or
+            bank_name_clean in option_text_clean or
+            option_text_clean in bank_name_clean)
+
+
+MATCHERS: Dict[str, Callable[[str, str], bool]] = {"dp": dp_matches, "bank": bank_matches}
+
+
+class OptionIndex:
+    """Options of one dropdown plus the names resolved against them (name -> value)."""
+
+    def __init__(self, options: Sequence[Sequence[str]], matcher: Callable[[str, str], bool],
+                 resolved: Optional[Dict[str, str]] = None):
+        self.options = [(str(value), str(text)) for value, text in options]
+        self.text_by_value = dict(self.options)
+        self.matcher = matcher
+        self.resolved = {name: value for name, value in (resolved or {}).items() if value in self.text_by_value}
+
+    def lookup(self, name: str) -> Optional[Tuple[str, str]]:
+        """(value, text) of the first option matching name, as the old option-by-option scan chose."""
+        value = self.resolved.get(name)
+        if value is None:
+            value = next((v for v, text in self.options if self.matcher(name, text)), None)
+            if value is None:
+                return None
+            self.resolved[name] = value
+        return value, self.text_by_value[value]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"options": self.options, "resolved": self.resolved}
+
+
+class OptionCache:
+    """Per-process set of option indexes, keyed by site and dropdown kind, persisted to one JSON file."""
+
+    def __init__(self, path: str = DEFAULT_OPTIONS_PATH, enabled: bool = True):
+        self._lock = threading.Lock()
+        self.configure({"path": path, "enabled": enabled})
+
+    def configure(self, settings: Optional[Dict[str, Any]] = None) -> None:
+        settings = settings or {}
+        with self._lock:
+            self.enabled = bool(settings.get("enabled", True))
+            self.path = Path(os.path.expanduser(settings.get("path") or DEFAULT_OPTIONS_PATH))
+            self._indexes: Optional[Dict[str, OptionIndex]] = None
+
+    @staticmethod
+    def _key(kind: str) -> str:
+        return f"{site.base_url()}|{kind}"
+
+    def _load(self) -> Dict[str, OptionIndex]:
+        if self._indexes is None:
+            self._indexes = {}
+            if self.enabled and self.path.exists():
+                try:
+                    for key, data in json.loads(self.path.read_text()).items():
+                        kind = key.rsplit("|", 1)[-1]
+                        if kind in MATCHERS:
+                            self._indexes[key] = OptionIndex(data["options"], MATCHERS[kind], data.get("resolved"))
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Ignoring unreadable option cache {self.path}: {e}")
+        return self._indexes
+
+    def _save(self) -> None:
+        if not self.enabled:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({key: index.to_json() for key, index in self._indexes.items()}))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save option cache: {e}")
+
+    def resolve(self, kind: str, select, name: str) -> Optional[Tuple[str, str]]:
+        """(value, text) of the option in the live <select> handle that matches name, or None."""
+        key = self._key(kind)
+        with self._lock:
+            index = self._load().get(key)
+            known = len(index.resolved) if index else 0
+            hit = index.lookup(name) if index else None
+            if index and len(index.resolved) != known:
+                self._save()
+        if hit:
+            try:
+                if select.evaluate(HAS_OPTION_JS, hit[0]):
+                    return hit
+            except Exception as e:
+                logger.debug(f"Could not check cached {kind} option: {e}")
+            logger.info(f"Cached {kind} option {hit[1]!r} is no longer offered, re-reading the list")
+        options: List[List[str]] = select.evaluate(READ_OPTIONS_JS) or []
+        if not options:
+            return None
+        index = OptionIndex(options, MATCHERS[kind])
+        hit = index.lookup(name)
+        with self._lock:
+            self._load()[key] = index
+            self._save()
+        return hit
+
+
+OPTIONS = OptionCache()
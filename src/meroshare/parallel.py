@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor, Future
+import logging
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.meroshare.browser import BrowserManager
+from src.meroshare.profiling import PROFILER
+
+logger = logging.getLogger(__name__)
+
+AccountWorker = Callable[[BrowserManager, int, Dict[str, Any]], bool]
+
+
+class ConcurrentAccountRunner:
+    """Runs one account per BrowserContext of a shared Chromium, at most max_workers at a time.
+
+    Each worker thread attaches its own BrowserManager via browser.share(), so login, ASBA and
+    apply for different accounts proceed in parallel and total time tracks the slowest account.
+    """
+
+    def __init__(self, browser: BrowserManager, worker: AccountWorker, max_workers: int):
+        self.browser = browser
+        self.worker = worker
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="account")
+        self._futures: List[Tuple[int, Future]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._pool.shutdown(wait=True)
+        return False
+
+    def _run(self, account_idx: int, account_config: Dict[str, Any]) -> bool:
+        with PROFILER.thread(), self.browser.share() as account_browser:
+            return self.worker(account_browser, account_idx, account_config)
+
+    def submit(self, account_idx: int, account_config: Dict[str, Any]) -> None:
+        self._futures.append((account_idx, self._pool.submit(self._run, account_idx, account_config)))
+
+    def wait(self) -> int:
+        """Block until every submitted account finished. Returns how many succeeded."""
+        succeeded = 0
+        for account_idx, future in self._futures:
+            try:
+                if future.result():
+                    succeeded += 1
+            except Exception as e:
+                logger.error(f"Account {account_idx} worker crashed: {e}", exc_info=True)
+        self._futures = []
+        return succeeded
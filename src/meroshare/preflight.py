@@ -0,0 +1,102 @@
+"""Quick checks that never start a browser or import Playwright.
+
+    python src/meroshare/check.py --validate-config   # config.yaml only
+    python src/meroshare/check.py --preflight         # config, plus MeroShare site and API reachable
+
+Both print one line per check and return exit code 0 when everything passed.
+"""
+import importlib.util
+import logging
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+from src.config import Config
+from src.meroshare import site
+from src.meroshare.launch import LaunchProfile
+from src.meroshare.netreplay import NetworkTape
+from src.meroshare.procstat import MemoryGuard
+from src.meroshare.rules import MatchingRules
+
+logger = logging.getLogger(__name__)
+
+REACHABLE_TIMEOUT_SEC = 10
+
+
+def validate_config(config: Config) -> Tuple[List[str], Dict[int, List[str]], Optional[MatchingRules]]:
+    """Config.validate() plus the browser_profile, memory_guard and network_replay settings and the
+    matching rules. Returns (errors, account_errors, rules): rules holds the compiled rules, None when
+    the rules section is invalid. Nothing global is configured; callers install rules into RULES."""
+    errors, account_errors = config.validate()
+    try:
+        LaunchProfile.from_config(config.get("browser_profile"))
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        errors.append(f"browser_profile: {e}")
+    try:
+        MemoryGuard.from_config(config.get("memory_guard"))
+    except (ValueError, TypeError, AttributeError) as e:
+        errors.append(f"memory_guard: {e}")
+    try:
+        NetworkTape.from_config(config.get("network_replay"))
+    except (ValueError, TypeError) as e:
+        errors.append(f"network_replay: {e}")
+    rules = MatchingRules()
+    try:
+        rules.configure(config.get("rules"))
+    except (ValueError, TypeError) as e:
+        errors.append(f"rules: {e}")
+        return errors, account_errors, None
+    for idx, account_config in enumerate(config.accounts, 1):
+        if isinstance(account_config, dict) and account_config.get("rules"):
+            try:
+                rules.for_account(account_config)
+            except (ValueError, TypeError) as e:
+                account_errors.setdefault(idx, []).append(f"rules: {e}")
+    return errors, account_errors, rules
+
+
+def reachable(url: str, timeout: float = REACHABLE_TIMEOUT_SEC) -> Tuple[bool, str]:
+    """Whether url answers at all; any HTTP status counts, only network failures do not."""
+    request = urllib.request.Request(url, method="HEAD", headers={"User-Agent": "meroshare-ipo-preflight"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return True, f"HTTP {response.status}"
+    except urllib.error.HTTPError as e:
+        return True, f"HTTP {e.code}"
+    except (urllib.error.URLError, OSError) as e:
+        return False, str(getattr(e, "reason", e))[:120]
+
+
+def _print(ok: bool, what: str, detail: str = "") -> None:
+    print(f"[{'OK' if ok else 'FAIL'}] {what}{f': {detail}' if detail else ''}")
+
+
+def run(config: Config, network: bool = False) -> int:
+    """--validate-config (network=False) or --preflight (network=True). Returns the exit code."""
+    errors, account_errors, rules = validate_config(config)
+    accounts = config.accounts
+    _print(not errors and not account_errors, f"config {config.config_path}",
+           f"{len(accounts)} account(s), rules: {rules.default.describe() if rules else 'invalid'}")
+    for error in errors:
+        _print(False, "config", error)
+    for idx, problems in sorted(account_errors.items()):
+        for problem in problems:
+            _print(False, f"account {idx}", problem)
+    failed = bool(errors or account_errors)
+    if not network:
+        return 1 if failed else 0
+
+    has_playwright = importlib.util.find_spec("playwright") is not None
+    _print(has_playwright, "playwright installed")
+    site.configure(config.get("meroshare_url"))
+    targets = [("MeroShare site", site.base_url())]
+    if str(config.get("client", "browser")).lower() == "api":
+        targets.append(("MeroShare API", config.get("api_url", site.MEROSHARE_API_URL)))
+    for what, url in targets:
+        ok, detail = reachable(url)
+        _print(ok, f"{what} {url}", detail)
+        failed = failed or not ok
+    telegram = config.get_telegram()
+    _print(True, "telegram", "configured" if telegram.get("bot_token") and telegram.get("chat_id")
+           else "not configured, no notifications")
+    return 1 if failed or not has_playwright else 0
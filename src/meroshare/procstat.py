@@ -0,0 +1,148 @@
+"""Resident memory of this process and its children (Playwright driver, Chromium and renderers).
+
+Reads /proc on Linux; elsewhere uses psutil when it is installed and otherwise reports 0.
+"""
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_GROWTH_MB = 400
+
+
+def _proc_children_map() -> Dict[int, List[int]]:
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # ppid is the 2nd field after the parenthesised command name
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def _proc_rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def descendant_pids(root_pid: int) -> List[int]:
+    if os.path.isdir("/proc"):
+        children = _proc_children_map()
+        pids, stack = [], [root_pid]
+        while stack:
+            for child in children.get(stack.pop(), []):
+                pids.append(child)
+                stack.append(child)
+        return pids
+    try:
+        import psutil  # type: ignore
+        return [p.pid for p in psutil.Process(root_pid).children(recursive=True)]
+    except Exception:
+        return []
+
+
+def tree_rss_bytes(root_pid: int = 0, include_root: bool = False) -> int:
+    """Sum of RSS over the descendants of root_pid (default: this process)."""
+    root_pid = root_pid or os.getpid()
+    pids = descendant_pids(root_pid) + ([root_pid] if include_root else [])
+    if os.path.isdir("/proc"):
+        return sum(_proc_rss_bytes(pid) for pid in pids)
+    try:
+        import psutil  # type: ignore
+        total = 0
+        for pid in pids:
+            try:
+                total += psutil.Process(pid).memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+    except ImportError:
+        return 0
+
+
+def children_rss_mb() -> float:
+    """RSS of everything this process spawned (the browser side of a run), in MB."""
+    return tree_rss_bytes() / (1024 * 1024)
+
+
+class PeakRssSampler:
+    """Samples children_rss_mb() on a background thread until stopped; .peak_mb is the highest seen."""
+
+    def __init__(self, interval_sec: float = 0.05):
+        self.interval_sec = interval_sec
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while True:
+            self.peak_mb = max(self.peak_mb, children_rss_mb())
+            if self._stop.wait(self.interval_sec):
+                return
+
+    def __enter__(self) -> "PeakRssSampler":
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return False
+
+
+class MemoryGuard:
+    """RSS of the browser processes after each account, compared with the RSS when the account loop
+    started. check() says when the growth passed max_growth_mb and the browser should be restarted.
+    Settings come from the `memory_guard` section of config.yaml."""
+
+    def __init__(self, max_growth_mb: float = DEFAULT_MAX_GROWTH_MB, enabled: bool = True):
+        self.max_growth_mb = float(max_growth_mb)
+        self.enabled = enabled
+        self.baseline_mb = 0.0
+        self.peak_mb = 0.0
+        self.restarts = 0
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict[str, Any]]) -> "MemoryGuard":
+        settings = settings or {}
+        return cls(settings.get("max_growth_mb", DEFAULT_MAX_GROWTH_MB), bool(settings.get("enabled", True)))
+
+    def start(self) -> None:
+        """Take the baseline; call again after a restart."""
+        if self.enabled:
+            self.baseline_mb = children_rss_mb()
+            self.peak_mb = max(self.peak_mb, self.baseline_mb)
+
+    def check(self, label: str) -> bool:
+        """Sample after one account. True when the browser grew past the limit and should be restarted."""
+        if not self.enabled:
+            return False
+        rss_mb = children_rss_mb()
+        self.peak_mb = max(self.peak_mb, rss_mb)
+        growth = rss_mb - self.baseline_mb
+        logger.info(f"Browser RSS after {label}: {rss_mb:.0f} MB ({growth:+.0f} MB since start)")
+        if self.max_growth_mb > 0 and growth > self.max_growth_mb:
+            logger.warning(f"Browser grew {growth:.0f} MB (limit {self.max_growth_mb:.0f} MB), restarting it")
+            self.restarts += 1
+            return True
+        return False
+
+    def report(self) -> str:
+        if not self.enabled:
+            return ""
+        return f"Browser RSS: peak {self.peak_mb:.0f} MB, {self.restarts} restart(s)"
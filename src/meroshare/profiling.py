@@ -0,0 +1,163 @@
+"""Profiling mode for one run: cProfile plus Playwright traces, written to a directory per run.
+
+    python src/meroshare/check.py --profile [--profile-screenshots] [--profile-snapshots]
+    python src/scheduler/run_once.py --profile
+
+Writes to ~/.cache/meroshare-ipo/profiles/run-<time>-<pid>/ (or --profile-dir):
+    profile.pstats   cProfile stats of the main thread and every account thread (snakeviz, pstats)
+    trace-<n>.zip    Playwright trace of each browser context (npx playwright show-trace trace-1.zip)
+    summary.txt      the hottest functions by own time and by cumulative time
+Together they show whether a slow run spends its time in Python, in round trips to the browser or
+waiting on the site. When --profile is not given nothing here is active: the hooks in BrowserManager
+and the account runners only check PROFILER.active.
+"""
+import io
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    # cProfile and pstats are imported only when a run is profiled
+    import cProfile
+    import pstats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "meroshare-ipo", "profiles")
+SUMMARY_ROWS = 25
+
+
+class RunProfiler:
+    """Profiles the run it is started for. Safe to share across account threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = False
+        self.run_dir: Optional[Path] = None
+        self.screenshots = False
+        self.snapshots = False
+        self._profiles: List["cProfile.Profile"] = []
+        self._main: Optional["cProfile.Profile"] = None
+        self._traces = itertools.count(1)
+        self._tracing: Dict[int, Path] = {}
+
+    def start(self, directory: Optional[str] = None, screenshots: bool = False, snapshots: bool = False,
+              name: Optional[str] = None) -> Path:
+        """Begin profiling this thread. name picks the run directory inside directory (default: a new one)."""
+        import cProfile
+        base = Path(os.path.expanduser(directory or DEFAULT_PROFILE_DIR))
+        self.run_dir = base / (name or f"run-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.screenshots = screenshots
+        self.snapshots = snapshots
+        self._profiles = []
+        self._tracing = {}
+        self._traces = itertools.count(1)
+        self._main = cProfile.Profile()
+        self.active = True
+        self._main.enable()
+        logger.info(f"Profiling this run into {self.run_dir}")
+        return self.run_dir
+
+    def thread(self):
+        """Context manager profiling the calling worker thread (cProfile only sees the thread it runs on)."""
+        return self._thread_profile() if self.active else nullcontext()
+
+    @contextmanager
+    def _thread_profile(self):
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+
+    def start_tracing(self, context) -> None:
+        """Start a Playwright trace on a new browser context."""
+        try:
+            context.tracing.start(screenshots=self.screenshots, snapshots=self.snapshots, sources=False)
+            with self._lock:
+                self._tracing[id(context)] = self.run_dir / f"trace-{next(self._traces)}.zip"
+        except Exception as e:
+            logger.warning(f"Could not start Playwright tracing: {e}")
+
+    def stop_tracing(self, context) -> None:
+        """Write the context's trace; call before the context is closed."""
+        with self._lock:
+            path = self._tracing.pop(id(context), None)
+        if not path:
+            return
+        try:
+            context.tracing.stop(path=str(path))
+        except Exception as e:
+            logger.warning(f"Could not write Playwright trace {path.name}: {e}")
+
+    def finish(self) -> Optional[Path]:
+        """Stop profiling and write profile.pstats and summary.txt. Returns the run directory."""
+        if not self.active:
+            return None
+        import pstats
+        self._main.disable()
+        self.active = False
+        with self._lock:
+            profiles = [self._main] + self._profiles
+            self._profiles = []
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(str(self.run_dir / "profile.pstats"))
+        summary = self._summary(stats, len(profiles) - 1)
+        (self.run_dir / "summary.txt").write_text(summary)
+        logger.info(f"Profile written to {self.run_dir} (profile.pstats, summary.txt, "
+                    f"{len(list(self.run_dir.glob('trace-*.zip')))} Playwright trace(s))")
+        return self.run_dir
+
+    def _summary(self, stats: "pstats.Stats", threads: int) -> str:
+        out = io.StringIO()
+        out.write(f"Run profile: main thread + {threads} account thread(s), {stats.total_tt:.2f}s profiled\n")
+        out.write("Time in Playwright's sync API is spent waiting for the browser or the site; open a "
+                  "trace-<n>.zip to see which requests and actions it was.\n")
+        for key, title in (("tottime", "own time"), ("cumulative", "cumulative time")):
+            out.write(f"\n=== Top {SUMMARY_ROWS} by {title} ===\n")
+            stats.stream = out
+            stats.sort_stats(key).print_stats(SUMMARY_ROWS)
+        return out.getvalue()
+
+    def settings(self) -> Optional[Dict[str, Any]]:
+        """What a shard process needs to profile into the same run directory; None when inactive."""
+        if not self.active:
+            return None
+        return {"directory": str(self.run_dir), "screenshots": self.screenshots, "snapshots": self.snapshots}
+
+
+PROFILER = RunProfiler()
+
+
+def add_profile_arguments(parser) -> None:
+    """--profile options shared by the entry points."""
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the run: cProfile, Playwright traces and a hot-spot summary per run")
+    parser.add_argument("--profile-dir", metavar="DIR", help=f"Where run directories go (default {DEFAULT_PROFILE_DIR})")
+    parser.add_argument("--profile-screenshots", action="store_true", help="Include screenshots in Playwright traces")
+    parser.add_argument("--profile-snapshots", action="store_true", help="Include DOM snapshots in Playwright traces")
+
+
+@contextmanager
+def profiled(args):
+    """Profile the with-block when args.profile is set (see add_profile_arguments); otherwise do nothing."""
+    if not getattr(args, "profile", False):
+        yield None
+        return
+    run_dir = PROFILER.start(args.profile_dir, args.profile_screenshots, args.profile_snapshots)
+    try:
+        yield run_dir
+    finally:
+        PROFILER.finish()
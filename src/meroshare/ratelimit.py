@@ -0,0 +1,207 @@
+"""Shared throttle for MeroShare traffic: login pacing, in-flight requests per origin, and backoff.
+
+One RateLimiter per process (LIMITER) is shared by every account thread. It adapts to what the
+servers answer: a 429, 5xx or timeout halves the allowed in-flight requests and the login rate for
+that origin; successful responses slowly raise them again (AIMD). Retries wait with exponential
+backoff plus jitter, or the server's Retry-After when it sends one. Every throttling decision is
+logged at INFO. Settings come from the `rate_limit` section of config.yaml.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from src.meroshare import waits
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOGINS_PER_SEC = 1.0
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_BACKOFF_BASE_SEC = 1.0
+DEFAULT_BACKOFF_MAX_SEC = 60.0
+DEFAULT_MAX_RETRIES = 5
+# Adaptive factors never drop below this share of the configured limits
+MIN_FACTOR = 0.125
+# Several failing responses in a burst count as one signal
+DECREASE_COOLDOWN_SEC = 2.0
+RECOVERY_STEP = 0.05
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+RETRYABLE_ERRORS = (
+    "ERR_NETWORK_CHANGED", "ERR_CONNECTION_RESET", "ERR_CONNECTION_REFUSED", "ERR_CONNECTION_CLOSED",
+    "ERR_CONNECTION_TIMED_OUT", "ERR_TIMED_OUT", "ERR_EMPTY_RESPONSE", "ERR_INTERNET_DISCONNECTED",
+    "ERR_NAME_NOT_RESOLVED", "ERR_ADDRESS_UNREACHABLE", "NS_BINDING_ABORTED", "Timeout", "timed out",
+)
+
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.netloc else url
+
+
+def is_retryable_error(message: str) -> bool:
+    return any(marker in message for marker in RETRYABLE_ERRORS)
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After header as seconds (only the delta-seconds form is used)."""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+class _Origin:
+    def __init__(self):
+        self.in_flight = 0
+        self.factor = 1.0
+        self.last_decrease = 0.0
+
+
+class RateLimiter:
+    def __init__(self, logins_per_sec: float = DEFAULT_LOGINS_PER_SEC, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 backoff_base_sec: float = DEFAULT_BACKOFF_BASE_SEC, backoff_max_sec: float = DEFAULT_BACKOFF_MAX_SEC,
+                 max_retries: int = DEFAULT_MAX_RETRIES):
+        self._cond = threading.Condition()
+        self._origins: Dict[str, _Origin] = {}
+        self._next_login = 0.0
+        self.configure(logins_per_sec=logins_per_sec, max_in_flight=max_in_flight,
+                       backoff_base_sec=backoff_base_sec, backoff_max_sec=backoff_max_sec, max_retries=max_retries)
+        self.reset()
+
+    def configure(self, settings: Optional[Dict[str, Any]] = None, **overrides) -> None:
+        settings = dict(settings or {}, **overrides)
+        with self._cond:
+            self.logins_per_sec = float(settings.get("logins_per_sec", DEFAULT_LOGINS_PER_SEC) or 0)
+            self.max_in_flight = max(1, int(settings.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT) or 1))
+            self.backoff_base_sec = float(settings.get("backoff_base_sec", DEFAULT_BACKOFF_BASE_SEC))
+            self.backoff_max_sec = float(settings.get("backoff_max_sec", DEFAULT_BACKOFF_MAX_SEC))
+            self.max_retries = max(1, int(settings.get("max_retries", DEFAULT_MAX_RETRIES)))
+
+    def reset(self) -> None:
+        """Forget adaptive state and counters (start of a run)."""
+        with self._cond:
+            self._origins = {}
+            self._next_login = 0.0
+            self.slot_waits = 0
+            self.slot_wait_sec = 0.0
+            self.login_waits = 0
+            self.login_wait_sec = 0.0
+            self.backoffs = 0
+            self.backoff_sec = 0.0
+            self.slowdowns = 0
+
+    def _origin(self, origin: str) -> _Origin:
+        state = self._origins.get(origin)
+        if state is None:
+            state = self._origins[origin] = _Origin()
+        return state
+
+    def _limit(self, state: _Origin) -> int:
+        return max(1, int(self.max_in_flight * state.factor))
+
+    def _login_factor(self) -> float:
+        return min((s.factor for s in self._origins.values()), default=1.0)
+
+    def wait_login(self) -> None:
+        """Block until the next login may be sent, pacing logins across all threads."""
+        if self.logins_per_sec <= 0:
+            return
+        with self._cond:
+            rate = self.logins_per_sec * self._login_factor()
+            now = time.monotonic()
+            start = max(now, self._next_login)
+            self._next_login = start + 1.0 / rate
+            delay = start - now
+            if delay > 0:
+                self.login_waits += 1
+                self.login_wait_sec += delay
+        if delay > 0:
+            logger.info(f"Throttle: login waits {delay:.1f}s ({rate:.2f} logins/s)")
+            with waits.timed("throttle"):
+                time.sleep(delay)
+
+    @contextmanager
+    def request(self, origin: str):
+        """Hold one of the origin's in-flight slots for the duration of a request."""
+        started = time.monotonic()
+        logged = False
+        with self._cond:
+            state = self._origin(origin)
+            while state.in_flight >= self._limit(state):
+                if not logged:
+                    logger.info(f"Throttle: {origin} has {state.in_flight}/{self._limit(state)} requests in "
+                                f"flight, waiting for a slot")
+                    logged = True
+                self._cond.wait(timeout=1.0)
+            state.in_flight += 1
+            if logged:
+                waited = time.monotonic() - started
+                self.slot_waits += 1
+                self.slot_wait_sec += waited
+                waits.WAIT_STATS.add("throttle", waited)
+        try:
+            yield
+        finally:
+            with self._cond:
+                state.in_flight -= 1
+                self._cond.notify_all()
+
+    def observe(self, origin: str, status: Optional[int] = None, error: Optional[str] = None) -> None:
+        """Feed back one response (status) or failure (error) from origin."""
+        failing = (status in RETRYABLE_STATUS) or bool(error and is_retryable_error(error))
+        with self._cond:
+            state = self._origin(origin)
+            before_limit, before_factor = self._limit(state), state.factor
+            now = time.monotonic()
+            if failing:
+                if now - state.last_decrease < DECREASE_COOLDOWN_SEC:
+                    return
+                state.last_decrease = now
+                state.factor = max(MIN_FACTOR, state.factor / 2)
+                self.slowdowns += 1
+            elif status is not None and status < 400 and state.factor < 1.0:
+                state.factor = min(1.0, state.factor + RECOVERY_STEP)
+            else:
+                return
+            after_limit, factor = self._limit(state), state.factor
+            self._cond.notify_all()
+        if failing:
+            reason = f"HTTP {status}" if status in RETRYABLE_STATUS else (error or "")[:60]
+            logger.info(f"Throttle: {reason} from {origin} -> in-flight {before_limit}->{after_limit}, "
+                        f"logins {self.logins_per_sec * before_factor:.2f}->{self.logins_per_sec * factor:.2f}/s")
+        elif after_limit != before_limit or factor == 1.0:
+            logger.info(f"Throttle: {origin} recovering -> in-flight {after_limit}, "
+                        f"logins {self.logins_per_sec * factor:.2f}/s")
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Exponential backoff with jitter for the given 0-based attempt; at least retry_after."""
+        ceiling = min(self.backoff_max_sec, self.backoff_base_sec * (2 ** attempt))
+        delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max_sec))
+        return delay
+
+    def sleep_backoff(self, what: str, attempt: int, reason: str, retry_after: Optional[float] = None) -> None:
+        delay = self.backoff_delay(attempt, retry_after)
+        with self._cond:
+            self.backoffs += 1
+            self.backoff_sec += delay
+        logger.info(f"Backoff: {what} failed ({reason[:80]}), retry {attempt + 1}/{self.max_retries - 1} "
+                    f"in {delay:.1f}s")
+        with waits.timed("backoff"):
+            time.sleep(delay)
+
+    def report(self) -> str:
+        with self._cond:
+            limits = ", ".join(f"{origin} {self._limit(s)}/{self.max_in_flight}"
+                               for origin, s in sorted(self._origins.items())) or "none"
+            return (f"Throttle: {self.slowdowns} slowdown(s), {self.backoffs} backoff(s) {self.backoff_sec:.1f}s, "
+                    f"{self.slot_waits} slot wait(s) {self.slot_wait_sec:.1f}s, {self.login_waits} login wait(s) "
+                    f"{self.login_wait_sec:.1f}s; in-flight limits: {limits}")
+
+
+LIMITER = RateLimiter()
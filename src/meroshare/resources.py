@@ -0,0 +1,163 @@
+import logging
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+from src.meroshare import site
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ALLOW_HOSTS = ("meroshare.cdsc.com.np", "webbackend.cdsc.com.np")
+DEFAULT_BLOCK_TYPES = ("image", "media", "font")
+DEFAULT_TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "facebook.net",
+    "facebook.com", "hotjar.com", "clarity.ms", "googlesyndication.com", "googleadservices.com",
+    "analytics.google.com", "connect.facebook.net", "newrelic.com", "nr-data.net",
+)
+# File extensions by which a blocked resource type is recognised from the URL alone, so the route
+# only sees those requests; a blocked type missing here makes the route see every request
+TYPE_EXTENSIONS = {
+    "image": ("png", "jpe?g", "gif", "webp", "svg", "ico", "bmp", "avif"),
+    "media": ("mp4", "webm", "mp3", "ogg", "wav", "m4a"),
+    "font": ("woff2?", "ttf", "otf", "eot"),
+    "stylesheet": ("css",),
+}
+# Blocked requests are never downloaded, so savings are estimated with typical sizes per type
+ESTIMATED_BYTES = {"image": 25_000, "media": 250_000, "font": 40_000, "tracker": 20_000}
+
+
+def _host_matches(host: str, patterns: Iterable[str]) -> bool:
+    return any(host == p or host.endswith("." + p) for p in patterns)
+
+
+def _host_regex(hosts: Iterable[str]) -> str:
+    """Regex for the host part of a URL (after the scheme) matching hosts and their subdomains."""
+    # Only dots are escaped: the driver compiles this as a JavaScript regex, where re.escape's
+    # escapes of other characters are not all valid
+    names = "|".join(h.replace(".", r"\.") for h in hosts)
+    return rf"(?:[^/?#:@]*\.)?(?:{names})(?::\d+)?(?:[/?#]|$)"
+
+
+class ResourceStats:
+    """Per-run counters of requests let through and blocked. Safe to share across threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.allowed = 0
+            self.allowed_bytes = 0
+            self.blocked: Dict[str, int] = defaultdict(int)
+
+    def add_allowed(self, size: int) -> None:
+        with self._lock:
+            self.allowed += 1
+            self.allowed_bytes += size
+
+    def add_blocked(self, reason: str) -> None:
+        with self._lock:
+            self.blocked[reason] += 1
+
+    def report(self) -> str:
+        with self._lock:
+            blocked = sum(self.blocked.values())
+            saved = sum(ESTIMATED_BYTES.get(reason, 0) * n for reason, n in self.blocked.items())
+            parts = ", ".join(f"{reason} {n}" for reason, n in sorted(self.blocked.items()))
+            return (f"Requests: {self.allowed} loaded ({self.allowed_bytes / 1024:.0f} KB), "
+                    f"{blocked} blocked ({parts or 'none'}), ~{saved / 1024:.0f} KB saved")
+
+
+RESOURCE_STATS = ResourceStats()
+
+
+class ResourcePolicy:
+    """Which requests a browser context may make.
+
+    MeroShare hosts (and the configured site, e.g. the mock) are allowed except for blocked resource
+    types (images, media, fonts by default); known trackers are always blocked, and so are other
+    third-party hosts unless block_third_party is turned off.
+    """
+
+    def __init__(self, allow_hosts: Iterable[str] = DEFAULT_ALLOW_HOSTS,
+                 block_types: Iterable[str] = DEFAULT_BLOCK_TYPES,
+                 tracker_hosts: Iterable[str] = DEFAULT_TRACKER_HOSTS,
+                 block_third_party: bool = True):
+        self.allow_hosts = tuple(h.lower() for h in allow_hosts)
+        self.block_types = frozenset(t.lower() for t in block_types)
+        self.tracker_hosts = tuple(h.lower() for h in tracker_hosts)
+        self.block_third_party = block_third_party
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict[str, Any]]) -> Optional["ResourcePolicy"]:
+        """Policy from the resource_policy config section; None when disabled."""
+        settings = settings or {}
+        if not settings.get("enabled", True):
+            return None
+        return cls(
+            allow_hosts=list(DEFAULT_ALLOW_HOSTS) + list(settings.get("allow_hosts") or []),
+            block_types=settings.get("block_types") or DEFAULT_BLOCK_TYPES,
+            tracker_hosts=list(DEFAULT_TRACKER_HOSTS) + list(settings.get("tracker_hosts") or []),
+            block_third_party=bool(settings.get("block_third_party", True)),
+        )
+
+    def block_reason(self, url: str, resource_type: str) -> Optional[str]:
+        """Why this request should be blocked, or None to let it through."""
+        scheme, host = urlsplit(url)[:2]
+        if scheme not in ("http", "https"):
+            return None
+        host = (host.split(":")[0] or "").lower()
+        if _host_matches(host, self.tracker_hosts):
+            return "tracker"
+        if resource_type in self.block_types:
+            return resource_type
+        if self.block_third_party and not _host_matches(host, self._allowed_hosts()):
+            return "third-party"
+        return None
+
+    def _allowed_hosts(self) -> tuple:
+        site_host = (urlsplit(site.base_url()).hostname or "").lower()
+        if not site_host or site_host in self.allow_hosts:
+            return self.allow_hosts
+        return self.allow_hosts + (site_host,)
+
+    def route_pattern(self):
+        """URL pattern for context.route covering only requests this policy may block.
+
+        A compiled regex is matched by the Playwright driver, so other requests never reach Python.
+        Blocked types are recognised by file extension; the handler still checks the resource type.
+        """
+        if any(t not in TYPE_EXTENSIONS for t in self.block_types):
+            return "**/*"
+        parts = [_host_regex(self.tracker_hosts)]
+        if self.block_third_party:
+            parts.append(rf"(?!{_host_regex(self._allowed_hosts())})")
+        extensions = "|".join(e for t in sorted(self.block_types) for e in TYPE_EXTENSIONS[t])
+        if extensions:
+            parts.append(rf"[^?#]*\.(?:{extensions})(?:[?#]|$)")
+        return re.compile(rf"^https?://(?:{'|'.join(parts)})", re.IGNORECASE)
+
+    def install(self, context, stats: ResourceStats = RESOURCE_STATS) -> None:
+        """Route the requests of context that this policy may block through it."""
+
+        def handle(route):
+            request = route.request
+            reason = self.block_reason(request.url, request.resource_type)
+            if reason:
+                stats.add_blocked(reason)
+                route.abort("blockedbyclient")
+            else:
+                # fallback, not continue_: another route (e.g. network replay) may answer it
+                route.fallback()
+
+        def on_response(response):
+            try:
+                stats.add_allowed(int(response.headers.get("content-length") or 0))
+            except ValueError:
+                stats.add_allowed(0)
+
+        context.route(self.route_pattern(), handle)
+        context.on("response", on_response)
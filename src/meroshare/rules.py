@@ -0,0 +1,221 @@
+"""IPO matching rules from the `rules` section of config.yaml, compiled once into predicates.
+
+Share type and share group are known from the ASBA listing, so rows failing them are rejected for
+all rows at once without opening their issue form. Price, quantity and issue manager rules need the
+form details. An account may override any rule with its own `rules:` mapping; the merged rule set is
+compiled once per distinct override. The defaults match what the tool always applied for: IPO,
+Ordinary Shares, Rs. 100 per share.
+"""
+import ast
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES: Dict[str, Any] = {
+    "share_types": ["IPO"],
+    "share_groups": ["Ordinary Shares"],
+    "price": {"min": 100, "max": 100},
+}
+DEFAULT_KITTA = "10"
+KNOWN_SHARE_GROUPS = ("ordinary shares", "preference shares", "mutual fund", "debenture")
+RANGE_FIELDS = ("price", "min_qty", "max_qty")
+
+# Names and calls a kitta formula may use, e.g. "max(min_qty, 20)" or "min_qty * 2"
+KITTA_NAMES = ("min_qty", "max_qty", "price")
+KITTA_FUNCTIONS = {"min": min, "max": max, "int": int, "round": round}
+_KITTA_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load, ast.Call,
+                ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.USub, ast.UAdd)
+
+
+def _norm(value: Any) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [_norm(v) for v in value if _norm(v)]
+    return [_norm(value)] if _norm(value) else []
+
+
+def _as_range(value: Any) -> Tuple[Optional[float], Optional[float]]:
+    if isinstance(value, dict):
+        low, high = value.get("min"), value.get("max")
+    else:
+        low = high = value
+    return (float(low) if low is not None else None), (float(high) if high is not None else None)
+
+
+def compile_kitta(formula: Any) -> Callable[[Dict[str, Any]], Optional[int]]:
+    """Kitta formula (a number or an arithmetic expression over KITTA_NAMES) as a function of the issue details."""
+    try:
+        tree = ast.parse(str(formula).strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"kitta formula {formula!r}: {e.msg}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, _KITTA_NODES):
+            raise ValueError(f"kitta formula {formula!r}: {type(node).__name__} not allowed")
+        if isinstance(node, ast.Name) and node.id not in KITTA_NAMES and node.id not in KITTA_FUNCTIONS:
+            raise ValueError(f"kitta formula {formula!r}: unknown name {node.id!r}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in KITTA_FUNCTIONS):
+            raise ValueError(f"kitta formula {formula!r}: only {', '.join(KITTA_FUNCTIONS)} may be called")
+    code = compile(tree, "<kitta>", "eval")
+
+    def evaluate(details: Dict[str, Any]) -> Optional[int]:
+        names = {name: details.get(name) for name in KITTA_NAMES}
+        try:
+            return int(eval(code, {"__builtins__": {}, **KITTA_FUNCTIONS}, names))
+        except (TypeError, ValueError, ZeroDivisionError) as e:
+            logger.warning(f"kitta formula {formula!r} failed for {names}: {e}")
+            return None
+
+    return evaluate
+
+
+class Rule:
+    """One compiled predicate. from_listing reads the value off an ASBA row (None: not known there)."""
+
+    def __init__(self, name: str, check: Callable[[Any], bool], field: str,
+                 from_listing: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self.name = name
+        self.check = check
+        self.field = field
+        self.from_listing = from_listing
+
+
+def _listing_share_type(row: Dict[str, Any]) -> Optional[str]:
+    return _norm(row.get("share_type")) or None
+
+
+def _listing_share_group(row: Dict[str, Any]) -> Optional[str]:
+    # The listing's group selector can also hit the sub group, so only trust a known group name
+    for text in (row.get("share_group"), row.get("text")):
+        text = _norm(text)
+        for group in KNOWN_SHARE_GROUPS:
+            if group in text:
+                return group
+    return None
+
+
+class RuleSet:
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        self.settings = dict(DEFAULT_RULES, **(settings or {}))
+        self.rules: List[Rule] = []
+        self.describe_parts: List[str] = []
+        self._compile()
+
+    def _compile(self) -> None:
+        s = self.settings
+        types = _as_list(s.get("share_types"))
+        if types:
+            self.rules.append(Rule("share type", lambda v: _norm(v) in types, "share_type", _listing_share_type))
+            self.describe_parts.append("Type=" + "/".join(t.upper() for t in types))
+        groups = _as_list(s.get("share_groups"))
+        if groups:
+            self.rules.append(Rule("share group", lambda v: any(g in _norm(v) or _norm(v) in g for g in groups if _norm(v)),
+                                   "share_group", _listing_share_group))
+            self.describe_parts.append("/".join(g.title() for g in groups))
+        for field in RANGE_FIELDS:
+            if s.get(field) is None:
+                continue
+            low, high = _as_range(s[field])
+            self.rules.append(Rule(field, lambda v, low=low, high=high: v is not None
+                                   and (low is None or float(v) >= low) and (high is None or float(v) <= high), field))
+            shown = f"{low:g}" if low == high else f"{'' if low is None else f'{low:g}'}..{'' if high is None else f'{high:g}'}"
+            self.describe_parts.append(f"{field}={shown}")
+        managers = s.get("issue_managers") or {}
+        allow, deny = _as_list(managers.get("allow")), _as_list(managers.get("deny"))
+        if allow:
+            self.rules.append(Rule("issue manager", lambda v: any(a in _norm(v) for a in allow), "issue_manager"))
+        if deny:
+            self.rules.append(Rule("issue manager", lambda v: not any(d in _norm(v) for d in deny), "issue_manager"))
+        if allow or deny:
+            self.describe_parts.append("issue manager filter")
+        kitta = s.get("kitta")
+        self._kitta = compile_kitta(kitta) if kitta not in (None, "") else None
+
+    def describe(self) -> str:
+        return ", ".join(self.describe_parts) or "no rules"
+
+    def screen(self, rows: Iterable[Dict[str, Any]]) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Tuple[Dict[str, Any], str]]]:
+        """(candidates, rejected) over all listing rows: candidates are (index, row) that still need the
+        form, rejected are (row, rule name) that fail a rule on listing data alone."""
+        candidates, rejected = [], []
+        for idx, row in enumerate(rows):
+            for rule in self.rules:
+                value = rule.from_listing(row) if rule.from_listing else None
+                if value is not None and not rule.check(value):
+                    rejected.append((row, rule.name))
+                    break
+            else:
+                candidates.append((idx, row))
+        return candidates, rejected
+
+    def failure(self, details: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Name of the first rule the issue details fail, None when they match."""
+        if not details:
+            return "no details"
+        for rule in self.rules:
+            try:
+                if not rule.check(details.get(rule.field)):
+                    return f"{rule.name} ({details.get(rule.field)!r})"
+            except (TypeError, ValueError):
+                return f"{rule.name} ({details.get(rule.field)!r})"
+        return None
+
+    def matches(self, details: Optional[Dict[str, Any]]) -> bool:
+        return self.failure(details) is None
+
+    def kitta(self, details: Dict[str, Any], account_config: Dict[str, Any]) -> str:
+        """Kitta to apply for: the formula, else the account's applied_kitta, clamped to the issue's limits."""
+        kitta = self._kitta(details) if self._kitta else None
+        if kitta is None:
+            kitta = int(account_config.get("applied_kitta") or DEFAULT_KITTA)
+        low, high = details.get("min_qty"), details.get("max_qty")
+        if low and kitta < int(low):
+            kitta = int(low)
+        if high and kitta > int(high):
+            kitta = int(high)
+        return str(kitta)
+
+
+class MatchingRules:
+    """The configured rule set plus per-account variants, each compiled once. Safe across account threads."""
+
+    def __init__(self):
+        self.configure()
+
+    def configure(self, settings: Optional[Dict[str, Any]] = None) -> None:
+        self.settings = dict(settings or {})
+        self.default = RuleSet(self.settings)
+        self._lock = threading.Lock()
+        self._by_override: Dict[str, RuleSet] = {}
+
+    def install(self, other: "MatchingRules") -> None:
+        """Take over the settings and compiled rule sets of other, e.g. the ones validate_config parsed."""
+        with other._lock:
+            by_override = dict(other._by_override)
+        self.settings, self.default = other.settings, other.default
+        self._lock = threading.Lock()
+        self._by_override = by_override
+
+    def for_account(self, account_config: Optional[Dict[str, Any]]) -> RuleSet:
+        override = (account_config or {}).get("rules") or {}
+        if account_config and account_config.get("applied_kitta") and "kitta" not in override:
+            # an account's own applied_kitta beats a global formula
+            override = dict(override, kitta=None)
+        if not override:
+            return self.default
+        key = json.dumps(override, sort_keys=True, default=str)
+        with self._lock:
+            rules = self._by_override.get(key)
+            if rules is None:
+                rules = self._by_override[key] = RuleSet(dict(self.settings, **override))
+        return rules
+
+
+RULES = MatchingRules()
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "meroshare-ipo", "sessions")
+DEFAULT_MAX_AGE_HOURS = 12
+CACHE_KEY_ENV = "MEROSHARE_CACHE_KEY"
+
+
+class SessionCache:
+    """Encrypted per-account store of Playwright storage state (cookies + localStorage) and the auth
+    token the backend issued with it.
+
+    An entry is {"storage_state": ..., "token": ...}; either may be None, e.g. an API-mode login only
+    stores a token.
+
+    Encryption uses Fernet from `cryptography`; without it the cache stays disabled rather than
+    writing auth tokens in clear text. The key comes from $MEROSHARE_CACHE_KEY or a 0600 key file
+    generated next to the cache.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_age_hours: float = DEFAULT_MAX_AGE_HOURS,
+                 enabled: bool = True):
+        self.cache_dir = Path(os.path.expanduser(cache_dir))
+        self.max_age_sec = float(max_age_hours) * 3600
+        self.enabled = enabled
+        self._fernet = None
+
+    @classmethod
+    def from_config(cls, config: Config) -> "SessionCache":
+        settings = config.get("session_cache", {}) or {}
+        return cls(
+            cache_dir=settings.get("dir") or DEFAULT_CACHE_DIR,
+            max_age_hours=settings.get("max_age_hours", DEFAULT_MAX_AGE_HOURS),
+            enabled=bool(settings.get("enabled", True)),
+        )
+
+    @staticmethod
+    def account_key(account_config: Dict[str, Any]) -> str:
+        raw = f"{account_config.get('dp_name', '')}|{account_config.get('username', '')}"
+        return hashlib.sha256(raw.encode()).hexdigest()[:24]
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.session"
+
+    def _cipher(self):
+        if self._fernet is not None:
+            return self._fernet
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError:
+            logger.warning("Session cache disabled: install 'cryptography' to enable it")
+            self.enabled = False
+            return None
+        key = os.environ.get(CACHE_KEY_ENV)
+        if not key:
+            key_file = self.cache_dir / ".key"
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            if key_file.exists():
+                key = key_file.read_text().strip()
+            else:
+                # write then hard-link so concurrent workers never read a half-written key
+                key = Fernet.generate_key().decode()
+                tmp = self.cache_dir / f".key.{os.getpid()}.{id(self)}"
+                fd = os.open(str(tmp), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "w") as f:
+                    f.write(key)
+                try:
+                    os.link(tmp, key_file)
+                except FileExistsError:
+                    key = key_file.read_text().strip()
+                finally:
+                    tmp.unlink()
+        self._fernet = Fernet(key.encode() if isinstance(key, str) else key)
+        return self._fernet
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Entry saved for this account, or None if missing, expired or unreadable."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        if not path.exists():
+            return None
+        if time.time() - path.stat().st_mtime > self.max_age_sec:
+            logger.info("Cached session expired by age, discarding")
+            self.delete(key)
+            return None
+        cipher = self._cipher()
+        if not cipher:
+            return None
+        try:
+            data = json.loads(cipher.decrypt(path.read_bytes()))
+        except Exception as e:
+            logger.warning(f"Could not read cached session ({type(e).__name__}), discarding")
+            self.delete(key)
+            return None
+        if "storage_state" not in data:
+            # written before tokens were stored: the file is the storage state itself
+            return {"storage_state": data, "token": None}
+        return data
+
+    def save(self, key: str, storage_state: Optional[Dict[str, Any]] = None, token: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        cipher = self._cipher()
+        if not cipher:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp = path.with_suffix(".tmp")
+            fd = os.open(str(tmp), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(cipher.encrypt(json.dumps({"storage_state": storage_state, "token": token}).encode()))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not save session cache: {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.debug(f"Could not delete cached session: {e}")
@@ -0,0 +1,185 @@
+"""Spreads additional accounts over worker processes, each with its own Python interpreter and Chromium.
+
+`processes` in config.yaml sets how many; `concurrency` still applies inside every process. Shards are
+plain multiprocessing.Process children (spawn start method on every OS), so a worker that crashes or
+is killed only loses its own accounts.
+"""
+import logging
+import multiprocessing
+import queue
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+IndexedAccount = Tuple[int, Dict[str, Any]]
+
+RESULT_POLL_SEC = 1.0
+
+
+def partition(accounts: List[IndexedAccount], shards: int) -> List[List[IndexedAccount]]:
+    """Round-robin split, so every shard gets a similar number of accounts. Empty shards are dropped."""
+    shards = max(1, shards)
+    return [part for part in (accounts[i::shards] for i in range(shards)) if part]
+
+
+class ShardJob:
+    """What every shard needs to apply on its own: the run config and the issue found by the check account."""
+
+    def __init__(self, config: Config, total_accounts: int, matching_ipo: Optional[Dict[str, Any]],
+                 ipo_index: int, company_name: str, headless: bool = True, concurrency: int = 1,
+                 network=None, profile: Optional[Dict[str, Any]] = None):
+        self.config = config
+        self.total_accounts = total_accounts
+        self.matching_ipo = matching_ipo
+        self.ipo_index = ipo_index
+        self.company_name = company_name
+        self.headless = headless
+        self.concurrency = max(1, concurrency)
+        self.network = network
+        # PROFILER.settings() of the parent run: shards profile into its directory
+        self.profile = profile
+        self.shards = 1
+
+
+def _apply_shard(shard_idx: int, accounts: List[IndexedAccount], job: ShardJob) -> int:
+    # Imported here: check imports this module, and a spawned child starts from a clean interpreter
+    from src.meroshare import check, site, tracing, waits
+    from src.meroshare.browser import BrowserManager
+    from src.meroshare.ipo_catalog import IpoCatalog
+    from src.meroshare.journal import JOURNAL
+    from src.meroshare.launch import LaunchProfile
+    from src.meroshare.notify import FLUSH_TIMEOUT_SEC, flush_all
+    from src.meroshare.option_index import OPTIONS
+    from src.meroshare.parallel import ConcurrentAccountRunner
+    from src.meroshare.procstat import MemoryGuard
+    from src.meroshare.profiling import PROFILER
+    from src.meroshare.ratelimit import DEFAULT_LOGINS_PER_SEC, DEFAULT_MAX_IN_FLIGHT, LIMITER
+    from src.meroshare.resources import ResourcePolicy
+    from src.meroshare.rules import RULES
+
+    config = job.config
+    waits.configure(config.get("min_settle_ms", 0))
+    site.configure(config.get("meroshare_url"))
+    RULES.configure(config.get("rules"))
+    JOURNAL.configure(config.get("journal"))
+    OPTIONS.configure(config.get("option_cache"))
+    # Every shard has its own limiter, so each gets its share of the configured limits
+    limits = config.get("rate_limit") or {}
+    LIMITER.configure(limits,
+                      logins_per_sec=float(limits.get("logins_per_sec", DEFAULT_LOGINS_PER_SEC) or 0) / job.shards,
+                      max_in_flight=max(1, int(limits.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT)) // job.shards))
+    tracing.TRACER.start_run(config.get("trace"))
+    guard = MemoryGuard.from_config(config.get("memory_guard"))
+    if job.profile:
+        PROFILER.start(job.profile["directory"], job.profile["screenshots"], job.profile["snapshots"],
+                       name=f"shard-{shard_idx}")
+    catalog = IpoCatalog()
+    if job.matching_ipo:
+        catalog.record(job.matching_ipo, True)
+    applied = 0
+    try:
+        with BrowserManager(headless=job.headless, shareable=job.concurrency > 1 and len(accounts) > 1,
+                            resource_policy=ResourcePolicy.from_config(config.get("resource_policy")),
+                            network=job.network,
+                            profile=LaunchProfile.from_config(config.get("browser_profile"))) as browser:
+
+            def apply_one(account_browser: BrowserManager, account_idx: int, account_config: Dict[str, Any],
+                          reset_page: bool = True) -> bool:
+                with tracing.account(check.account_display_name(account_config)):
+                    return check.process_other_account(
+                        account_browser, account_idx, account_config, job.total_accounts, config,
+                        job.matching_ipo, job.ipo_index, job.company_name, reset_page=reset_page, catalog=catalog,
+                    )
+
+            if job.concurrency > 1 and browser.can_share:
+                with ConcurrentAccountRunner(browser, lambda b, i, a: apply_one(b, i, a, False),
+                                             job.concurrency) as runner:
+                    for account_idx, account_config in accounts:
+                        runner.submit(account_idx, account_config)
+                    applied = runner.wait()
+            else:
+                guard.start()
+                for account_idx, account_config in accounts:
+                    if apply_one(browser, account_idx, account_config):
+                        applied += 1
+                    if guard.check(f"account {account_idx}") and browser.can_restart:
+                        browser.restart()
+                        guard.start()
+    finally:
+        logger.info(f"Shard {shard_idx}: {waits.WAIT_STATS.report()}")
+        logger.info(f"Shard {shard_idx}: {LIMITER.report()}")
+        if guard.report():
+            logger.info(f"Shard {shard_idx}: {guard.report()}")
+        tracing.TRACER.finish_run()
+        PROFILER.finish()
+        # multiprocessing children skip atexit handlers, so drain notifications here
+        flush_all(FLUSH_TIMEOUT_SEC)
+    return applied
+
+
+def _shard_main(shard_idx: int, accounts: List[IndexedAccount], job: ShardJob, results) -> None:
+    applied = 0
+    try:
+        applied = _apply_shard(shard_idx, accounts, job)
+    except Exception as e:
+        logger.error(f"Shard {shard_idx} failed: {e}", exc_info=True)
+    finally:
+        results.put((shard_idx, applied))
+
+
+class ShardedAccountRunner:
+    """Applies with accounts split across worker processes. Use as a context manager; wait() returns
+    how many accounts applied, counting a crashed shard as zero."""
+
+    def __init__(self, accounts: List[IndexedAccount], processes: int, job: ShardJob):
+        self.shards = partition(accounts, processes)
+        self.job = job
+        self.job.shards = len(self.shards)
+        self._ctx = multiprocessing.get_context("spawn")
+        self._results = self._ctx.Queue()
+        self._procs: Dict[int, Any] = {}
+
+    def __enter__(self):
+        for shard_idx, accounts in enumerate(self.shards, 1):
+            proc = self._ctx.Process(target=_shard_main, args=(shard_idx, accounts, self.job, self._results),
+                                     name=f"shard-{shard_idx}")
+            proc.start()
+            self._procs[shard_idx] = proc
+            logger.info(f"Shard {shard_idx} (pid {proc.pid}): accounts {', '.join(str(i) for i, _ in accounts)}")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for shard_idx, proc in self._procs.items():
+            if proc.is_alive():
+                logger.warning(f"Stopping shard {shard_idx} (pid {proc.pid})")
+                proc.terminate()
+            proc.join(timeout=10)
+        return False
+
+    def wait(self) -> int:
+        applied = 0
+        pending = set(self._procs)
+        started = time.monotonic()
+        while pending:
+            try:
+                shard_idx, count = self._results.get(timeout=RESULT_POLL_SEC)
+            except queue.Empty:
+                for shard_idx in sorted(pending):
+                    proc = self._procs[shard_idx]
+                    if proc.is_alive() or not self._results.empty():
+                        continue
+                    logger.error(f"Shard {shard_idx} (pid {proc.pid}) exited with code {proc.exitcode} "
+                                 f"without a result; its {len(self.shards[shard_idx - 1])} account(s) count as not applied")
+                    pending.discard(shard_idx)
+                continue
+            if shard_idx in pending:
+                pending.discard(shard_idx)
+                applied += count
+                logger.info(f"Shard {shard_idx} done: {count}/{len(self.shards[shard_idx - 1])} applied "
+                            f"({time.monotonic() - started:.1f}s)")
+        for proc in self._procs.values():
+            proc.join(timeout=10)
+        return applied
@@ -0,0 +1,31 @@
+"""Where the MeroShare web app lives. `meroshare_url` in config points runs at another host, such as
+the local mock site used by the benchmark (src/bench)."""
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+MEROSHARE_URL = "https://meroshare.cdsc.com.np"
+# Backend the web app calls; `api_url` in config overrides it for client: api
+MEROSHARE_API_URL = "https://webbackend.cdsc.com.np/api"
+
+_base_url = MEROSHARE_URL
+
+
+def configure(base_url: Optional[str] = None) -> None:
+    global _base_url
+    _base_url = (base_url or MEROSHARE_URL).rstrip("/")
+    if _base_url != MEROSHARE_URL:
+        logger.info(f"Using MeroShare site at {_base_url}")
+
+
+def base_url() -> str:
+    return _base_url
+
+
+def login_url() -> str:
+    return f"{_base_url}/#/login"
+
+
+def asba_url() -> str:
+    return f"{_base_url}/#/asba"
@@ -0,0 +1,205 @@
+"""Per-phase timing spans for a run, written as one JSON-lines trace file per run.
+
+Each line is a finished span:
+    {"run": ..., "phase": "login", "account": "user1", "outcome": "ok", "start": 3.21,
+     "seconds": 4.87, "parent": null, "thread": "MainThread"}
+followed by a closing {"summary": {...}} line. `trace` in config.yaml sets the directory and how
+many run files to keep; a summary table is also logged at the end of the run.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "meroshare-ipo", "traces")
+DEFAULT_KEEP_RUNS = 50
+
+_local = threading.local()
+
+
+def _default_outcome(result: Any) -> str:
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    if result is None:
+        return "none"
+    if result is False:
+        return "fail"
+    return "ok"
+
+
+class Span:
+    def __init__(self, phase: str, account: Optional[str], parent: Optional[str]):
+        self.phase = phase
+        self.account = account
+        self.parent = parent
+        self.outcome = "ok"
+        self.error: Optional[str] = None
+        self.wall_start = time.time()
+        self.start = time.monotonic()
+
+
+class Tracer:
+    """Collects spans for the current run. Safe to share across account threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._file = None
+        self.path: Optional[Path] = None
+        self.run_id = ""
+        self.started = time.monotonic()
+        self.spans: List[Dict[str, Any]] = []
+
+    def start_run(self, settings: Optional[Dict[str, Any]] = None) -> None:
+        """Begin a new run; opens its trace file unless `trace.enabled` is false."""
+        self.finish_run(log_summary=False)
+        settings = settings or {}
+        with self._lock:
+            self.started = time.monotonic()
+            self.run_id = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+            self.spans = []
+            if not settings.get("enabled", True):
+                return
+            trace_dir = Path(os.path.expanduser(settings.get("dir") or DEFAULT_TRACE_DIR))
+            try:
+                trace_dir.mkdir(parents=True, exist_ok=True)
+                self.path = trace_dir / f"run-{self.run_id}.jsonl"
+                self._file = open(self.path, "w", encoding="utf-8")
+            except OSError as e:
+                logger.warning(f"Could not open trace file in {trace_dir}: {e}")
+                self.path = None
+                return
+            _prune(trace_dir, int(settings.get("keep_runs", DEFAULT_KEEP_RUNS)))
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self._file:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    @contextmanager
+    def span(self, phase: str, account: Optional[str] = None):
+        """Time a block. The yielded Span's outcome may be set by the caller; exceptions mark it 'error'."""
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        current = Span(phase, account or current_account(), stack[-1].phase if stack else None)
+        stack.append(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.outcome = "error"
+            current.error = f"{type(e).__name__}: {str(e)[:120]}"
+            raise
+        finally:
+            stack.pop()
+            self._finish(current)
+
+    def _finish(self, span: Span) -> None:
+        record = {
+            "run": self.run_id,
+            "phase": span.phase,
+            "account": span.account,
+            "outcome": span.outcome,
+            "start": round(span.start - self.started, 3),
+            "seconds": round(time.monotonic() - span.start, 3),
+            "parent": span.parent,
+            "thread": threading.current_thread().name,
+            "ts": round(span.wall_start, 3),
+        }
+        if span.error:
+            record["error"] = span.error
+        with self._lock:
+            self.spans.append(record)
+            self._write(record)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per phase: count, total/mean/max seconds and outcome counts."""
+        phases: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for record in spans:
+            entry = phases.setdefault(record["phase"], {"count": 0, "total": 0.0, "max": 0.0,
+                                                         "outcomes": defaultdict(int)})
+            entry["count"] += 1
+            entry["total"] += record["seconds"]
+            entry["max"] = max(entry["max"], record["seconds"])
+            entry["outcomes"][record["outcome"]] += 1
+        for entry in phases.values():
+            entry["total"] = round(entry["total"], 3)
+            entry["mean"] = round(entry["total"] / entry["count"], 3)
+            entry["outcomes"] = dict(entry["outcomes"])
+        return phases
+
+    def summary_table(self) -> str:
+        phases = self.summary()
+        if not phases:
+            return "Trace: no spans recorded"
+        lines = [f"{'phase':<26}{'count':>6}{'total s':>10}{'mean s':>9}{'max s':>9}  outcomes"]
+        for phase, entry in sorted(phases.items(), key=lambda item: -item[1]["total"]):
+            outcomes = ", ".join(f"{k} {v}" for k, v in sorted(entry["outcomes"].items()))
+            lines.append(f"{phase:<26}{entry['count']:>6}{entry['total']:>10.2f}"
+                         f"{entry['mean']:>9.2f}{entry['max']:>9.2f}  {outcomes}")
+        return "\n".join(lines)
+
+    def finish_run(self, log_summary: bool = True) -> None:
+        """Append the summary line, close the trace file and (optionally) log the table."""
+        if log_summary and self.spans:
+            logger.info("Trace summary (%s):\n%s", self.path or "not written", self.summary_table())
+        summary = self.summary() if self._file else None
+        with self._lock:
+            if self._file:
+                self._write({"run": self.run_id, "summary": summary,
+                             "seconds": round(time.monotonic() - self.started, 3)})
+                self._file.close()
+                self._file = None
+
+
+TRACER = Tracer()
+
+
+def _prune(trace_dir: Path, keep: int) -> None:
+    if keep <= 0:
+        return
+    files = sorted(trace_dir.glob("run-*.jsonl"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in files[keep:]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+
+def current_account() -> Optional[str]:
+    return getattr(_local, "account", None)
+
+
+@contextmanager
+def account(name: Optional[str]):
+    """Tag spans opened in this thread with an account name."""
+    previous = current_account()
+    _local.account = name
+    try:
+        yield
+    finally:
+        _local.account = previous
+
+
+def traced(phase: str, outcome: Callable[[Any], str] = _default_outcome):
+    """Decorator: run the function inside a span; outcome(result) names how it ended."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with TRACER.span(phase) as span:
+                result = func(*args, **kwargs)
+                span.outcome = outcome(result)
+                return result
+        return wrapper
+
+    return decorate
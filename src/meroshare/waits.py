@@ -0,0 +1,144 @@
+"""Condition-driven waits with accounting of how long the run spent waiting.
+
+Every wait in the login/apply flow goes through here instead of fixed sleeps. `min_settle_ms`
+in config adds a minimum pause after each step for days when the site is flaky (default 0).
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WAIT_TIMEOUT_MS = 15000
+
+
+class WaitStats:
+    """Totals of time spent blocked on the site, per kind of wait. Safe to share across threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.monotonic()
+            self.waited: Dict[str, float] = defaultdict(float)
+            self.counts: Dict[str, int] = defaultdict(int)
+
+    def add(self, kind: str, seconds: float) -> None:
+        with self._lock:
+            self.waited[kind] += seconds
+            self.counts[kind] += 1
+
+    def report(self) -> str:
+        with self._lock:
+            wall = time.monotonic() - self.started
+            total = sum(self.waited.values())
+            parts = ", ".join(
+                f"{kind} {self.waited[kind]:.1f}s/{self.counts[kind]}" for kind in sorted(self.waited)
+            )
+        # with concurrent accounts waits overlap, so waiting can exceed wall time
+        working = max(0.0, wall - total)
+        return f"Run {wall:.1f}s: waiting {total:.1f}s ({parts or 'none'}), working {working:.1f}s"
+
+
+WAIT_STATS = WaitStats()
+_min_settle_ms = 0
+
+
+def configure(min_settle_ms: Any = 0) -> None:
+    global _min_settle_ms
+    try:
+        _min_settle_ms = max(0, int(min_settle_ms or 0))
+    except (TypeError, ValueError):
+        logger.warning("Invalid min_settle_ms %r, using 0", min_settle_ms)
+        _min_settle_ms = 0
+
+
+@contextmanager
+def timed(kind: str):
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        WAIT_STATS.add(kind, time.monotonic() - start)
+
+
+def settle(page) -> None:
+    """Optional minimum pause after a step; no-op unless min_settle_ms is set."""
+    if _min_settle_ms and page:
+        with timed("settle"):
+            page.wait_for_timeout(_min_settle_ms)
+
+
+def wait_for_selector(page, selector: str, timeout: int = DEFAULT_WAIT_TIMEOUT_MS, state: str = "visible"):
+    """Wait for selector to reach state. Returns the element (None for hidden/detached); raises on timeout."""
+    with timed("selector"):
+        element = page.wait_for_selector(selector, timeout=timeout, state=state)
+    settle(page)
+    return element
+
+
+def try_wait_for_selector(page, selector: str, timeout: int = DEFAULT_WAIT_TIMEOUT_MS, state: str = "visible"):
+    """Like wait_for_selector but returns None on timeout."""
+    try:
+        return wait_for_selector(page, selector, timeout=timeout, state=state)
+    except Exception as e:
+        logger.debug("Timed out waiting for %s: %s", selector, e)
+        return None
+
+
+def wait_for_function(page, expression: str, arg: Optional[Any] = None, timeout: int = DEFAULT_WAIT_TIMEOUT_MS) -> bool:
+    """Wait until a JS predicate is truthy. Returns False on timeout."""
+    try:
+        with timed("function"):
+            page.wait_for_function(expression, arg=arg, timeout=timeout)
+        settle(page)
+        return True
+    except Exception as e:
+        logger.debug("Timed out waiting for condition: %s", e)
+        return False
+
+
+class ResponseWait:
+    """Filled in by expect_response: the matching response, or None when none arrived in time."""
+
+    def __init__(self):
+        self.response = None
+
+
+@contextmanager
+def expect_response(page, url_part: str, method: Optional[str] = None, timeout: int = DEFAULT_WAIT_TIMEOUT_MS):
+    """Run the with-block (the action that sends the request), then wait for the first response whose
+    URL contains url_part. Errors raised by the block propagate; a timeout leaves .response None."""
+    slot = ResponseWait()
+    acted = False
+    start = time.monotonic()
+    try:
+        with page.expect_response(
+            lambda response: url_part in response.url and (method is None or response.request.method == method),
+            timeout=timeout,
+        ) as info:
+            yield slot
+            acted = True
+        slot.response = info.value
+    except Exception as e:
+        if not acted:
+            raise
+        logger.debug("No response for %s: %s", url_part, e)
+    finally:
+        WAIT_STATS.add("response", time.monotonic() - start)
+
+
+def wait_for_load(page, state: str = "networkidle", timeout: int = DEFAULT_WAIT_TIMEOUT_MS) -> bool:
+    """Wait for a page load state. Returns False on timeout."""
+    try:
+        with timed("load"):
+            page.wait_for_load_state(state, timeout=timeout)
+        return True
+    except Exception as e:
+        logger.debug("Timed out waiting for load state %s: %s", state, e)
+        return False
@@ -0,0 +1,134 @@
+"""Watch mode: keep one logged-in session and re-poll the ASBA listing until a new matching issue opens.
+
+    python src/meroshare/check.py --watch
+
+Each poll only switches the SPA away from and back to #/asba (one listing request, one evaluate).
+Issues already settled are skipped without opening their form: those judged not eligible (on listing
+data or from their form) and those a completed apply run was made for. Anything else, such as a row
+without an Apply button yet, a form that failed to load or an apply run that failed, is looked at
+again on the next poll. The full multi-account apply (check.main) runs only for a matching issue.
+"""
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from src.config import Config
+from src.meroshare import check, site, tracing, waits
+from src.meroshare.asba import AsbaListing, issue_key
+from src.meroshare.browser import BrowserManager
+from src.meroshare.ipo_catalog import IpoCatalog
+from src.meroshare.launch import LaunchProfile
+from src.meroshare.login import MeroShareLogin
+from src.meroshare.option_index import OPTIONS
+from src.meroshare.ratelimit import LIMITER
+from src.meroshare.resources import ResourcePolicy
+from src.meroshare.rules import RULES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_SEC = 30
+DEFAULT_JITTER_SEC = 5
+LEAVE_ASBA_JS = "() => { location.hash = '#/dashboard'; }"
+
+
+class ListingWatcher:
+    def __init__(self, config: Config):
+        self.config = config
+        settings = config.get("watch", {}) or {}
+        self.interval_sec = max(5.0, float(settings.get("interval_sec", DEFAULT_INTERVAL_SEC)))
+        self.jitter_sec = max(0.0, float(settings.get("jitter_sec", DEFAULT_JITTER_SEC)))
+        accounts = config.accounts
+        self.check_account = accounts[0] if accounts else {}
+        self.has_other_accounts = len(accounts) > 1
+        self.catalog = IpoCatalog()
+        self.seen: Set[str] = set()
+        self.browser: Optional[BrowserManager] = None
+        self.logged_in = False
+        self.polls = 0
+
+    def _login(self) -> bool:
+        login = MeroShareLogin(self.browser, self.config.for_account(self.check_account))
+        self.logged_in = bool(login.login())
+        if not self.logged_in:
+            logger.error(f"Watch login failed: {login.last_error or 'unknown'}")
+        return self.logged_in
+
+    def _listing(self) -> Optional[AsbaListing]:
+        """Current ASBA rows, reusing the session; None when the session is gone."""
+        if not self.logged_in:
+            if not self._login():
+                return None
+        else:
+            self.browser.page.evaluate(LEAVE_ASBA_JS)
+        if not check.navigate_to_asba(self.browser):
+            self.logged_in = False
+            return None
+        _, listing = check.check_for_available_ipos(self.browser)
+        return listing
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """One poll. Returns the new rows that match the IPO conditions."""
+        self.polls += 1
+        tracing.TRACER.start_run({"enabled": False})
+        listing = self._listing()
+        if listing is None:
+            return []
+        open_rows = [row for row in listing if row.get("has_apply") and issue_key(row) not in self.seen]
+        if not open_rows:
+            logger.debug(f"Poll {self.polls}: {len(listing)} issue(s), nothing new")
+            return []
+        logger.info(f"Poll {self.polls}: {len(open_rows)} unsettled issue(s): "
+                    f"{', '.join(row.get('company') or '?' for row in open_rows)}")
+        rules = RULES.for_account(self.check_account)
+        matched = check.find_matching_ipo(self.browser, AsbaListing(listing.page, open_rows), self.catalog, rules)
+        self._settle_rejected(open_rows, rules)
+        return [matched] if matched else []
+
+    def _settle_rejected(self, rows: List[Dict[str, Any]], rules) -> None:
+        """Mark rows with a definitive 'not eligible' verdict as seen: failed on listing data, or judged
+        from a form that was read (catalog)."""
+        _, rejected = rules.screen(rows)
+        self.seen.update(issue_key(row) for row, _ in rejected)
+        for row in rows:
+            entry = self.catalog.lookup(row)
+            if entry and not rules.matches(entry["details"]):
+                self.seen.add(issue_key(row))
+
+    def _sleep(self) -> None:
+        time.sleep(self.interval_sec + random.uniform(0, self.jitter_sec))
+
+    def run(self) -> None:
+        headless = self.config.get("headless", True)
+        waits.configure(self.config.get("min_settle_ms", 0))
+        site.configure(self.config.get("meroshare_url"))
+        RULES.configure(self.config.get("rules"))
+        OPTIONS.configure(self.config.get("option_cache"))
+        LIMITER.configure(self.config.get("rate_limit"))
+        logger.info(f"Watching ASBA every {self.interval_sec:.0f}s (+ up to {self.jitter_sec:.0f}s jitter)")
+        # Shareable up front, so apply runs started from here share this browser without relaunching it
+        concurrency = max(1, int(self.config.get("concurrency", 1) or 1))
+        with BrowserManager(headless=headless, shareable=concurrency > 1 and self.has_other_accounts,
+                            resource_policy=ResourcePolicy.from_config(self.config.get("resource_policy")),
+                            profile=LaunchProfile.from_config(self.config.get("browser_profile"))) as browser:
+            self.browser = browser
+            while True:
+                try:
+                    matches = self.poll()
+                    if matches:
+                        names = ", ".join(m.get("company_name") or "?" for m in matches)
+                        logger.info(f"New matching issue(s): {names}; starting the apply run")
+                        if check.main(warm_browser=browser):
+                            self.seen.update(m["issue_key"] for m in matches)
+                        else:
+                            logger.warning(f"Apply run for {names} failed; retrying on the next poll")
+                        # main() replaced the browser context, so the watch session starts over
+                        self.logged_in = False
+                except Exception as e:
+                    logger.error(f"Watch poll failed: {e}", exc_info=True)
+                    self.logged_in = False
+                self._sleep()
+
+
+def watch() -> None:
+    ListingWatcher(Config()).run()
@@ -0,0 +1,178 @@
+"""Long-running IPO check service that keeps Playwright and Chromium warm between runs.
+
+    python src/scheduler/daemon.py
+
+Listens on http://127.0.0.1:8787 (daemon.host / daemon.port in config.yaml):
+    POST /run     run a check now; waits for it and answers {"ok": ..., "seconds": ...}
+    GET  /status  runs so far, browser memory, whether a run is in progress
+
+Runs happen one at a time on the main thread (Playwright's sync API is thread-bound). The browser
+is relaunched before a run when it has disconnected, and after daemon.recycle_after_runs runs or once
+its processes exceed daemon.max_rss_mb. With concurrency > 1 Chromium is launched with its CDP port
+open on 127.0.0.1 and keeps it for as long as it runs, so runs share it without relaunching.
+"""
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.config import Config
+from src.meroshare.browser import BrowserManager
+from src.meroshare.check import main as check_ipos
+from src.meroshare.launch import LaunchProfile
+from src.meroshare.procstat import children_rss_mb
+from src.meroshare.resources import ResourcePolicy
+from src.scheduler.trigger import RUN_REQUEST_TIMEOUT_SEC, daemon_settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RunJob:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Dict[str, Any] = {}
+
+
+class WarmBrowserDaemon:
+    def __init__(self, config: Config):
+        self.config = config
+        self.settings = daemon_settings(config)
+        self.jobs: "queue.Queue[RunJob]" = queue.Queue()
+        self.browser: Optional[BrowserManager] = None
+        self.runs_total = 0
+        self.runs_on_browser = 0
+        self.running = False
+        self.last_result: Dict[str, Any] = {}
+
+    def _launch(self) -> BrowserManager:
+        headless = self.config.get("headless", True)
+        if not os.environ.get("DISPLAY"):
+            headless = True
+        started = time.monotonic()
+        browser = BrowserManager(
+            headless=headless, shareable=int(self.config.get("concurrency", 1) or 1) > 1,
+            resource_policy=ResourcePolicy.from_config(self.config.get("resource_policy")),
+            profile=LaunchProfile.from_config(self.config.get("browser_profile")),
+        ).__enter__()
+        logger.info(f"Browser launched in {time.monotonic() - started:.1f}s")
+        self.runs_on_browser = 0
+        return browser
+
+    def _close_browser(self) -> None:
+        if self.browser:
+            self.browser.__exit__(None, None, None)
+            self.browser = None
+
+    def _ensure_browser(self) -> BrowserManager:
+        """The warm browser, relaunched first if it is missing or Chromium has gone away since the last run."""
+        if self.browser and not (self.browser.browser and self.browser.browser.is_connected()):
+            logger.info("Browser disconnected, relaunching")
+            self._close_browser()
+        if not self.browser:
+            self.browser = self._launch()
+        return self.browser
+
+    def _recycle_if_needed(self) -> None:
+        if not self.browser:
+            return
+        rss_mb = children_rss_mb()
+        if self.runs_on_browser >= self.settings["recycle_after_runs"]:
+            logger.info(f"Recycling browser after {self.runs_on_browser} runs")
+        elif rss_mb > self.settings["max_rss_mb"]:
+            logger.info(f"Recycling browser: {rss_mb:.0f} MB > {self.settings['max_rss_mb']:.0f} MB")
+        else:
+            return
+        self._close_browser()
+
+    def _run(self, job: RunJob) -> None:
+        self.running = True
+        started = time.monotonic()
+        ok = False
+        try:
+            ok = bool(check_ipos(warm_browser=self._ensure_browser()))
+        except Exception as e:
+            logger.error(f"Run failed: {e}", exc_info=True)
+            # a browser that threw mid-run is not trusted for the next one
+            self._close_browser()
+        finally:
+            self.runs_total += 1
+            self.runs_on_browser += 1
+            self.running = False
+            job.result = {"ok": ok, "seconds": round(time.monotonic() - started, 1)}
+            self.last_result = job.result
+            job.done.set()
+        self._recycle_if_needed()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": self.jobs.qsize(),
+            "runs_total": self.runs_total,
+            "runs_on_browser": self.runs_on_browser,
+            "browser_warm": self.browser is not None,
+            "browser_rss_mb": round(children_rss_mb(), 1),
+            "last_result": self.last_result,
+        }
+
+    def _handler(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug("daemon %s", format % args)
+
+            def _send(self, status: int, body: Dict[str, Any]) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if self.path.split("?")[0] == "/status":
+                    return self._send(200, daemon.status())
+                return self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                if self.path.split("?")[0] != "/run":
+                    return self._send(404, {"error": "not found"})
+                job = RunJob()
+                daemon.jobs.put(job)
+                if not job.done.wait(RUN_REQUEST_TIMEOUT_SEC):
+                    return self._send(504, {"error": "run still in progress"})
+                return self._send(200, job.result)
+
+        return Handler
+
+    def serve_forever(self) -> None:
+        server = ThreadingHTTPServer((self.settings["host"], self.settings["port"]), self._handler())
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="daemon-http", daemon=True).start()
+        logger.info(f"IPO check daemon listening on http://{self.settings['host']}:{self.settings['port']}")
+        try:
+            self.browser = self._launch()
+            while True:
+                self._run(self.jobs.get())
+        except KeyboardInterrupt:
+            logger.info("Stopping daemon")
+        finally:
+            server.shutdown()
+            self._close_browser()
+
+
+if __name__ == "__main__":
+    WarmBrowserDaemon(Config()).serve_forever()
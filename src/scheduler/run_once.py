@@ -1,15 +1,40 @@
+import argparse
 import sys
 import logging
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.meroshare.check import main as check_ipos
+from src.config import Config
+from src.meroshare.profiling import add_profile_arguments, profiled
+from src.scheduler.trigger import daemon_settings, trigger_daemon
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
+logger = logging.getLogger(__name__)
+
 if __name__ == "__main__":
-    check_ipos()
+    parser = argparse.ArgumentParser(description="Run one IPO check (through the daemon when it is enabled)")
+    parser.add_argument("--validate-config", action="store_true", help="Check config.yaml and exit")
+    parser.add_argument("--preflight", action="store_true",
+                        help="Check config.yaml and that MeroShare is reachable, then exit")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    config = Config()
+    if args.validate_config or args.preflight:
+        from src.meroshare import preflight
+        sys.exit(preflight.run(config, network=args.preflight))
+    settings = daemon_settings(config)
+    # A profiled run has to happen in this process, so it never goes through the daemon
+    if settings["enabled"] and not args.profile:
+        ok = trigger_daemon(settings)
+        if ok is not None:
+            sys.exit(0 if ok else 1)
+        logger.warning("Daemon not running, checking in this process")
+    from src.meroshare.check import main as check_ipos
+    with profiled(args):
+        ok = check_ipos()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,50 @@
+"""Thin client for the warm-browser daemon (src/scheduler/daemon.py). Standard library only."""
+import json
+import logging
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Optional
+
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+DEFAULT_RECYCLE_AFTER_RUNS = 20
+DEFAULT_MAX_RSS_MB = 800
+RUN_REQUEST_TIMEOUT_SEC = 30 * 60
+CONNECT_TIMEOUT_SEC = 3
+
+
+def daemon_settings(config: Config) -> Dict[str, Any]:
+    settings = config.get("daemon", {}) or {}
+    return {
+        "enabled": bool(settings.get("enabled", False)),
+        "host": settings.get("host") or DEFAULT_HOST,
+        "port": int(settings.get("port") or DEFAULT_PORT),
+        "recycle_after_runs": int(settings.get("recycle_after_runs") or DEFAULT_RECYCLE_AFTER_RUNS),
+        "max_rss_mb": float(settings.get("max_rss_mb") or DEFAULT_MAX_RSS_MB),
+    }
+
+
+def trigger_daemon(settings: Dict[str, Any]) -> Optional[bool]:
+    """Ask the daemon to run a check and wait for it. None if the daemon is not reachable."""
+    base = f"http://{settings['host']}:{settings['port']}"
+    try:
+        urllib.request.urlopen(f"{base}/status", timeout=CONNECT_TIMEOUT_SEC).close()
+    except (urllib.error.URLError, OSError) as e:
+        logger.info(f"Daemon not reachable at {base}: {e}")
+        return None
+    request = urllib.request.Request(f"{base}/run", data=b"", method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=RUN_REQUEST_TIMEOUT_SEC) as response:
+            result = json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        logger.error(f"Daemon run request failed: HTTP {e.code}")
+        return False
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        logger.error(f"Daemon run request failed: {e}")
+        return False
+    logger.info(f"Daemon run finished: {result}")
+    return bool(result.get("ok"))
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The modules import each other as src.*, like the entry points do after putting the root on sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
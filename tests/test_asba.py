@@ -0,0 +1,27 @@
+from src.meroshare.asba import AsbaListing, issue_key
+
+ROWS = [
+    {"row_index": 0, "company": "Sanima API Power Company", "share_type": "IPO", "share_group": "Ordinary Shares",
+     "text": "Sanima API Power Company\nIPO\nOrdinary Shares\nApply", "has_apply": True},
+    {"row_index": 1, "company": "Himal Hydro", "share_type": "IPO", "share_group": "Ordinary Shares",
+     "text": "Himal Hydro\nIPO\nOrdinary Shares\nApply", "has_apply": True},
+]
+
+
+def listing():
+    return AsbaListing(None, [dict(row) for row in ROWS])
+
+
+def test_find_by_issue_key():
+    assert listing().find(key=issue_key(ROWS[1]))["row_index"] == 1
+    assert listing().find("Himal Hydro", key="himal hydro|FPO|ORDINARY SHARES") is None
+
+
+def test_find_by_exact_company_name():
+    assert listing().find("  sanima api power COMPANY ")["row_index"] == 0
+
+
+def test_similar_company_name_is_not_found():
+    assert listing().find("API Power") is None
+    assert listing().find("Himal") is None
+    assert listing().find(None) is None
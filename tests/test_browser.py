@@ -0,0 +1,47 @@
+import pytest
+
+from src.meroshare.browser import BrowserManager
+from src.meroshare.ratelimit import LIMITER
+
+
+@pytest.fixture(autouse=True)
+def default_limiter():
+    yield
+    LIMITER.configure(None)
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.headers = {}
+
+
+class FakePage:
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.gotos = 0
+
+    def goto(self, url, wait_until=None, timeout=None):
+        self.gotos += 1
+        return FakeResponse(self.statuses.pop(0))
+
+
+def manager(page):
+    browser = BrowserManager()
+    browser.page = page
+    return browser
+
+
+def test_navigate_with_zero_retries_tries_once():
+    LIMITER.configure({"max_retries": 4})
+    page = FakePage(503, 200)
+    assert manager(page).navigate("https://meroshare.cdsc.com.np/", retries=0) is False
+    assert page.gotos == 1
+
+
+def test_navigate_fails_when_the_last_attempt_is_throttled(monkeypatch):
+    LIMITER.configure({"max_retries": 2})
+    monkeypatch.setattr(LIMITER, "sleep_backoff", lambda *args, **kwargs: None)
+    page = FakePage(429, 429)
+    assert manager(page).navigate("https://meroshare.cdsc.com.np/") is False
+    assert page.gotos == 2
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from src.meroshare import journal
+from src.meroshare.journal import ApplicationJournal
+
+ACCOUNT = {"username": "alice", "dp_name": "DEMO CAPITAL"}
+OTHER_ACCOUNT = {"username": "bob", "dp_name": "DEMO CAPITAL"}
+SANIMA = {"company": "Sanima API Power Company", "share_type": "IPO", "share_group": "Ordinary Shares"}
+
+
+def issue(**changes):
+    return dict(SANIMA, **changes)
+
+
+@pytest.fixture
+def jrnl(tmp_path):
+    return ApplicationJournal(str(tmp_path / "journal.sqlite3"))
+
+
+def test_applied_issue_is_targeted_and_skips_the_account(jrnl):
+    jrnl.record(ACCOUNT, issue(issue_open="Oct 15, 2026"), "applied")
+    targets = jrnl.target_issues([issue()])
+    assert targets == ["sanima api power company|IPO|ORDINARY SHARES"]
+    assert jrnl.has_applied_all(ACCOUNT, targets)
+    assert not jrnl.has_applied_all(OTHER_ACCOUNT, targets)
+
+
+def test_similar_company_name_is_a_different_issue(jrnl):
+    jrnl.record(ACCOUNT, SANIMA, "applied")
+    api_power = issue(company="API Power")
+    assert jrnl.target_issues([api_power]) == []
+    assert not jrnl.has_applied_all(ACCOUNT, jrnl.target_issues([api_power], api_power))
+
+
+def test_share_type_and_group_are_part_of_the_identity(jrnl):
+    jrnl.record(ACCOUNT, SANIMA, "applied")
+    assert not jrnl.has_applied_all(ACCOUNT, jrnl.target_issues([], issue(share_type="FPO")))
+    assert not jrnl.has_applied_all(ACCOUNT, jrnl.target_issues([], issue(share_group="Preference Shares")))
+
+
+def test_form_details_and_listing_row_share_the_key(jrnl):
+    details = {"company_name": "  sanima api  power company", "share_type": "ipo", "share_group": "ordinary shares"}
+    jrnl.record(ACCOUNT, details, "applied")
+    assert jrnl.has_applied_all(ACCOUNT, jrnl.target_issues([SANIMA], SANIMA))
+
+
+def test_later_failure_keeps_the_success_for_the_same_issue(jrnl):
+    jrnl.record(ACCOUNT, issue(issue_open="Oct 15, 2026"), "applied")
+    jrnl.record(ACCOUNT, issue(issue_open="Oct 15, 2026"), "failed", "already applied")
+    assert jrnl.has_applied_all(ACCOUNT, jrnl.target_issues([], SANIMA))
+
+
+def test_new_issue_of_the_same_company_starts_afresh(jrnl):
+    jrnl.record(ACCOUNT, issue(issue_open="Jan 5, 2026"), "applied")
+    jrnl.record(ACCOUNT, issue(issue_open="Oct 15, 2026"), "failed", "Submit failed")
+    assert not jrnl.has_applied_all(ACCOUNT, jrnl.target_issues([], SANIMA))
+
+
+def test_old_application_does_not_count(jrnl, monkeypatch):
+    jrnl.record(ACCOUNT, SANIMA, "applied")
+    later = time.time() + journal.ISSUE_WINDOW_SEC + 60
+    monkeypatch.setattr(journal.time, "time", lambda: later)
+    assert jrnl.target_issues([SANIMA]) == []
+    assert not jrnl.has_applied_all(ACCOUNT, jrnl.target_issues([], SANIMA))
+
+
+def test_unknown_outcome_is_not_counted_as_applied(jrnl):
+    jrnl.record(ACCOUNT, SANIMA, "unknown", "no answer")
+    assert not jrnl.has_applied_all(ACCOUNT, jrnl.target_issues([], SANIMA))
+
+
+def test_disabled_journal_records_nothing(tmp_path):
+    jrnl = ApplicationJournal(str(tmp_path / "journal.sqlite3"), enabled=False)
+    jrnl.record(ACCOUNT, SANIMA, "applied")
+    assert jrnl.applied_issues() == set()
+    assert not (tmp_path / "journal.sqlite3").exists()
@@ -0,0 +1,52 @@
+import pytest
+
+from src.config import Config
+from src.meroshare import check
+from src.meroshare.api import MeroShareAPI
+from src.meroshare.journal import JOURNAL
+from src.meroshare.mock_server import MockMeroShareServer
+from src.meroshare.ratelimit import LIMITER
+from src.meroshare.rules import RULES
+
+ACCOUNT = {"username": "demo", "password": "demo", "dp_name": "DEMO CAPITAL", "bank_name": "DEMO BANK",
+           "crn": "CRN-1", "transaction_pin": "1234", "applied_kitta": 10}
+
+
+@pytest.fixture
+def mock():
+    with MockMeroShareServer() as server:
+        yield server
+
+
+@pytest.fixture
+def config(tmp_path, mock):
+    path = tmp_path / "config.yaml"
+    path.write_text(f"api_url: {mock.api_url}\nsession_cache: {{enabled: false}}\ntelegram: {{}}\n")
+    JOURNAL.configure({"path": str(tmp_path / "journal.sqlite3")})
+    RULES.configure(None)
+    LIMITER.configure({"logins_per_sec": 0})
+    yield Config(str(path))
+    JOURNAL.configure(None)
+    LIMITER.configure(None)
+
+
+def test_second_run_finds_nothing_to_apply(config, mock):
+    assert check.run_accounts_via_api(config, [dict(ACCOUNT)]) == (1, [])
+    assert list(mock.state.applied) == [("demo", 501)]
+    assert mock.state.applied[("demo", 501)]["appliedKitta"] == "10"
+    assert JOURNAL.has_applied_all(ACCOUNT, JOURNAL.target_issues([], {
+        "company": "Demo Hydropower Limited", "share_type": "IPO", "share_group": "Ordinary Shares"}))
+
+    assert check.run_accounts_via_api(config, [dict(ACCOUNT)]) == (0, [])
+    assert len(mock.state.applied) == 1
+
+
+def test_applying_twice_is_rejected(config, mock):
+    api = MeroShareAPI(mock.api_url)
+    assert api.login("demo", "demo", "DEMO CAPITAL")
+    ipo_details = check.find_matching_ipo_via_api(api)
+    assert ipo_details["company_share_id"] == 501
+    assert check.apply_for_ipo_via_api(api, ACCOUNT, config, ipo_details) == (True, None)
+    ok, reason = check.apply_for_ipo_via_api(api, ACCOUNT, config, ipo_details)
+    assert not ok and "already applied" in reason
+    assert check.find_matching_ipo_via_api(api) is None
@@ -0,0 +1,138 @@
+import json
+
+from src.config import Config
+from src.meroshare.netreplay import REDACTED, NetworkTape, _Tape, scrub_har
+
+
+def har_entry():
+    return {
+        "request": {
+            "method": "POST",
+            "url": "https://webbackend.cdsc.com.np/api/meroShare/applicantForm/share/apply",
+            "headers": [{"name": "Authorization", "value": "secret-token"},
+                        {"name": "Cookie", "value": "SESSION=abc"},
+                        {"name": "Content-Type", "value": "application/json"}],
+            "cookies": [{"name": "SESSION", "value": "abc"}],
+            "queryString": [{"name": "username", "value": "alice"}, {"name": "page", "value": "1"}],
+            "postData": {
+                "mimeType": "application/json",
+                "text": json.dumps({"crnNumber": "CRN1", "transactionPIN": "1234", "appliedKitta": "10",
+                                    "nested": [{"boid": "130"}]}),
+                "params": [{"name": "password", "value": "hunter2"}, {"name": "clientId", "value": "7"}],
+            },
+        },
+        "response": {
+            "status": 200,
+            "headers": [{"name": "Set-Cookie", "value": "SESSION=def"}, {"name": "X-Auth-Token", "value": "t"}],
+            "cookies": [{"name": "SESSION", "value": "def"}],
+            "content": {"mimeType": "application/json",
+                        "text": json.dumps({"demat": "1301", "accountNumber": "0012", "message": "ok"})},
+        },
+    }
+
+
+def test_scrub_har_removes_credentials():
+    har = scrub_har({"log": {"entries": [har_entry()]}})
+    request, response = har["log"]["entries"][0]["request"], har["log"]["entries"][0]["response"]
+    headers = {h["name"]: h["value"] for h in request["headers"]}
+    assert headers == {"Authorization": REDACTED, "Cookie": REDACTED, "Content-Type": "application/json"}
+    assert request["cookies"] == [] and response["cookies"] == []
+    assert {p["name"]: p["value"] for p in request["queryString"]} == {"username": REDACTED, "page": "1"}
+    assert {p["name"]: p["value"] for p in request["postData"]["params"]} == {"password": REDACTED, "clientId": "7"}
+    body = json.loads(request["postData"]["text"])
+    assert body == {"crnNumber": REDACTED, "transactionPIN": REDACTED, "appliedKitta": "10",
+                    "nested": [{"boid": REDACTED}]}
+    assert all(h["value"] == REDACTED for h in response["headers"])
+    assert json.loads(response["content"]["text"]) == {"demat": REDACTED, "accountNumber": REDACTED, "message": "ok"}
+
+
+def test_scrub_har_leaves_non_json_bodies_alone():
+    entry = har_entry()
+    entry["response"]["content"] = {"mimeType": "text/html", "text": "<p>password</p>"}
+    entry["request"]["postData"]["text"] = "not json"
+    har = scrub_har({"log": {"entries": [entry]}})
+    assert har["log"]["entries"][0]["response"]["content"]["text"] == "<p>password</p>"
+    assert "secret" not in json.dumps(har)
+
+
+def test_mode_off_unquoted_in_yaml_is_off():
+    # YAML 1.1 reads a bare `off` as False
+    assert NetworkTape.from_config({"mode": False}) is None
+    assert NetworkTape.from_config({"mode": "off"}) is None
+    assert NetworkTape.from_config(None) is None
+
+
+def test_replay_sandbox_keeps_the_run_offline(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("client: api\ntelegram: {bot_token: t, chat_id: c}\njournal: {enabled: true}\n"
+                    "session_cache: {enabled: true}\nheadless: false\n")
+    config = Config(str(path))
+    sandboxed = NetworkTape("replay", str(tmp_path)).sandbox(config)
+    assert sandboxed.get("client") == "browser"
+    assert not sandboxed.get_telegram().get("bot_token")
+    assert sandboxed.get("journal.enabled") is False
+    assert sandboxed.get("session_cache.enabled") is False
+    assert sandboxed.get("option_cache.enabled") is False
+    assert sandboxed.get("headless") is False
+    # the original config is left as it was
+    assert config.get("client") == "api" and config.get("journal.enabled") is True
+    assert NetworkTape("record", str(tmp_path)).sandbox(config) is config
+
+
+def test_scrub_har_removes_personal_details_but_keeps_list_names():
+    entry = har_entry()
+    entry["response"]["content"]["text"] = json.dumps({
+        "name": "Ram Bahadur", "email": "ram@example.com", "contact": "9800000000", "address": "Kathmandu",
+        "clientCode": "11200", "demat": "1301",
+        "banks": [{"id": 44, "code": "NIC", "name": "NIC ASIA BANK", "bankAccountNumber": "0012"}],
+        "capitals": [{"id": 128, "code": "13700", "name": "DEMO CAPITAL LIMITED"}],
+    })
+    har = scrub_har({"log": {"entries": [entry]}})
+    body = json.loads(har["log"]["entries"][0]["response"]["content"]["text"])
+    assert {k: body[k] for k in ("name", "email", "contact", "address", "clientCode")} == dict.fromkeys(
+        ("name", "email", "contact", "address", "clientCode"), REDACTED)
+    assert body["banks"][0]["bankAccountNumber"] == REDACTED and body["banks"][0]["name"] == REDACTED
+    assert body["capitals"] == [{"id": 128, "code": "13700", "name": "DEMO CAPITAL LIMITED"}]
+    assert "Ram" not in json.dumps(har) and "9800000000" not in json.dumps(har)
+
+
+class FakePage:
+    def __init__(self):
+        self.waits = []
+
+    def wait_for_timeout(self, timeout):
+        self.waits.append(timeout)
+
+
+class FakeRoute:
+    def __init__(self, url, page=None):
+        frame = type("Frame", (), {"page": page})() if page else None
+        self.request = type("Request", (), {"method": "GET", "url": url, "frame": frame})()
+        self.fulfilled = None
+
+    def fulfill(self, **kwargs):
+        self.fulfilled = kwargs
+
+
+def recorded_tape(url, time_ms):
+    return _Tape([{"request": {"method": "GET", "url": url}, "time": time_ms,
+                   "response": {"status": 200, "headers": [], "content": {"text": "ok"}}}])
+
+
+def test_replay_delays_through_the_page_not_the_thread(tmp_path):
+    url = "https://meroshare.cdsc.com.np/"
+    page = FakePage()
+    route = FakeRoute(url, page)
+    NetworkTape("replay", str(tmp_path), speed=2)._replay(recorded_tape(url, 300), route)
+    assert page.waits == [150] and route.fulfilled["status"] == 200
+
+    page = FakePage()
+    NetworkTape("replay", str(tmp_path), speed=0)._replay(recorded_tape(url, 300), FakeRoute(url, page))
+    assert page.waits == []
+
+
+def test_replay_without_a_frame_answers_undelayed(tmp_path):
+    url = "https://meroshare.cdsc.com.np/sw.js"
+    route = FakeRoute(url)  # service worker requests have no page to wait on
+    NetworkTape("replay", str(tmp_path), speed=1)._replay(recorded_tape(url, 300), route)
+    assert route.fulfilled["body"] == b"ok"
@@ -0,0 +1,48 @@
+import pytest
+
+from src.meroshare import site
+from src.meroshare.resources import ResourcePolicy
+
+
+@pytest.fixture(autouse=True)
+def default_site():
+    yield
+    site.configure(None)
+
+
+def test_third_party_hosts_blocked_by_default():
+    policy = ResourcePolicy.from_config({})
+    assert policy.block_reason("https://cdn.example.com/app.js", "script") == "third-party"
+    assert policy.block_reason("https://webbackend.cdsc.com.np/api/meroShare/auth/", "xhr") is None
+    assert policy.block_reason("https://www.google-analytics.com/collect", "xhr") == "tracker"
+    assert policy.block_reason("https://meroshare.cdsc.com.np/assets/logo.png", "image") == "image"
+
+
+def test_third_party_opt_out_keeps_trackers_blocked():
+    policy = ResourcePolicy.from_config({"block_third_party": False})
+    assert policy.block_reason("https://cdn.example.com/app.js", "script") is None
+    assert policy.block_reason("https://connect.facebook.net/sdk.js", "script") == "tracker"
+
+
+def test_configured_site_is_allowed():
+    site.configure("http://127.0.0.1:8765")
+    policy = ResourcePolicy.from_config({})
+    assert policy.block_reason("http://127.0.0.1:8765/api/meroShare/auth/", "xhr") is None
+    assert not policy.route_pattern().search("http://127.0.0.1:8765/#/asba")
+
+
+@pytest.mark.parametrize("url, routed", [
+    ("https://meroshare.cdsc.com.np/#/login", False),
+    ("https://webbackend.cdsc.com.np/api/meroShare/active/search/", False),
+    ("https://meroshare.cdsc.com.np/assets/img/logo.PNG?v=2", True),
+    ("https://meroshare.cdsc.com.np/fonts/roboto.woff2", True),
+    ("https://www.googletagmanager.com/gtm.js", True),
+    ("https://meroshare.cdsc.com.np.example.com/", True),
+    ("data:image/png;base64,AAAA", False),
+])
+def test_route_pattern_covers_only_blockable_requests(url, routed):
+    assert bool(ResourcePolicy().route_pattern().search(url)) is routed
+
+
+def test_route_pattern_without_extension_map_routes_everything():
+    assert ResourcePolicy(block_types=["script"]).route_pattern() == "**/*"
@@ -0,0 +1,114 @@
+import pytest
+
+from src.meroshare.rules import MatchingRules, RuleSet, compile_kitta
+
+DETAILS = {"share_type": "IPO", "share_group": "Ordinary Shares", "price": 100, "min_qty": 10, "max_qty": 500,
+           "issue_manager": "Demo Capital Ltd"}
+
+
+@pytest.mark.parametrize("formula, expected", [
+    ("20", 20),
+    ("min_qty * 2", 20),
+    ("max(min_qty, 50)", 50),
+    ("int(max_qty / 3)", 166),
+    ("-min_qty + 30", 20),
+])
+def test_kitta_formula(formula, expected):
+    assert compile_kitta(formula)(DETAILS) == expected
+
+
+@pytest.mark.parametrize("formula", [
+    "__import__('os').system('true')",
+    "open('/etc/passwd')",
+    "eval('1')",
+    "price.__class__",
+    "min_qty.real",
+    "(lambda: 1)()",
+    "[min_qty][0]",
+    "min_qty if price else 1",
+    "secret",
+    "max(min_qty, 10).bit_length()",
+])
+def test_kitta_formula_rejects_anything_but_arithmetic(formula):
+    with pytest.raises(ValueError):
+        compile_kitta(formula)
+
+
+def test_kitta_syntax_error_is_a_value_error():
+    with pytest.raises(ValueError, match="kitta formula"):
+        compile_kitta("min_qty *")
+
+
+def test_kitta_formula_without_details_gives_none():
+    assert compile_kitta("min_qty * 2")({}) is None
+
+
+def test_kitta_is_clamped_to_issue_limits():
+    rules = RuleSet({"kitta": "max_qty * 10"})
+    assert rules.kitta(DETAILS, {}) == "500"
+    assert RuleSet().kitta(DETAILS, {"applied_kitta": "5"}) == "10"
+
+
+def test_default_rules_match_ordinary_ipo_at_100():
+    rules = RuleSet()
+    assert rules.matches(DETAILS)
+    assert rules.failure(dict(DETAILS, price=250)).startswith("price")
+    assert rules.failure(dict(DETAILS, share_type="FPO")).startswith("share type")
+
+
+def test_screen_rejects_on_listing_data_only():
+    rows = [
+        {"company": "A", "share_type": "IPO", "share_group": "Ordinary Shares"},
+        {"company": "B", "share_type": "RIGHT", "share_group": "Ordinary Shares"},
+        {"company": "C", "share_type": "IPO", "share_group": "Mutual Fund"},
+        # group not known on the listing: the form has to decide
+        {"company": "D", "share_type": "IPO", "share_group": "For General Public"},
+    ]
+    candidates, rejected = RuleSet().screen(rows)
+    assert [row["company"] for _, row in candidates] == ["A", "D"]
+    assert [(row["company"], rule) for row, rule in rejected] == [("B", "share type"), ("C", "share group")]
+
+
+def test_issue_manager_filters():
+    rules = RuleSet({"issue_managers": {"deny": ["demo capital"]}})
+    assert rules.failure(DETAILS).startswith("issue manager")
+
+
+def test_account_override_and_applied_kitta():
+    rules = MatchingRules()
+    rules.configure({"kitta": "min_qty * 3"})
+    assert rules.for_account({}) is rules.default
+    assert rules.for_account({}).kitta(DETAILS, {}) == "30"
+    # an account's applied_kitta beats the global formula
+    assert rules.for_account({"applied_kitta": "15"}).kitta(DETAILS, {"applied_kitta": "15"}) == "15"
+    override = rules.for_account({"rules": {"price": {"max": 300}}})
+    assert override.matches(dict(DETAILS, price=250))
+    assert override is rules.for_account({"rules": {"price": {"max": 300}}})
+
+
+def test_install_takes_over_parsed_rules():
+    parsed = MatchingRules()
+    parsed.configure({"share_types": ["FPO"]})
+    rules = MatchingRules()
+    rules.install(parsed)
+    assert rules.default.matches(dict(DETAILS, share_type="FPO"))
+    assert not rules.default.matches(DETAILS)
+
+
+def test_validate_config_returns_rules_without_configuring_the_global_ones(tmp_path):
+    from src.config import Config
+    from src.meroshare.preflight import validate_config
+    from src.meroshare.rules import RULES
+
+    path = tmp_path / "config.yaml"
+    path.write_text("rules: {share_types: [FPO]}\n"
+                    "meroshare: {accounts: [{rules: {kitta: \"__import__('os')\"}}]}\n")
+    before = RULES.default
+    errors, account_errors, rules = validate_config(Config(str(path)))
+    assert RULES.default is before
+    assert rules.default.describe().startswith("Type=FPO")
+    assert any(problem.startswith("rules:") for problem in account_errors[1])
+
+    path.write_text("rules: {kitta: \"min_qty *\"}\n")
+    errors, _, rules = validate_config(Config(str(path)))
+    assert rules is None and any(error.startswith("rules:") for error in errors)
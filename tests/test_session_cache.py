@@ -0,0 +1,49 @@
+import json
+
+from src.meroshare import check
+from src.meroshare.api import MeroShareAPI
+from src.meroshare.mock_server import MockMeroShareServer
+from src.meroshare.session_cache import SessionCache
+
+ACCOUNT = {"username": "demo", "password": "demo", "dp_name": "DEMO CAPITAL"}
+STATE = {"cookies": [{"name": "SESSION", "value": "abc"}], "origins": []}
+
+
+def test_entry_round_trip_with_token(tmp_path, monkeypatch):
+    monkeypatch.delenv("MEROSHARE_CACHE_KEY", raising=False)
+    cache = SessionCache(str(tmp_path))
+    cache.save("k", STATE, "token-1")
+    assert cache.load("k") == {"storage_state": STATE, "token": "token-1"}
+    assert "token-1" not in (tmp_path / "k.session").read_bytes().decode(errors="ignore")
+
+
+def test_entry_written_before_tokens_loads_as_storage_state(tmp_path):
+    cache = SessionCache(str(tmp_path))
+    cache.save("k")
+    (tmp_path / "k.session").write_bytes(cache._cipher().encrypt(json.dumps(STATE).encode()))
+    assert cache.load("k") == {"storage_state": STATE, "token": None}
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = SessionCache(str(tmp_path), enabled=False)
+    cache.save("k", STATE, "token-1")
+    assert cache.load("k") is None
+
+
+def test_api_login_reuses_the_cached_token(tmp_path):
+    sessions = SessionCache(str(tmp_path))
+    with MockMeroShareServer() as mock:
+        first = MeroShareAPI(mock.api_url)
+        assert check._api_login(first, ACCOUNT, sessions)
+        logins = len(mock.state.tokens)
+        second = MeroShareAPI(mock.api_url)
+        assert check._api_login(second, ACCOUNT, sessions)
+        assert second.token == first.token
+        assert len(mock.state.tokens) == logins
+
+        # a revoked token is replaced by a fresh login
+        first.logout()
+        third = MeroShareAPI(mock.api_url)
+        assert check._api_login(third, ACCOUNT, sessions)
+        assert third.token and third.token != first.token
+        assert sessions.load(SessionCache.account_key(ACCOUNT))["token"] == third.token